@@ -0,0 +1,77 @@
+"""
+Benchmark compressed CSV input and EDI output throughput per codec.
+
+Times parse_csv() on the same synthetic enrollment CSV stored plain, gzip'd,
+bz2'd and xz'd, then write_834() of the parsed records to each kind of
+output file. Throughput is in uncompressed MB/s.
+
+Usage:
+    python benchmarks/bench_compression.py [--rows N] [--extra-columns N]
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from edi834.generator import write_834  # noqa: E402
+from edi834.parser import parse_csv  # noqa: E402
+from edi834.utils import open_file  # noqa: E402
+from bench_parse import write_synthetic_csv  # noqa: E402
+
+CODECS = (('plain', ''), ('gzip', '.gz'), ('bz2', '.bz2'), ('xz', '.xz'))
+
+
+def best_of(repeat, func):
+    """Return the best wall time of repeat calls, and the last result."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=50000)
+    parser.add_argument('--extra-columns', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        plain_csv = os.path.join(tmp, 'input.csv')
+        write_synthetic_csv(plain_csv, args.rows, args.extra_columns)
+        csv_size = os.path.getsize(plain_csv)
+        records = parse_csv(plain_csv)
+        
+        edi_size = None
+        print(f"input: {csv_size / 1e6:,.1f} MB CSV, {args.rows} rows")
+        for codec, suffix in CODECS:
+            csv_path = plain_csv + suffix
+            if suffix:
+                with open(plain_csv, 'rb') as src, open_file(csv_path, 'wb') as dst:
+                    shutil.copyfileobj(src, dst)
+            
+            elapsed, parsed = best_of(args.repeat, lambda: parse_csv(csv_path))
+            assert len(parsed) == args.rows
+            ratio = csv_size / os.path.getsize(csv_path)
+            print(f"parse_csv  {codec:>5}: {elapsed:.3f}s ({csv_size / elapsed / 1e6:,.1f} MB/s, "
+                  f"ratio {ratio:.1f}x)")
+            
+            edi_path = os.path.join(tmp, 'out.edi' + suffix)
+            elapsed, _ = best_of(args.repeat, lambda: write_834(records, edi_path))
+            if edi_size is None:
+                edi_size = os.path.getsize(edi_path)
+            ratio = edi_size / os.path.getsize(edi_path)
+            print(f"write_834  {codec:>5}: {elapsed:.3f}s ({edi_size / elapsed / 1e6:,.1f} MB/s, "
+                  f"ratio {ratio:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""
+Benchmark the columnar DataFrame path against the per-row path.
+
+Parses and validates a synthetic enrollment CSV both with
+parse_csv() + validate_records() and with parse_csv_frame() + validate_frame().
+
+Usage:
+    python benchmarks/bench_frame.py [--rows N] [--chunksize N]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import pandas as pd  # noqa: E402
+
+from bench_parse import write_synthetic_csv  # noqa: E402
+from edi834.parser import parse_csv, parse_csv_frame  # noqa: E402
+from edi834.validator import validate_records, validate_frame  # noqa: E402
+
+
+def timed(label, rows, func):
+    """Run func once and print its throughput."""
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<40} {elapsed:8.2f}s  {rows / elapsed:>12,.0f} rows/sec")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=500000)
+    parser.add_argument('--extra-columns', type=int, default=10)
+    parser.add_argument('--chunksize', type=int, default=100000)
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'synthetic.csv')
+        write_synthetic_csv(path, args.rows, args.extra_columns)
+        
+        records = timed('parse_csv (per-row)', args.rows, lambda: parse_csv(path))
+        timed('validate_records (per-row)', args.rows, lambda: validate_records(records))
+        del records
+        
+        frame = timed('parse_csv_frame (columnar)', args.rows,
+                      lambda: pd.concat(parse_csv_frame(path, chunksize=args.chunksize), ignore_index=True))
+        timed('validate_frame (columnar)', args.rows, lambda: validate_frame(frame))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Micro-benchmark for CSV parsing throughput (rows/sec).
+
+Builds a synthetic wide HRIS-style export (the 17 mapped enrollment columns
+plus filler columns) and times parse_csv() over it.
+
+Usage:
+    python benchmarks/bench_parse.py [--rows N] [--extra-columns N] [--workers N]
+"""
+
+import argparse
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from edi834.parser import parse_csv  # noqa: E402
+
+HEADERS = [
+    'employee_id', 'ssn', 'first_name', 'last_name', 'middle_name', 'dob',
+    'gender', 'address1', 'address2', 'city', 'state', 'zip', 'plan_code',
+    'coverage_start', 'coverage_end', 'relationship', 'subscriber_id',
+]
+
+
+def write_synthetic_csv(path: str, rows: int, extra_columns: int, seed: int = 834):
+    """Write a synthetic enrollment CSV with extra unmapped columns."""
+    rng = random.Random(seed)
+    headers = HEADERS + [f'hris_attr_{i}' for i in range(extra_columns)]
+    
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(headers)
+        for i in range(rows):
+            writer.writerow([
+                str(100000 + i),
+                f'{rng.randint(100, 899):03d}-{rng.randint(10, 99)}-{rng.randint(1000, 9999)}',
+                'John', 'Doe', 'Q',
+                f'{rng.randint(1, 12):02d}/{rng.randint(1, 28):02d}/{rng.randint(1950, 2005)}',
+                rng.choice(['Male', 'Female', 'M', 'F']),
+                '123 Main St', '', 'Springfield', 'IL', '62701',
+                rng.choice(['MED001', 'DENT001', 'VISION001']),
+                '01/01/2024', '12/31/2024',
+                rng.choice(['Employee', 'Spouse', 'Child']),
+                f'SUB{i}',
+            ] + ['x' * 8] * extra_columns)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=50000)
+    parser.add_argument('--extra-columns', type=int, default=40)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Processes parsing byte ranges of the file (default: 1)')
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'synthetic.csv')
+        write_synthetic_csv(path, args.rows, args.extra_columns)
+        
+        best = None
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            records = parse_csv(path, workers=args.workers)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        
+        assert len(records) == args.rows
+        print(f"parse_csv (workers={args.workers}): {args.rows} rows x {len(HEADERS) + args.extra_columns} columns "
+              f"in {best:.3f}s ({args.rows / best:,.0f} rows/sec)")
+
+
+if __name__ == '__main__':
+    main()
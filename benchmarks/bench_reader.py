@@ -0,0 +1,54 @@
+"""
+Benchmark EDI reader throughput (MB/s) for tokenizing, loop building,
+envelope validation and NDJSON conversion.
+
+Usage:
+    python benchmarks/bench_reader.py [--members N]
+"""
+
+import argparse
+import mmap
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from edi834.generator import write_834  # noqa: E402
+from edi834.reader import iter_members, iter_segments, validate_edi_file, write_ndjson  # noqa: E402
+from bench_segments import RECORD  # noqa: E402
+
+
+def timed(label, func, size):
+    start = time.perf_counter()
+    count = func()
+    elapsed = time.perf_counter() - start
+    print(f"{label}: {count} items in {elapsed:.3f}s ({size / elapsed / 1e6:,.1f} MB/s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--members', type=int, default=200000)
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.edi')
+        records = (dict(RECORD, employee_id=str(100000 + i)) for i in range(args.members))
+        write_834(records, path)
+        size = os.path.getsize(path)
+        print(f"file: {size / 1e6:,.1f} MB, {args.members} members")
+        
+        timed('segments (file)', lambda: sum(1 for _ in iter_segments(path)), size)
+        timed('members (file)', lambda: sum(1 for _ in iter_members(path)), size)
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            timed('segments (mmap)', lambda: sum(1 for _ in iter_segments(mapped)), size)
+        timed('validate_edi_file (mmap)', lambda: validate_edi_file(path)['segment_count'], size)
+        
+        for per in ('segment', 'member'):
+            with open(os.devnull, 'w') as out:
+                timed(f'write_ndjson per {per}', lambda: write_ndjson(path, out, per=per), size)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""
+Memory benchmark: bytes per parsed record, EnrollmentRecord vs dict.
+
+Usage:
+    python benchmarks/bench_record_memory.py [--rows N]
+"""
+
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from bench_parse import write_synthetic_csv  # noqa: E402
+from edi834.parser import parse_csv  # noqa: E402
+
+
+def traced_bytes(build):
+    """Return (result, bytes still allocated by build())."""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000)
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'synthetic.csv')
+        write_synthetic_csv(path, args.rows, extra_columns=0)
+        
+        records, record_bytes = traced_bytes(lambda: parse_csv(path))
+        
+        # Same records, converted to the previous dict representation
+        dicts, dict_bytes = traced_bytes(lambda: [r.to_dict() for r in parse_csv(path)])
+        
+        container_record = sys.getsizeof(records[0])
+        container_dict = sys.getsizeof(dicts[0])
+        
+        print(f"{'':<18}{'total bytes/record':>20}{'container bytes':>18}")
+        print(f"{'dict':<18}{dict_bytes / args.rows:>20,.0f}{container_dict:>18,}")
+        print(f"{'EnrollmentRecord':<18}{record_bytes / args.rows:>20,.0f}{container_record:>18,}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+Benchmark member loop rendering throughput (segments/sec).
+
+Usage:
+    python benchmarks/bench_segments.py [--members N]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from edi834.generator import EDI834Generator  # noqa: E402
+
+RECORD = {
+    'row_number': 2,
+    'employee_id': '12345',
+    'ssn': '111223333',
+    'first_name': 'John',
+    'last_name': 'Doe',
+    'middle_name': 'Q',
+    'dob': '19850115',
+    'gender': 'M',
+    'address1': '123 Main St',
+    'address2': 'Apt 4',
+    'city': 'Springfield',
+    'state': 'IL',
+    'zip': '62701-1234',
+    'plan_code': 'MED001',
+    'coverage_start': '20240101',
+    'coverage_end': '20241231',
+    'relationship': 'Employee',
+    'subscriber_id': 'SUB12345',
+    'relationship_code': '18',
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--members', type=int, default=200000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    
+    generator = EDI834Generator('SENDER', 'RECEIVER')
+    records = [dict(RECORD, employee_id=str(100000 + i)) for i in range(args.members)]
+    render = generator._generate_member_loop
+    
+    best = None
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        segments = 0
+        for record in records:
+            segments += render(record)[1]
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    
+    print(f"member loops: {args.members} members, {segments} segments in {best:.3f}s "
+          f"({segments / best:,.0f} segments/sec)")
+
+
+if __name__ == '__main__':
+    main()
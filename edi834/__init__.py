@@ -10,14 +10,20 @@ Author: Ritesh Rana
 __version__ = "1.0.0"
 __author__ = "Ritesh Rana"
 
-from .parser import parse_csv
+from .parser import parse_csv, iter_csv
 from .validator import validate_records
 from .generator import generate_834
-from .formatter import format_edi_segment
+from .formatter import format_edi_segment, Delimiters
+from .record import EnrollmentRecord
+from .errors import ParseErrorSink
 
 __all__ = [
     "parse_csv",
+    "iter_csv",
     "validate_records",
     "generate_834",
     "format_edi_segment",
+    "Delimiters",
+    "EnrollmentRecord",
+    "ParseErrorSink",
 ]
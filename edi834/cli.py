@@ -18,10 +18,14 @@ try:
 except ImportError:
     RICH_AVAILABLE = False
 
-from .parser import parse_csv, validate_csv_structure
+from .parser import scan_csv
 from .validator import validate_records, generate_validation_report, save_validation_report
-from .generator import generate_834
-from .formatter import pretty_print_edi, validate_edi_structure
+from .generator import write_834, write_834_files
+from .control import ControlNumberStore
+from .errors import ParseErrorSink
+from .layouts import HeaderLayoutCache
+from .formatter import Delimiters
+from .reader import validate_edi_file
 
 
 def main():
@@ -42,18 +46,30 @@ Examples:
   
   # Production mode (default is test)
   python -m edi834.cli --input data.csv --output out.edi --production
+  
+  # Render member loops on 4 processes
+  python -m edi834.cli --input data.csv --output out.edi --jobs 4
+  
+  # Split output into files of at most 5 MB, each with its own envelope
+  python -m edi834.cli --input data.csv --output "out_{n:04d}.edi" --max-bytes 5000000
+  
+  # Read a gzip'd export and write a gzip'd 834
+  python -m edi834.cli --input enrollment.csv.gz --output out.edi.gz
+  
+  # Pipe-separated elements, one segment per line
+  python -m edi834.cli --input data.csv --output out.edi --element-separator "|" --segment-terminator "\\n"
         """
     )
     
     parser.add_argument(
         '--input', '-i',
         required=True,
-        help='Input CSV file with enrollment data'
+        help='Input CSV file with enrollment data (may be .gz, .bz2 or .xz)'
     )
     
     parser.add_argument(
         '--output', '-o',
-        help='Output EDI 834 file path'
+        help='Output EDI 834 file path (.gz, .bz2 or .xz compresses the output)'
     )
     
     parser.add_argument(
@@ -92,6 +108,87 @@ Examples:
         help='Pretty print EDI output with line breaks'
     )
     
+    parser.add_argument(
+        '--jobs', '-j',
+        type=int,
+        default=1,
+        help='Number of processes used to parse the CSV and render member loops (default: 1)'
+    )
+    
+    parser.add_argument(
+        '--max-members-per-st',
+        type=int,
+        help='Start a new ST/SE transaction set after this many members'
+    )
+    
+    parser.add_argument(
+        '--max-st-per-gs',
+        type=int,
+        help='Start a new GS/GE functional group after this many transaction sets'
+    )
+    
+    parser.add_argument(
+        '--max-bytes',
+        type=int,
+        help='Split output into files of at most this many bytes (--output needs an {n} field)'
+    )
+    
+    parser.add_argument(
+        '--max-members',
+        type=int,
+        help='Split output into files of at most this many members (--output needs an {n} field)'
+    )
+    
+    parser.add_argument(
+        '--manifest',
+        help='Manifest path for split output (default: manifest.json next to the output files)'
+    )
+    
+    parser.add_argument(
+        '--control-store',
+        help='SQLite file used to allocate collision-free control numbers per sender/receiver'
+    )
+    
+    parser.add_argument(
+        '--element-separator',
+        default='*',
+        type=delimiter_arg,
+        help='Data element separator (default: *)'
+    )
+    
+    parser.add_argument(
+        '--segment-terminator',
+        default='~',
+        type=delimiter_arg,
+        help='Segment terminator; backslash escapes such as \\n are accepted (default: ~)'
+    )
+    
+    parser.add_argument(
+        '--component-separator',
+        default=':',
+        type=delimiter_arg,
+        help='Component element separator written to ISA16 (default: :)'
+    )
+    
+    parser.add_argument(
+        '--repetition-separator',
+        default='^',
+        type=delimiter_arg,
+        help='Repetition separator written to ISA11 (default: ^)'
+    )
+    
+    parser.add_argument(
+        '--header-cache',
+        help='SQLite file caching resolved CSV header layouts, so known layouts skip '
+             'header matching and unmapped columns are reported once per layout'
+    )
+    
+    parser.add_argument(
+        '--max-parse-errors',
+        type=int,
+        help='Stop as soon as this many CSV rows fail to parse (1 = fail fast; default: no limit)'
+    )
+    
     parser.add_argument(
         '--verbose', '-v',
         action='store_true',
@@ -100,6 +197,12 @@ Examples:
     
     args = parser.parse_args()
     
+    try:
+        delimiters = Delimiters(args.element_separator, args.segment_terminator,
+                                args.component_separator, args.repetition_separator)
+    except ValueError as e:
+        parser.error(str(e))
+    
     # Initialize console
     if RICH_AVAILABLE:
         console = Console()
@@ -115,9 +218,12 @@ Examples:
             print_error(console, f"Input file not found: {args.input}")
             return 1
         
-        # Step 1: Validate CSV structure
+        # Step 1: Validate CSV structure (parsed in the same pass as Step 2)
         print_step(console, "Step 1: Validating CSV structure")
-        csv_validation = validate_csv_structure(args.input)
+        parse_errors = ParseErrorSink(fail_after=args.max_parse_errors)
+        header_cache = HeaderLayoutCache(args.header_cache) if args.header_cache else None
+        csv_validation, records = scan_csv(args.input, workers=args.jobs, errors=parse_errors,
+                                           header_cache=header_cache)
         
         if not csv_validation['valid']:
             print_error(console, "CSV validation failed:")
@@ -133,12 +239,15 @@ Examples:
         
         # Step 2: Parse CSV
         print_step(console, "Step 2: Parsing enrollment data")
-        records = parse_csv(args.input)
+        for warning in csv_validation['warnings']:
+            print_info(console, f"Warning: {warning}")
+        if parse_errors.count:
+            print_info(console, f"Warning: {parse_errors.count} rows could not be parsed")
         print_success(console, f"Parsed {len(records)} enrollment records")
         
         # Step 3: Validate records
         print_step(console, "Step 3: Validating enrollment records")
-        validation_results = validate_records(records)
+        validation_results = validate_records(records, parse_errors=parse_errors)
         
         # Display validation results
         display_validation_results(console, validation_results, args.verbose)
@@ -170,43 +279,91 @@ Examples:
             print_error(console, "Output file required for EDI generation (use --output)")
             return 1
         
-        # Step 4: Generate EDI 834
+        # Step 4: Generate EDI 834, streaming segments straight to the output file
         print_step(console, "Step 4: Generating EDI 834 file")
         test_mode = not args.production
         
-        edi_content = generate_834(
-            records,
-            sender_id=args.sender,
-            receiver_id=args.receiver,
-            test_mode=test_mode
-        )
+        control_store = None
+        if args.control_store:
+            control_store = ControlNumberStore(args.control_store, args.sender, args.receiver)
         
-        # Pretty print if requested
-        if args.pretty:
-            edi_content = pretty_print_edi(edi_content)
-        
-        # Validate EDI structure
-        edi_validation = validate_edi_structure(edi_content)
-        if not edi_validation['valid']:
-            print_error(console, "Generated EDI structure validation failed:")
-            for error in edi_validation['errors']:
-                print_error(console, f"  - {error}")
+        generation_report = {}
+        split_output = args.max_bytes is not None or args.max_members is not None
+        if split_output and args.output.format(n=1) == args.output.format(n=2):
+            print_error(console, "--output must contain an {n} field (e.g. out_{n:04d}.edi) "
+                                 "when --max-bytes or --max-members is used")
             return 1
         
-        print_success(console, f"EDI 834 generated successfully ({edi_validation['segment_count']} segments)")
-        
-        # Step 5: Save output
-        print_step(console, "Step 5: Saving EDI file")
-        
         # Create output directory if it doesn't exist
         output_dir = os.path.dirname(args.output)
         if output_dir and not os.path.exists(output_dir):
             os.makedirs(output_dir)
         
-        with open(args.output, 'w', encoding='utf-8') as f:
-            f.write(edi_content)
+        if split_output:
+            manifest_path = args.manifest or os.path.join(output_dir, 'manifest.json')
+            manifest = write_834_files(
+                records,
+                args.output,
+                sender_id=args.sender,
+                receiver_id=args.receiver,
+                test_mode=test_mode,
+                max_bytes=args.max_bytes,
+                max_members=args.max_members,
+                manifest_path=manifest_path,
+                pretty=args.pretty,
+                workers=args.jobs,
+                max_members_per_st=args.max_members_per_st,
+                max_st_per_gs=args.max_st_per_gs,
+                control_store=control_store,
+                delimiters=delimiters,
+                report=generation_report
+            )
+            output_files = [entry['file'] for entry in manifest]
+            segment_count = sum(entry['segment_count'] for entry in manifest)
+            print_success(console, f"EDI 834 generated successfully ({segment_count} segments "
+                                   f"in {len(output_files)} files)")
+        else:
+            segment_count = write_834(
+                records,
+                args.output,
+                sender_id=args.sender,
+                receiver_id=args.receiver,
+                test_mode=test_mode,
+                pretty=args.pretty,
+                workers=args.jobs,
+                max_members_per_st=args.max_members_per_st,
+                max_st_per_gs=args.max_st_per_gs,
+                control_store=control_store,
+                delimiters=delimiters,
+                report=generation_report
+            )
+            output_files = [args.output]
+            print_success(console, f"EDI 834 generated successfully ({segment_count} segments)")
+        
+        if generation_report['escaped_values']:
+            print_info(console, f"Warning: {generation_report['escaped_values']} values contained delimiter "
+                                f"characters, which were replaced with spaces")
         
-        print_success(console, f"EDI file saved to: {args.output}")
+        # Step 5: Validate EDI structure of the saved files
+        print_step(console, "Step 5: Verifying EDI file")
+        
+        for output_file in output_files:
+            edi_validation = validate_edi_file(output_file, delimiters)
+            
+            if not edi_validation['valid']:
+                for path in output_files:
+                    os.remove(path)
+                if split_output and os.path.exists(manifest_path):
+                    os.remove(manifest_path)
+                print_error(console, f"Generated EDI structure validation failed ({output_file}):")
+                for error in edi_validation['errors']:
+                    print_error(console, f"  - {error}")
+                return 1
+        
+        for output_file in output_files:
+            print_success(console, f"EDI file saved to: {output_file}")
+        if split_output:
+            print_success(console, f"Manifest saved to: {manifest_path}")
         
         # Print summary
         print_summary(console, {
@@ -231,6 +388,14 @@ Examples:
         return 1
 
 
+def delimiter_arg(value: str) -> str:
+    """Decode backslash escapes (e.g. \\n, \\t, \\x1d) in a delimiter option."""
+    try:
+        return value.encode('latin-1', 'backslashreplace').decode('unicode_escape')
+    except UnicodeDecodeError:
+        raise argparse.ArgumentTypeError(f"invalid escape sequence: {value!r}")
+
+
 def print_header(console):
     """Print CLI header."""
     if console:
@@ -282,6 +447,14 @@ def display_validation_results(console, results, verbose=False):
     else:
         print_error(console, f"Validation failed: {results['invalid_records']} of {results['total_records']} records have errors")
         
+        parse_errors = results.get('parse_errors')
+        if parse_errors and parse_errors['count']:
+            print_error(console, f"{parse_errors['count']} rows could not be parsed")
+            if verbose:
+                for parse_error in parse_errors['errors'][:5]:
+                    column = f" ({parse_error['column']})" if parse_error['column'] else ''
+                    print_info(console, f"    - Row {parse_error['row_number']}{column}: {parse_error['reason']}")
+        
         if verbose and results['errors']:
             print_info(console, "\nValidation errors:")
             for error_entry in results['errors'][:5]:  # Show first 5
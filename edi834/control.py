@@ -0,0 +1,178 @@
+"""
+Persistent control number allocation for EDI 834 envelopes.
+
+Hands out monotonic ISA13 (interchange), GS06 (group) and ST02 (transaction
+set) control numbers per sender/receiver pair from a local SQLite database,
+so that separate runs and parallel generators never reuse a number.
+"""
+
+import os
+import sqlite3
+from typing import Dict
+
+
+# Largest value each control number may take before wrapping back to 1
+MAX_CONTROL_NUMBERS = {
+    'interchange': 999999999,       # ISA13: 9 digits
+    'group': 999999999,             # GS06: up to 9 digits
+    'transaction_set': 999999999,   # ST02: 4 to 9 digits
+}
+
+
+class ControlNumberStore:
+    """
+    SQLite-backed allocator of envelope control numbers.
+    
+    Every reservation runs in its own IMMEDIATE transaction, which takes the
+    database write lock, so concurrent processes allocating from the same
+    file receive disjoint, increasing numbers. A block of numbers can be
+    reserved in one transaction to keep lock traffic low.
+    """
+    
+    def __init__(self, path: str, sender_id: str = 'SENDER', receiver_id: str = 'RECEIVER',
+                 timeout: float = 30.0):
+        """
+        Open (or create) a control number store.
+        
+        Args:
+            path: Path of the SQLite database file
+            sender_id: Sender identifier the numbers belong to
+            receiver_id: Receiver identifier the numbers belong to
+            timeout: Seconds to wait for another process holding the lock
+        """
+        self.path = path
+        self.sender_id = sender_id
+        self.receiver_id = receiver_id
+        self.timeout = timeout
+        
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        
+        connection = self._connect()
+        try:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS control_numbers ("
+                " sender_id TEXT NOT NULL,"
+                " receiver_id TEXT NOT NULL,"
+                " kind TEXT NOT NULL,"
+                " last_value INTEGER NOT NULL,"
+                " PRIMARY KEY (sender_id, receiver_id, kind))"
+            )
+        finally:
+            connection.close()
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection in autocommit mode so transactions are explicit."""
+        return sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+    
+    def reserve(self, kind: str, count: int = 1) -> int:
+        """
+        Atomically reserve a block of consecutive control numbers.
+        
+        Args:
+            kind: 'interchange', 'group' or 'transaction_set'
+            count: Number of control numbers to reserve
+            
+        Returns:
+            The first number of the block; the block is [first, first + count)
+            
+        Raises:
+            ValueError: If kind is unknown or count is out of range
+        """
+        if kind not in MAX_CONTROL_NUMBERS:
+            raise ValueError(f"Unknown control number kind: {kind}")
+        maximum = MAX_CONTROL_NUMBERS[kind]
+        if count < 1 or count > maximum:
+            raise ValueError(f"Invalid control number block size: {count}")
+        
+        key = (self.sender_id, self.receiver_id, kind)
+        connection = self._connect()
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            row = connection.execute(
+                "SELECT last_value FROM control_numbers"
+                " WHERE sender_id = ? AND receiver_id = ? AND kind = ?",
+                key
+            ).fetchone()
+            last_value = row[0] if row else 0
+            
+            first = last_value + 1
+            if first + count - 1 > maximum:
+                first = 1  # Wrap around rather than overflow the element width
+            
+            connection.execute(
+                "INSERT OR REPLACE INTO control_numbers (sender_id, receiver_id, kind, last_value)"
+                " VALUES (?, ?, ?, ?)",
+                key + (first + count - 1,)
+            )
+            connection.execute("COMMIT")
+        except BaseException:
+            if connection.in_transaction:
+                connection.execute("ROLLBACK")
+            raise
+        finally:
+            connection.close()
+        
+        return first
+    
+    def next_interchange(self) -> str:
+        """Allocate the next ISA13 interchange control number."""
+        return f"{self.reserve('interchange'):09d}"
+    
+    def next_group(self) -> str:
+        """Allocate the next GS06 group control number."""
+        return f"{self.reserve('group'):09d}"
+    
+    def next_transaction_set(self) -> str:
+        """Allocate the next ST02 transaction set control number."""
+        return f"{self.reserve('transaction_set'):04d}"
+    
+    def last_values(self) -> Dict[str, int]:
+        """Return the last allocated number of each kind for this sender/receiver pair."""
+        connection = self._connect()
+        try:
+            rows = connection.execute(
+                "SELECT kind, last_value FROM control_numbers WHERE sender_id = ? AND receiver_id = ?",
+                (self.sender_id, self.receiver_id)
+            ).fetchall()
+        finally:
+            connection.close()
+        return dict(rows)
+
+
+class ControlSequence:
+    """
+    Local cursor over blocks of control numbers reserved from a store.
+    
+    peek() shows the next number without using it; take() uses it. Blocks are
+    reserved from the store only when the current one runs out.
+    """
+    
+    def __init__(self, store: ControlNumberStore, kind: str, block_size: int = 1, width: int = 9):
+        """
+        Args:
+            store: Store to reserve numbers from
+            kind: 'interchange', 'group' or 'transaction_set'
+            block_size: How many numbers to reserve at a time
+            width: Zero-padded width of the formatted number
+        """
+        self.store = store
+        self.kind = kind
+        self.block_size = block_size
+        self.width = width
+        self._next = 0
+        self._end = 0
+    
+    def peek(self) -> str:
+        """Return the next control number without consuming it."""
+        if self._next >= self._end:
+            self._next = self.store.reserve(self.kind, self.block_size)
+            self._end = self._next + self.block_size
+        return f"{self._next:0{self.width}d}"
+    
+    def take(self) -> str:
+        """Consume and return the next control number."""
+        control = self.peek()
+        self._next += 1
+        return control
@@ -0,0 +1,78 @@
+"""
+Structured collection of CSV rows that could not be parsed.
+
+The parser records each dropped row here with its row number, the column
+that caused the failure and the reason, instead of printing a warning per
+row. validate_records() merges the collected errors into its report.
+"""
+
+from typing import Any, Dict, List, Optional
+
+
+class ParseError(ValueError):
+    """Raised when more rows fail to parse than a ParseErrorSink allows."""
+    
+    def __init__(self, message: str, errors: 'ParseErrorSink'):
+        super().__init__(message)
+        self.errors = errors
+
+
+class ParseErrorSink:
+    """
+    Bounded collector of parse errors.
+    
+    Every failed row is counted, but only the first max_errors are kept in
+    detail, so a file full of bad rows cannot exhaust memory. With fail_after
+    set, parsing stops with ParseError as soon as that many rows have failed.
+    """
+    
+    def __init__(self, max_errors: int = 100, fail_after: Optional[int] = None):
+        """
+        Create an empty sink.
+        
+        Args:
+            max_errors: Maximum number of errors kept in detail
+            fail_after: Raise ParseError once this many rows have failed
+                (1 = fail fast on the first bad row, None = never)
+        """
+        self.max_errors = max_errors
+        self.fail_after = fail_after
+        self.count = 0
+        self.errors: List[Dict[str, Any]] = []
+    
+    def add(self, row_number: int, reason: Any, column: Optional[str] = None) -> None:
+        """
+        Record a row that failed to parse.
+        
+        Args:
+            row_number: CSV row number (row 1 is headers)
+            reason: Exception or message describing the failure
+            column: Header of the column that caused the failure, if known
+        
+        Raises:
+            ParseError: If the fail_after threshold is reached
+        """
+        self.count += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({
+                'row_number': row_number,
+                'column': column,
+                'reason': str(reason),
+            })
+        
+        if self.fail_after is not None and self.count >= self.fail_after:
+            raise ParseError(f"Stopped after {self.count} rows failed to parse "
+                             f"(last: row {row_number}: {reason})", self)
+    
+    @property
+    def truncated(self) -> bool:
+        """Whether more errors occurred than were kept in detail."""
+        return self.count > len(self.errors)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the collected errors as a plain dictionary for reports."""
+        return {
+            'count': self.count,
+            'truncated': self.truncated,
+            'errors': list(self.errors),
+        }
@@ -4,8 +4,174 @@ EDI Formatter for generating properly formatted EDI segments.
 Handles formatting, padding, and delimiter management for EDI 834 files.
 """
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import json
+import re
+from functools import lru_cache
+from itertools import chain
+
+
+class Delimiters:
+    """
+    Separator characters used by one interchange.
+    
+    The characters are fixed for the life of the object, so everything that
+    depends on them (the escaping table, segment templates) is computed once
+    here or cached per instance by the caller.
+    
+    Example:
+        pipe = Delimiters(element='|', segment='\\n')
+    """
+    
+    def __init__(self, element: str = '*', segment: str = '~', component: str = ':', repetition: str = '^'):
+        """
+        Define a delimiter set.
+        
+        Args:
+            element: Data element separator (ISA position 4)
+            segment: Segment terminator
+            component: Component element separator (ISA16)
+            repetition: Repetition separator (ISA11)
+            
+        Raises:
+            ValueError: If a delimiter is not a single character, is
+                alphanumeric or a space, or is used for more than one role
+        """
+        chars = (element, segment, component, repetition)
+        for char in chars:
+            if not isinstance(char, str) or len(char) != 1:
+                raise ValueError(f"Delimiter must be a single character: {char!r}")
+            if char.isalnum() or char == ' ':
+                raise ValueError(f"Delimiter cannot be a letter, digit or space: {char!r}")
+        if len(set(chars)) != len(chars):
+            raise ValueError(f"Delimiters must be distinct: {chars!r}")
+        
+        self.element = element
+        self.segment = segment
+        self.component = component
+        self.repetition = repetition
+        # Delimiter characters in data are replaced with spaces
+        self.escape_table, self.escape_pattern = _escape_tables(chars)
+    
+    @classmethod
+    def from_isa(cls, header: str) -> 'Delimiters':
+        """
+        Detect the delimiters declared by an ISA interchange header.
+        
+        The element separator is the character after 'ISA', ISA16 holds the
+        component separator and the character following it terminates the
+        segment. ISA11 is the repetition separator in 5010; in older versions
+        it is a standards identifier, and an unused character is chosen.
+        
+        Args:
+            header: Text starting with the ISA segment (at least 106 characters
+                for a fixed-width header)
+        
+        Returns:
+            Delimiters declared by the header
+        
+        Raises:
+            ValueError: If the text does not start with a complete ISA segment
+        """
+        if not header.startswith('ISA') or len(header) < 4:
+            raise ValueError("EDI content does not start with an ISA segment")
+        
+        element = header[3]
+        fields = header.split(element, 16)
+        if len(fields) < 17 or len(fields[16]) < 2:
+            raise ValueError("ISA segment is truncated")
+        
+        component, segment = fields[16][0], fields[16][1]
+        repetition = fields[11]
+        if len(repetition) != 1 or repetition.isalnum() or repetition in (element, component, segment):
+            used = (element, component, segment)
+            repetition = next(char for char in '^!|\x1f' if char not in used)
+        return cls(element, segment, component, repetition)
+    
+    def __repr__(self) -> str:
+        return (f"Delimiters(element={self.element!r}, segment={self.segment!r}, "
+                f"component={self.component!r}, repetition={self.repetition!r})")
+    
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, Delimiters):
+            return NotImplemented
+        return self.key == other.key
+    
+    def __hash__(self) -> int:
+        return hash(self.key)
+    
+    @property
+    def key(self) -> tuple:
+        """(element, segment, component, repetition) tuple identifying this set."""
+        return (self.element, self.segment, self.component, self.repetition)
+    
+    @property
+    def line_terminated(self) -> bool:
+        """Whether segments already end lines, so pretty output must not add line breaks."""
+        return self.segment in '\r\n'
+
+
+@lru_cache(maxsize=None)
+def _escape_tables(chars: tuple) -> tuple:
+    """Translation table and detection pattern for a set of delimiter characters."""
+    table = str.maketrans({char: ' ' for char in chars})
+    pattern = re.compile('[' + re.escape(''.join(chars)) + ']')
+    return table, pattern
+
+
+DEFAULT_DELIMITERS = Delimiters()
+
+
+class DelimiterEscaper:
+    """
+    Replace delimiter characters in data values with spaces, counting changes.
+    
+    Most values contain no delimiter, so each value is first checked with a
+    precompiled character-class search (much cheaper than str.translate)
+    and returned as is; only the others are translated. The number of
+    values that had to be altered is kept in `altered`, so data quality can
+    be audited from the same pass that writes the file.
+    
+    Example:
+        escaper = DelimiterEscaper()
+        escaper.escape('Smith*Jones')  # 'Smith Jones'
+        escaper.altered                # 1
+    """
+    
+    def __init__(self, delimiters: Any = None):
+        """
+        Build an escaper.
+        
+        Args:
+            delimiters: Delimiters set, or iterable of characters to replace
+                (default: DEFAULT_DELIMITERS)
+        """
+        if delimiters is None:
+            delimiters = DEFAULT_DELIMITERS
+        if isinstance(delimiters, Delimiters):
+            self.table, pattern = delimiters.escape_table, delimiters.escape_pattern
+        else:
+            self.table, pattern = _escape_tables(tuple(delimiters))
+        self._search = pattern.search
+        self.altered = 0
+    
+    def escape(self, value: Any) -> str:
+        """
+        Escape one value.
+        
+        Args:
+            value: Value to escape (None becomes '')
+            
+        Returns:
+            Value as a string with delimiter characters replaced by spaces
+        """
+        if value is None:
+            return ''
+        value = str(value)
+        if self._search(value) is None:
+            return value
+        self.altered += 1
+        return value.translate(self.table)
 
 
 def format_edi_segment(segment_tag: str, elements: List[str], element_separator: str = '*', segment_terminator: str = '~') -> str:
@@ -31,6 +197,50 @@ def format_edi_segment(segment_tag: str, elements: List[str], element_separator:
     return segment + segment_terminator
 
 
+# Marker for a variable element in a SegmentTemplate
+SLOT = object()
+
+
+class SegmentTemplate:
+    """
+    Segment shape precompiled for one delimiter set.
+    
+    Fixed elements are baked into a format string once; only the variable
+    elements (marked with SLOT) are filled in per record. Filled values must
+    be strings (or other non-None values).
+    
+    Example:
+        ins = SegmentTemplate('INS', ['Y', SLOT, '021'])
+        ins.render('18')  # 'INS*Y*18*021~'
+    """
+    
+    def __init__(self, segment_tag: str, elements: List[Any], element_separator: str = '*',
+                 segment_terminator: str = '~'):
+        """
+        Compile a segment template.
+        
+        Args:
+            segment_tag: EDI segment identifier (e.g., 'INS')
+            elements: Segment elements; SLOT marks a value supplied at render time
+            element_separator: Character separating elements (default: *)
+            segment_terminator: Character terminating segment (default: ~)
+        """
+        def literal(text: str) -> str:
+            return text.replace('{', '{{').replace('}', '}}')
+        
+        parts = [literal(segment_tag)]
+        for elem in elements:
+            if elem is SLOT:
+                parts.append('{}')
+            else:
+                parts.append(literal(str(elem) if elem is not None else ''))
+        
+        self.segment_tag = segment_tag
+        self.slot_count = sum(1 for elem in elements if elem is SLOT)
+        self.template = literal(element_separator).join(parts) + literal(segment_terminator)
+        self.render = self.template.format
+
+
 def pad_field(value: str, length: int, pad_char: str = ' ', align: str = 'left') -> str:
     """
     Pad a field to a specific length.
@@ -58,7 +268,8 @@ def pad_field(value: str, length: int, pad_char: str = ' ', align: str = 'left')
 
 
 def format_isa_segment(sender_id: str, receiver_id: str, date: str, time: str, 
-                       control_number: str, test_indicator: str = 'T') -> str:
+                       control_number: str, test_indicator: str = 'T',
+                       delimiters: Optional[Delimiters] = None) -> str:
     """
     Format ISA (Interchange Control Header) segment.
     
@@ -69,10 +280,12 @@ def format_isa_segment(sender_id: str, receiver_id: str, date: str, time: str,
         time: Time in HHMM format
         control_number: Interchange control number
         test_indicator: T for test, P for production
+        delimiters: Delimiter set (default: DEFAULT_DELIMITERS)
         
     Returns:
         Formatted ISA segment
     """
+    delimiters = delimiters or DEFAULT_DELIMITERS
     elements = [
         '00',                           # I01: Authorization Info Qualifier
         pad_field('', 10),              # I02: Authorization Information
@@ -84,18 +297,19 @@ def format_isa_segment(sender_id: str, receiver_id: str, date: str, time: str,
         pad_field(receiver_id, 15),     # I08: Interchange Receiver ID
         date,                           # I09: Interchange Date
         time,                           # I10: Interchange Time
-        '^',                            # I11: Repetition Separator
+        delimiters.repetition,          # I11: Repetition Separator
         '00501',                        # I12: Interchange Control Version
         pad_field(control_number, 9, '0', 'right'),  # I13: Control Number
         '0',                            # I14: Acknowledgment Requested
         test_indicator,                 # I15: Usage Indicator
-        ':',                            # I16: Component Element Separator
+        delimiters.component,           # I16: Component Element Separator
     ]
     
-    return format_edi_segment('ISA', elements)
+    return format_edi_segment('ISA', elements, delimiters.element, delimiters.segment)
 
 
-def format_gs_segment(sender_code: str, receiver_code: str, date: str, time: str, control_number: str) -> str:
+def format_gs_segment(sender_code: str, receiver_code: str, date: str, time: str, control_number: str,
+                      delimiters: Optional[Delimiters] = None) -> str:
     """
     Format GS (Functional Group Header) segment.
     
@@ -105,10 +319,12 @@ def format_gs_segment(sender_code: str, receiver_code: str, date: str, time: str
         date: Date in YYYYMMDD format
         time: Time in HHMM or HHMMSS format
         control_number: Group control number
+        delimiters: Delimiter set (default: DEFAULT_DELIMITERS)
         
     Returns:
         Formatted GS segment
     """
+    delimiters = delimiters or DEFAULT_DELIMITERS
     elements = [
         'BE',                           # GS01: Functional Identifier Code
         sender_code,                    # GS02: Application Sender's Code
@@ -120,143 +336,177 @@ def format_gs_segment(sender_code: str, receiver_code: str, date: str, time: str
         '005010X220A1',                 # GS08: Version/Release/Industry ID
     ]
     
-    return format_edi_segment('GS', elements)
+    return format_edi_segment('GS', elements, delimiters.element, delimiters.segment)
 
 
-def format_st_segment(control_number: str) -> str:
+def format_st_segment(control_number: str, delimiters: Optional[Delimiters] = None) -> str:
     """
     Format ST (Transaction Set Header) segment.
     
     Args:
         control_number: Transaction set control number
+        delimiters: Delimiter set (default: DEFAULT_DELIMITERS)
         
     Returns:
         Formatted ST segment
     """
+    delimiters = delimiters or DEFAULT_DELIMITERS
     elements = [
         '834',                          # ST01: Transaction Set Identifier
         control_number,                 # ST02: Transaction Set Control Number
         '005010X220A1',                 # ST03: Implementation Convention Reference
     ]
     
-    return format_edi_segment('ST', elements)
+    return format_edi_segment('ST', elements, delimiters.element, delimiters.segment)
 
 
-def format_se_segment(segment_count: int, control_number: str) -> str:
+def format_se_segment(segment_count: int, control_number: str, delimiters: Optional[Delimiters] = None) -> str:
     """
     Format SE (Transaction Set Trailer) segment.
     
     Args:
         segment_count: Number of segments in the transaction set
         control_number: Transaction set control number
+        delimiters: Delimiter set (default: DEFAULT_DELIMITERS)
         
     Returns:
         Formatted SE segment
     """
+    delimiters = delimiters or DEFAULT_DELIMITERS
     elements = [
         str(segment_count),             # SE01: Number of Included Segments
         control_number,                 # SE02: Transaction Set Control Number
     ]
     
-    return format_edi_segment('SE', elements)
+    return format_edi_segment('SE', elements, delimiters.element, delimiters.segment)
 
 
-def format_ge_segment(transaction_count: int, control_number: str) -> str:
+def format_ge_segment(transaction_count: int, control_number: str, delimiters: Optional[Delimiters] = None) -> str:
     """
     Format GE (Functional Group Trailer) segment.
     
     Args:
         transaction_count: Number of transaction sets
         control_number: Group control number
+        delimiters: Delimiter set (default: DEFAULT_DELIMITERS)
         
     Returns:
         Formatted GE segment
     """
+    delimiters = delimiters or DEFAULT_DELIMITERS
     elements = [
         str(transaction_count),         # GE01: Number of Transaction Sets
         control_number,                 # GE02: Group Control Number
     ]
     
-    return format_edi_segment('GE', elements)
+    return format_edi_segment('GE', elements, delimiters.element, delimiters.segment)
 
 
-def format_iea_segment(group_count: int, control_number: str) -> str:
+def format_iea_segment(group_count: int, control_number: str, delimiters: Optional[Delimiters] = None) -> str:
     """
     Format IEA (Interchange Control Trailer) segment.
     
     Args:
         group_count: Number of functional groups
         control_number: Interchange control number
+        delimiters: Delimiter set (default: DEFAULT_DELIMITERS)
         
     Returns:
         Formatted IEA segment
     """
+    delimiters = delimiters or DEFAULT_DELIMITERS
     elements = [
         str(group_count),               # IEA01: Number of Functional Groups
         pad_field(control_number, 9, '0', 'right'),  # IEA02: Interchange Control Number
     ]
     
-    return format_edi_segment('IEA', elements)
+    return format_edi_segment('IEA', elements, delimiters.element, delimiters.segment)
 
 
-def pretty_print_edi(edi_content: str, segments_per_line: int = 1) -> str:
+def _content_delimiters(edi_content: str, delimiters: Optional[Delimiters]) -> Delimiters:
+    """Delimiters given, else those declared by the content's ISA header, else the defaults."""
+    if delimiters is not None:
+        return delimiters
+    try:
+        return Delimiters.from_isa(edi_content.lstrip())
+    except ValueError:
+        return DEFAULT_DELIMITERS
+
+
+def pretty_print_edi(edi_content: str, segments_per_line: int = 1,
+                     delimiters: Optional[Delimiters] = None) -> str:
     """
     Format EDI content for human readability.
     
     Args:
         edi_content: Raw EDI content
         segments_per_line: Number of segments per line
+        delimiters: Delimiter set (default: declared by the ISA header, or * ~ : ^)
         
     Returns:
         Formatted EDI string with line breaks
     """
-    segments = edi_content.split('~')
+    delimiters = _content_delimiters(edi_content, delimiters)
+    terminator = delimiters.segment
+    segments = edi_content.split(terminator)
     segments = [s for s in segments if s.strip()]  # Remove empty segments
     
+    # A line-break terminator already puts each segment on its own line
+    line_break = '' if delimiters.line_terminated else '\n'
+    
     lines = []
     for i in range(0, len(segments), segments_per_line):
         batch = segments[i:i + segments_per_line]
-        lines.append('~\n'.join(batch) + '~')
+        lines.append((terminator + line_break).join(batch) + terminator)
     
-    return '\n'.join(lines)
+    return line_break.join(lines)
 
 
-def edi_to_json(edi_content: str) -> str:
+def edi_to_json(edi_content: str, delimiters: Optional[Delimiters] = None) -> str:
     """
     Convert EDI content to JSON format for debugging.
     
+    Builds the whole document in memory; for large files stream NDJSON with
+    reader.write_ndjson instead.
+    
     Args:
         edi_content: Raw EDI content
+        delimiters: Delimiter set (default: declared by the ISA header, or * ~ : ^)
         
     Returns:
         JSON string representation of EDI structure
     """
-    segments = edi_content.split('~')
-    segments = [s for s in segments if s.strip()]
+    delimiters = _content_delimiters(edi_content, delimiters)
+    segments = edi_content.split(delimiters.segment)
+    segments = [s.strip() for s in segments if s.strip()]
     
     json_structure = []
     
     for segment in segments:
-        if '*' in segment:
-            parts = segment.split('*')
-            segment_tag = parts[0]
-            elements = parts[1:]
-            
-            json_structure.append({
-                'segment': segment_tag,
-                'elements': elements
-            })
+        # Segments without elements (e.g. LE) split to the tag alone
+        parts = segment.split(delimiters.element)
+        segment_tag = parts[0]
+        elements = parts[1:]
+        
+        json_structure.append({
+            'segment': segment_tag,
+            'elements': elements
+        })
     
     return json.dumps(json_structure, indent=2)
 
 
-def escape_delimiters(value: str, delimiters: List[str] = None) -> str:
+def escape_delimiters(value: str, delimiters: Any = None) -> str:
     """
     Escape EDI delimiters in text values.
     
+    Delimiter characters are replaced with spaces, since X12 has no escape
+    sequence. Use a DelimiterEscaper to also count altered values.
+    
     Args:
         value: Text value to escape
-        delimiters: List of delimiter characters to escape
+        delimiters: Delimiters set, or iterable of delimiter characters to
+            escape (default: DEFAULT_DELIMITERS)
         
     Returns:
         Escaped string
@@ -265,57 +515,228 @@ def escape_delimiters(value: str, delimiters: List[str] = None) -> str:
         return ''
     
     if delimiters is None:
-        delimiters = ['*', '~', ':']
+        delimiters = DEFAULT_DELIMITERS
+    if isinstance(delimiters, Delimiters):
+        table, pattern = delimiters.escape_table, delimiters.escape_pattern
+    else:
+        table, pattern = _escape_tables(tuple(delimiters))
     
     value = str(value)
-    for delimiter in delimiters:
-        # Replace delimiter with space or remove it
-        value = value.replace(delimiter, ' ')
-    
-    return value
+    if pattern.search(value) is None:
+        return value
+    return value.translate(table)
 
 
-def validate_edi_structure(edi_content: str) -> Dict[str, Any]:
+def validate_edi_structure(edi_content: str, delimiters: Optional[Delimiters] = None) -> Dict[str, Any]:
     """
-    Validate basic EDI structure.
+    Validate EDI envelope structure, counts and control numbers.
     
     Args:
         edi_content: EDI content to validate
+        delimiters: Delimiter set (default: declared by the ISA header, or * ~ : ^)
         
     Returns:
-        Dictionary with validation results
+        Dictionary with validation results (see check_envelope)
     """
+    return check_envelope(edi_content, _content_delimiters(edi_content, delimiters))
+
+
+# Envelope segments checked by check_envelope, in nesting order
+ENVELOPE_SEGMENTS = ('ISA', 'GS', 'ST', 'SE', 'GE', 'IEA')
+
+# Bytes copied at a time when counting segments inside a memory map
+_COUNT_WINDOW = 1024 * 1024
+
+
+def check_envelope(data: Any, delimiters: Optional[Delimiters] = None, max_errors: int = 100) -> Dict[str, Any]:
+    """
+    Check envelope nesting, trailer counts and control numbers in a single pass.
+    
+    SE01, GE01 and IEA01 are compared with the actual number of segments,
+    transaction sets and functional groups; SE02, GE02 and IEA02 must match
+    ST02, GS06 and ISA13, and ST02 must be unique within its group.
+    
+    Only the envelope segments (ISA, GS, ST, SE, GE, IEA) are located and
+    split; the segments between them are counted by counting terminators.
+    Apart from the error list (capped at max_errors), memory use does not
+    depend on the size of the input, so a memory-mapped file of any size can
+    be checked.
+    
+    Args:
+        data: EDI content as str, or a bytes-like object such as mmap.mmap
+        delimiters: Delimiter set (default: DEFAULT_DELIMITERS)
+        max_errors: Maximum number of errors recorded (all are counted)
+        
+    Returns:
+        Dictionary with validation results; errors carry their offset (in
+        bytes for bytes-like input) and error_details repeats them as dicts
+    """
+    delimiters = delimiters or DEFAULT_DELIMITERS
     result = {
         'valid': True,
         'errors': [],
+        'error_details': [],
+        'error_count': 0,
         'warnings': [],
         'segment_count': 0,
+        'group_count': 0,
+        'transaction_set_count': 0,
     }
     
-    # Remove newlines that may have been added by pretty print
-    edi_content = edi_content.replace('\n', '')
-    
-    segments = edi_content.split('~')
-    segments = [s for s in segments if s.strip()]
-    result['segment_count'] = len(segments)
-    
-    # Check for ISA header
-    if not segments or not segments[0].startswith('ISA'):
-        result['valid'] = False
-        result['errors'].append('Missing ISA header segment')
-    
-    # Check for IEA trailer
-    if not segments or not segments[-1].startswith('IEA'):
-        result['valid'] = False
-        result['errors'].append('Missing IEA trailer segment')
-    
-    # Check for required segments
-    segment_tags = [s.split('*')[0] for s in segments if '*' in s]
-    
-    required_segments = ['ISA', 'GS', 'ST', 'SE', 'GE', 'IEA']
-    for required in required_segments:
-        if required not in segment_tags:
-            result['valid'] = False
-            result['errors'].append(f'Missing required segment: {required}')
-    
+    is_text = isinstance(data, str)
+    terminator, separator = delimiters.segment, delimiters.element
+    tags = '|'.join(ENVELOPE_SEGMENTS)
+    # Anchoring on the terminator lets the regex engine skip ahead with a
+    # fast literal search; the first segment is matched separately
+    head = f'\\s*({tags}){re.escape(separator)}'
+    body = f'{re.escape(terminator)}[\\r\\n]*({tags}){re.escape(separator)}'
+    if not is_text:
+        terminator, separator = terminator.encode('utf-8'), separator.encode('utf-8')
+        head, body = head.encode('utf-8'), body.encode('utf-8')
+    first = re.compile(head).match(data)
+    matches = re.compile(body).finditer(data)
+    if first is not None:
+        matches = chain([first], matches)
+    
+    def count_segments(start, end):
+        if is_text:
+            return data.count(terminator, start, end)
+        total = 0
+        for position in range(start, end, _COUNT_WINDOW):
+            total += data[position:min(position + _COUNT_WINDOW, end)].count(terminator)
+        return total
+    
+    def error(message, offset, segment=None):
+        result['error_count'] += 1
+        if len(result['errors']) < max_errors:
+            result['errors'].append(f'{message} (offset {offset})' if offset is not None else message)
+            result['error_details'].append({'message': message, 'offset': offset, 'segment': segment})
+    
+    def number(value, name, offset):
+        try:
+            return int(value)
+        except ValueError:
+            error(f'{name} is not a number: {value!r}', offset, name[:-2])
+            return None
+    
+    def element(elements, position):
+        return elements[position].strip() if len(elements) > position else ''
+    
+    def pair(header, trailer, header_name, trailer_name, offset):
+        if header != trailer:
+            error(f'{trailer_name} {trailer!r} does not match {header_name} {header!r}', offset, trailer_name[:-2])
+    
+    seen = set()
+    interchange = group = transaction_set = None
+    groups_in_interchange = sets_in_group = segments_in_set = 0
+    set_controls = set()
+    previous_end = -len(terminator)
+    last_tag = None
+    starts_with_isa = False
+    
+    for match in matches:
+        tag = match.group(1)
+        if not is_text:
+            tag = tag.decode('ascii')
+        offset = match.start(1)
+        end = data.find(terminator, match.end())
+        if end < 0:
+            end = len(data)
+        value = data[match.end():end]
+        elements = (value if is_text else value.decode('utf-8', 'replace')).split(delimiters.element)
+        
+        skipped = count_segments(previous_end + len(terminator), offset)
+        previous_end = end
+        result['segment_count'] += skipped + 1
+        if last_tag is None:
+            starts_with_isa = tag == 'ISA' and not skipped
+        elif skipped and transaction_set is None:
+            error(f'{skipped} segment(s) outside a transaction set before {tag}', offset, tag)
+        segments_in_set += skipped
+        seen.add(tag)
+        last_tag = tag
+        
+        if tag == 'ISA':
+            if interchange is not None:
+                error('ISA before IEA closed the previous interchange', offset, tag)
+            interchange = elements
+            groups_in_interchange = 0
+        elif tag == 'GS':
+            if interchange is None:
+                error('GS outside an interchange', offset, tag)
+            if group is not None:
+                error('GS before GE closed the previous functional group', offset, tag)
+            group = elements
+            sets_in_group = 0
+            set_controls = set()
+            result['group_count'] += 1
+        elif tag == 'ST':
+            if group is None:
+                error('ST outside a functional group', offset, tag)
+            if transaction_set is not None:
+                error('ST before SE closed the previous transaction set', offset, tag)
+            transaction_set = elements
+            segments_in_set = 1
+            result['transaction_set_count'] += 1
+            control = element(elements, 1)
+            if control in set_controls:
+                error(f'ST02 {control!r} is repeated in the functional group', offset, tag)
+            set_controls.add(control)
+        elif tag == 'SE':
+            if transaction_set is None:
+                error('SE without a matching ST', offset, tag)
+            else:
+                segments_in_set += 1
+                declared = number(elements[0], 'SE01', offset)
+                if declared is not None and declared != segments_in_set:
+                    error(f'SE01 is {declared} but the transaction set has {segments_in_set} segments',
+                          offset, tag)
+                pair(element(transaction_set, 1), element(elements, 1), 'ST02', 'SE02', offset)
+            transaction_set = None
+            sets_in_group += 1
+        elif tag == 'GE':
+            if transaction_set is not None:
+                error('GE before SE closed the transaction set', offset, tag)
+                transaction_set = None
+            if group is None:
+                error('GE without a matching GS', offset, tag)
+            else:
+                declared = number(elements[0], 'GE01', offset)
+                if declared is not None and declared != sets_in_group:
+                    error(f'GE01 is {declared} but the functional group has {sets_in_group} transaction sets',
+                          offset, tag)
+                pair(element(group, 5), element(elements, 1), 'GS06', 'GE02', offset)
+            group = None
+            groups_in_interchange += 1
+        elif tag == 'IEA':
+            if group is not None:
+                error('IEA before GE closed the functional group', offset, tag)
+                group = None
+            if interchange is None:
+                error('IEA without a matching ISA', offset, tag)
+            else:
+                declared = number(elements[0], 'IEA01', offset)
+                if declared is not None and declared != groups_in_interchange:
+                    error(f'IEA01 is {declared} but the interchange has {groups_in_interchange} functional groups',
+                          offset, tag)
+                pair(element(interchange, 12), element(elements, 1), 'ISA13', 'IEA02', offset)
+            interchange = None
+    
+    # Segments after the last envelope segment, and any unterminated tail
+    trailing = count_segments(previous_end + len(terminator), len(data))
+    result['segment_count'] += trailing
+    tail = data[data.rfind(terminator) + len(terminator):] if len(data) else data
+    if tail.strip():
+        result['segment_count'] += 1
+        error('Last segment is not terminated', len(data) - len(tail))
+    
+    if not starts_with_isa:
+        error('Missing ISA header segment', None)
+    if last_tag != 'IEA' or trailing or tail.strip():
+        error('Missing IEA trailer segment', None)
+    for required in ENVELOPE_SEGMENTS:
+        if required not in seen:
+            error(f'Missing required segment: {required}', None)
+    
+    result['valid'] = result['error_count'] == 0
     return result
@@ -4,8 +4,13 @@ EDI 834 Generator for creating ANSI X12 834 benefit enrollment files.
 Transforms validated enrollment records into compliant EDI 834 format.
 """
 
-from typing import List, Dict, Any
+import json
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Optional, TextIO
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from functools import lru_cache
+from itertools import islice
 from .formatter import (
     format_edi_segment,
     format_isa_segment,
@@ -14,10 +19,15 @@ from .formatter import (
     format_se_segment,
     format_ge_segment,
     format_iea_segment,
-    escape_delimiters,
-    pad_field
+    pad_field,
+    SegmentTemplate,
+    SLOT,
+    Delimiters,
+    DelimiterEscaper,
+    DEFAULT_DELIMITERS,
 )
-from .utils import generate_control_number, format_date, format_time
+from .control import ControlNumberStore, ControlSequence
+from .utils import generate_control_number, format_date, format_time, open_file
 
 
 class EDI834Generator:
@@ -25,7 +35,10 @@ class EDI834Generator:
     Generator class for creating EDI 834 benefit enrollment files.
     """
     
-    def __init__(self, sender_id: str = 'SENDER', receiver_id: str = 'RECEIVER', test_mode: bool = True):
+    def __init__(self, sender_id: str = 'SENDER', receiver_id: str = 'RECEIVER', test_mode: bool = True,
+                 workers: int = 1, chunk_size: int = 1000, max_members_per_st: Optional[int] = None,
+                 max_st_per_gs: Optional[int] = None, control_store: Optional[ControlNumberStore] = None,
+                 delimiters: Optional[Delimiters] = None):
         """
         Initialize the EDI 834 generator.
         
@@ -33,77 +46,336 @@ class EDI834Generator:
             sender_id: Sender identifier (up to 15 chars)
             receiver_id: Receiver identifier (up to 15 chars)
             test_mode: Whether to generate test or production file
+            workers: Number of processes rendering member loops (1 = serial)
+            chunk_size: Records per chunk handed to a worker process
+            max_members_per_st: Start a new ST/SE transaction set after this many
+                members (None = one transaction set for all members)
+            max_st_per_gs: Start a new GS/GE functional group after this many
+                transaction sets (None = one functional group)
+            control_store: Optional ControlNumberStore to allocate collision-free
+                ISA13/GS06/ST02 numbers from (default: derived from the clock)
+            delimiters: Delimiter set written to ISA and used for every segment
+                (default: * ~ : ^)
         """
         self.sender_id = sender_id[:15]
         self.receiver_id = receiver_id[:15]
         self.test_indicator = 'T' if test_mode else 'P'
-        self.control_number = generate_control_number(length=9)
+        self.control_store = control_store
+        if control_store is not None:
+            self.control_number = control_store.next_interchange()
+            self._group_sequence = ControlSequence(control_store, 'group')
+            # ST02 only has to be unique within its group; reserve in blocks to limit lock traffic
+            self._transaction_sequence = ControlSequence(control_store, 'transaction_set', block_size=100, width=4)
+        else:
+            self.control_number = generate_control_number(length=9)
         self.transaction_count = 0
+        self.group_count = 0
+        self.workers = max(1, workers or 1)
+        self.chunk_size = max(1, chunk_size)
+        self.max_members_per_st = max_members_per_st
+        self.max_st_per_gs = max_st_per_gs
+        self.member_count = 0
+        self.group_controls = []
+        self.transaction_controls = []
+        self._first_transaction_control = int(generate_control_number(length=4))
+        self.delimiters = delimiters or DEFAULT_DELIMITERS
+        self._member_templates = _member_templates(self.delimiters)
+        self._escaper = DelimiterEscaper(self.delimiters)
     
-    def generate(self, records: List[Dict[str, Any]]) -> str:
+    def generate(self, records: Iterable[Dict[str, Any]]) -> str:
         """
         Generate EDI 834 file from enrollment records.
         
         Args:
-            records: List of validated enrollment records
+            records: List or iterable of validated enrollment records (consumed once)
             
         Returns:
             Complete EDI 834 file content
         """
-        segments = []
+        return ''.join(self.iter_segments(records))
+    
+    def generate_to(self, fileobj: TextIO, records: Iterable[Dict[str, Any]], pretty: bool = False) -> int:
+        """
+        Write EDI 834 content to a text file object as segments are produced.
         
-        # Generate header segments
-        segments.extend(self._generate_header())
+        Member loops are written as soon as they are rendered, so memory use
+        does not grow with the size of the output.
         
-        # Generate enrollment data
-        segments.extend(self._generate_transaction_set(records))
+        Args:
+            fileobj: Writable text file object
+            records: List or iterable of validated enrollment records (consumed once)
+            pretty: Put each segment on its own line (same layout as pretty_print_edi)
+            
+        Returns:
+            Number of segments written
+        """
+        count = 0
+        write = fileobj.write
+        pretty = pretty and not self.delimiters.line_terminated
+        for segment in self.iter_segments(records):
+            if pretty and count:
+                write('\n')
+            write(segment)
+            count += 1
+        return count
+    
+    def iter_segments(self, records: Iterable[Dict[str, Any]]) -> Iterator[str]:
+        """
+        Yield every segment of the EDI 834 file in order.
         
-        # Generate trailer segments
-        segments.extend(self._generate_trailer())
+        Members are split across transaction sets and functional groups
+        according to max_members_per_st and max_st_per_gs.
         
-        return ''.join(segments)
+        Args:
+            records: List or iterable of validated enrollment records (consumed once)
+            
+        Yields:
+            Formatted segment strings, including terminators
+        """
+        return self._iter_interchange(_Pushback(self._render_members(records)))
     
-    def _generate_header(self) -> List[str]:
-        """Generate ISA and GS header segments."""
-        segments = []
+    def generate_files(self, records: Iterable[Dict[str, Any]], output_pattern: str,
+                       max_bytes: Optional[int] = None, max_members: Optional[int] = None,
+                       pretty: bool = False, buffer_size: int = 1024 * 1024) -> List[Dict[str, Any]]:
+        """
+        Stream enrollment records into one or more size-bounded EDI files.
+        
+        Each file is a complete ISA..IEA interchange with its own control
+        number. A new file is started before a member loop that would push the
+        current file past max_bytes (including its closing trailers) or
+        max_members. A single member larger than max_bytes still gets a file
+        of its own.
+        
+        Args:
+            records: List or iterable of validated enrollment records (consumed once)
+            output_pattern: Output path with an {n} field for the 1-based file
+                number, e.g. 'out_{n:04d}.edi'
+            max_bytes: Maximum size of each file in bytes (before compression)
+            max_members: Maximum number of members in each file
+            pretty: Put each segment on its own line
+            buffer_size: Write buffer size in bytes
+            
+        Returns:
+            Manifest entries, one per file, with the file path, member range,
+            counts and control numbers
+        """
+        members = _Pushback(self._render_members(records))
+        next_control = int(self.control_number)
+        pretty = pretty and not self.delimiters.line_terminated
+        separator_bytes = 1 if pretty else 0
+        manifest = []
+        first_member = 1
+        
+        while not manifest or not members.exhausted():
+            file_number = len(manifest) + 1
+            output_path = output_pattern.format(n=file_number)
+            if file_number > 1:
+                if self.control_store is not None:
+                    self.control_number = self.control_store.next_interchange()
+                else:
+                    self.control_number = f"{next_control % 1000000000:09d}"
+            written = {'bytes': 0, 'segments': 0}
+            
+            def size(segments):
+                return sum(len(s.encode('utf-8')) for s in segments) + separator_bytes * len(segments)
+            
+            def fits(added, closing):
+                if max_members is not None and self.member_count >= max_members:
+                    return False
+                if max_bytes is not None and written['bytes'] + size(added) + size(closing) > max_bytes:
+                    return False
+                return True
+            
+            # newline='' writes '\n' as is on every platform, so byte counts match the file
+            with open_file(output_path, 'w', encoding='utf-8', newline='', buffering=buffer_size) as f:
+                for segment in self._iter_interchange(members, fits):
+                    if pretty and written['segments']:
+                        f.write('\n')
+                        written['bytes'] += separator_bytes
+                    f.write(segment)
+                    written['bytes'] += len(segment.encode('utf-8'))
+                    written['segments'] += 1
+            
+            manifest.append({
+                'file': output_path,
+                'first_member': first_member if self.member_count else None,
+                'last_member': first_member + self.member_count - 1 if self.member_count else None,
+                'member_count': self.member_count,
+                'segment_count': written['segments'],
+                'bytes': written['bytes'],
+                'interchange_control_number': self.control_number,
+                'group_control_numbers': list(self.group_controls),
+                'transaction_set_control_numbers': list(self.transaction_controls),
+            })
+            first_member += self.member_count
+            # GS06 counts up from ISA13, so the next file starts after the last group number used
+            next_control = int(self.control_number) + max(self.group_count, 1)
+        
+        return manifest
+    
+    @property
+    def escaped_values(self) -> int:
+        """Number of data values so far that had delimiter characters replaced."""
+        return self._escaper.altered
+    
+    def _iter_interchange(self, members: '_Pushback', fits: Optional[Callable] = None) -> Iterator[str]:
+        """
+        Yield one ISA..IEA interchange from an iterator of rendered members.
+        
+        If fits is given it is called before each member after the first as
+        fits(segments_to_add, closing_segments). When it returns False the
+        member is pushed back onto members and the interchange is closed.
+        """
+        self.transaction_count = 0
+        self.group_count = 0
+        self.member_count = 0
+        self.group_controls = []
+        self.transaction_controls = []
+        self._first_transaction_control = int(generate_control_number(length=4))
+        
+        # ISA - Interchange Control Header
+        yield self._generate_isa()
         
-        # Current date and time
+        sets_in_group = 0
+        group_control = self._open_group()
+        yield self._generate_gs(group_control)
+        
+        members_in_set = 0
+        transaction_control = self._open_transaction_set()
+        header = self._transaction_set_header(transaction_control)
+        segment_count = len(header)
+        yield from header
+        
+        # Generate member (2000) loops for each enrollment record
+        for rendered in members:
+            member_segments, member_count = rendered
+            
+            # Segments needed before this member, and the state they lead to
+            pending = []
+            next_sets_in_group, next_group_control = sets_in_group, group_control
+            next_transaction_control, next_segment_count = transaction_control, segment_count
+            new_group = False
+            if self.max_members_per_st and members_in_set >= self.max_members_per_st:
+                # SE - close the full transaction set
+                pending.append(format_se_segment(segment_count + 1, transaction_control, self.delimiters))
+                next_sets_in_group += 1
+                
+                if self.max_st_per_gs and next_sets_in_group >= self.max_st_per_gs:
+                    pending.append(format_ge_segment(next_sets_in_group, group_control, self.delimiters))
+                    next_sets_in_group = 0
+                    next_group_control = self._peek_group_control()
+                    pending.append(self._generate_gs(next_group_control))
+                    new_group = True
+                
+                next_transaction_control = self._peek_transaction_control()
+                header = self._transaction_set_header(next_transaction_control)
+                pending.extend(header)
+                next_segment_count = len(header)
+            
+            if fits is not None and self.member_count:
+                closing = [
+                    format_se_segment(next_segment_count + member_count + 1, next_transaction_control, self.delimiters),
+                    format_ge_segment(next_sets_in_group + 1, next_group_control, self.delimiters),
+                    format_iea_segment(self.group_count + new_group, self.control_number, self.delimiters),
+                ]
+                if not fits(pending + member_segments, closing):
+                    members.push(rendered)
+                    break
+            
+            if pending:
+                if new_group:
+                    self._open_group()
+                self._open_transaction_set()
+                sets_in_group, group_control = next_sets_in_group, next_group_control
+                transaction_control = next_transaction_control
+                members_in_set = 0
+                yield from pending
+            
+            yield from member_segments
+            segment_count = next_segment_count + member_count
+            members_in_set += 1
+            self.member_count += 1
+        
+        # SE - Transaction Set Trailer (counts itself)
+        yield format_se_segment(segment_count + 1, transaction_control, self.delimiters)
+        sets_in_group += 1
+        
+        # GE - Functional Group Trailer
+        yield format_ge_segment(sets_in_group, group_control, self.delimiters)
+        
+        # IEA - Interchange Control Trailer
+        yield self._generate_iea()
+    
+    def _generate_isa(self) -> str:
+        """Generate the ISA interchange control header segment."""
         current_date = datetime.now()
         isa_date = current_date.strftime('%y%m%d')  # YYMMDD for ISA
         isa_time = current_date.strftime('%H%M')    # HHMM for ISA
-        gs_date = current_date.strftime('%Y%m%d')   # YYYYMMDD for GS
-        gs_time = current_date.strftime('%H%M')     # HHMM for GS
         
-        # ISA - Interchange Control Header
-        segments.append(format_isa_segment(
+        return format_isa_segment(
             self.sender_id,
             self.receiver_id,
             isa_date,
             isa_time,
             self.control_number,
-            self.test_indicator
-        ))
+            self.test_indicator,
+            self.delimiters
+        )
+    
+    def _generate_gs(self, group_control: str) -> str:
+        """Generate a GS functional group header segment."""
+        current_date = datetime.now()
+        gs_date = current_date.strftime('%Y%m%d')   # YYYYMMDD for GS
+        gs_time = current_date.strftime('%H%M')     # HHMM for GS
         
-        # GS - Functional Group Header
-        segments.append(format_gs_segment(
+        return format_gs_segment(
             self.sender_id,
             self.receiver_id,
             gs_date,
             gs_time,
-            self.control_number
-        ))
-        
-        return segments
+            group_control,
+            self.delimiters
+        )
+    
+    def _peek_group_control(self) -> str:
+        """GS06 for the next functional group, without opening it."""
+        if self.control_store is not None:
+            return self._group_sequence.peek()
+        # Count up from the interchange control number
+        return f"{(int(self.control_number) + self.group_count) % 1000000000:09d}"
     
-    def _generate_transaction_set(self, records: List[Dict[str, Any]]) -> List[str]:
-        """Generate ST, BGN, and enrollment loop segments."""
+    def _open_group(self) -> str:
+        """Start a new functional group and return its control number."""
+        if self.control_store is not None:
+            control = self._group_sequence.take()
+        else:
+            control = self._peek_group_control()
+        self.group_count += 1
+        self.group_controls.append(control)
+        return control
+    
+    def _peek_transaction_control(self) -> str:
+        """ST02 for the next transaction set, without opening it."""
+        if self.control_store is not None:
+            return self._transaction_sequence.peek()
+        return f"{self._first_transaction_control + self.transaction_count:04d}"
+    
+    def _open_transaction_set(self) -> str:
+        """Start a new transaction set and return its ST02 control number."""
+        if self.control_store is not None:
+            control = self._transaction_sequence.take()
+        else:
+            control = self._peek_transaction_control()
+        self.transaction_count += 1
+        self.transaction_controls.append(control)
+        return control
+    
+    def _transaction_set_header(self, transaction_control: str) -> List[str]:
+        """Generate ST, BGN, REF, DTP and sponsor loop segments opening a transaction set."""
         segments = []
-        segment_count = 0
         
         # ST - Transaction Set Header
-        transaction_control = generate_control_number(length=4)
-        segments.append(format_st_segment(transaction_control))
-        segment_count += 1
+        segments.append(format_st_segment(transaction_control, self.delimiters))
         
         # BGN - Beginning Segment
         current_date = datetime.now()
@@ -120,38 +392,54 @@ class EDI834Generator:
             '',                         # Transaction Type
             '4',                        # Action Code (Change)
         ]
-        segments.append(format_edi_segment('BGN', bgn_elements))
-        segment_count += 1
+        segments.append(self._format_segment('BGN', bgn_elements))
         
         # REF - Reference Identification (optional, for transaction reference)
         ref_elements = ['38', transaction_control]  # 38 = Employer's ID
-        segments.append(format_edi_segment('REF', ref_elements))
-        segment_count += 1
+        segments.append(self._format_segment('REF', ref_elements))
         
         # DTP - File Effective Date
         dtp_elements = ['007', 'D8', bgn_date]  # 007 = Effective Date
-        segments.append(format_edi_segment('DTP', dtp_elements))
-        segment_count += 1
+        segments.append(self._format_segment('DTP', dtp_elements))
         
         # Generate sponsor (1000A) loop
         sponsor_segments, sponsor_count = self._generate_sponsor_loop()
         segments.extend(sponsor_segments)
-        segment_count += sponsor_count
-        
-        # Generate member (2000) loops for each enrollment record
-        for record in records:
-            member_segments, member_count = self._generate_member_loop(record)
-            segments.extend(member_segments)
-            segment_count += member_count
-        
-        # SE - Transaction Set Trailer
-        segment_count += 1  # Count the SE segment itself
-        segments.append(format_se_segment(segment_count, transaction_control))
-        
-        self.transaction_count = 1
         
         return segments
     
+    def _render_members(self, records: Iterable[Dict[str, Any]]) -> Iterator[tuple]:
+        """
+        Render member loops in input order as (segments, count) pairs.
+        
+        With more than one worker, chunks of records are rendered in a process
+        pool. At most two chunks per worker are in flight, and results are
+        yielded in submission order, so output matches serial mode exactly.
+        """
+        if self.workers == 1:
+            for record in records:
+                yield self._generate_member_loop(record)
+            return
+        
+        records = iter(records)
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            pending = deque()
+            while True:
+                while len(pending) < self.workers * 2:
+                    chunk = list(islice(records, self.chunk_size))
+                    if not chunk:
+                        break
+                    pending.append(executor.submit(_render_member_chunk, self, chunk))
+                if not pending:
+                    break
+                rendered, altered = pending.popleft().result()
+                self._escaper.altered += altered
+                yield from rendered
+    
+    def _format_segment(self, segment_tag: str, elements: List[str]) -> str:
+        """Format a segment with this generator's delimiters."""
+        return format_edi_segment(segment_tag, elements, self.delimiters.element, self.delimiters.segment)
+    
     def _generate_sponsor_loop(self) -> tuple:
         """Generate 1000A sponsor loop segments."""
         segments = []
@@ -169,161 +457,255 @@ class EDI834Generator:
             'FI',                       # ID Code Qualifier (Federal Taxpayer ID)
             self.sender_id,             # Identification Code
         ]
-        segments.append(format_edi_segment('NM1', nm1_elements))
+        segments.append(self._format_segment('NM1', nm1_elements))
         count += 1
         
         return segments, count
     
     def _generate_member_loop(self, record: Dict[str, Any]) -> tuple:
         """Generate 2000 member loop segments."""
+        t = self._member_templates
+        escape = self._escaper.escape
         segments = []
-        count = 0
         
         # INS - Insured Benefit
-        ins_elements = [
-            'Y',                                    # Yes/No (Y = Info in this TS applies to person)
-            record.get('relationship_code', '18'),  # Relationship Code
-            '021',                                  # Maintenance Type Code (021 = Change)
-            '01',                                   # Maintenance Reason (01 = Change in ID Card)
-            'A',                                    # Benefit Status (A = Active)
-            '',                                     # Medicare Plan Code
-            '',                                     # COBRA Qualifier
-            'FT',                                   # Employment Status (FT = Full Time)
-        ]
-        segments.append(format_edi_segment('INS', ins_elements))
-        count += 1
+        segments.append(t.ins(record.get('relationship_code', '18') or ''))
         
         # REF - Subscriber ID
-        if record.get('subscriber_id') or record.get('employee_id'):
-            ref_elements = [
-                '0F',                               # Reference ID Qualifier (Subscriber Number)
-                escape_delimiters(record.get('subscriber_id') or record.get('employee_id')),
-            ]
-            segments.append(format_edi_segment('REF', ref_elements))
-            count += 1
+        subscriber_id = record.get('subscriber_id') or record.get('employee_id')
+        if subscriber_id:
+            segments.append(t.ref_subscriber(escape(subscriber_id)))
         
         # REF - Member Policy Number (optional)
         if record.get('employee_id'):
-            ref_elements = [
-                '1L',                               # Group/Policy Number
-                escape_delimiters(record.get('employee_id')),
-            ]
-            segments.append(format_edi_segment('REF', ref_elements))
-            count += 1
+            segments.append(t.ref_policy(escape(record['employee_id'])))
         
         # DTP - Member Level Dates
-        if record.get('coverage_start'):
-            dtp_elements = [
-                '348',                              # Benefit Begin Date
-                'D8',                               # Date Format
-                record['coverage_start'],
-            ]
-            segments.append(format_edi_segment('DTP', dtp_elements))
-            count += 1
+        coverage_start = record.get('coverage_start')
+        if coverage_start:
+            segments.append(t.dtp_begin(coverage_start))
         
         if record.get('coverage_end'):
-            dtp_elements = [
-                '349',                              # Benefit End Date
-                'D8',
-                record['coverage_end'],
-            ]
-            segments.append(format_edi_segment('DTP', dtp_elements))
-            count += 1
+            segments.append(t.dtp_end(record['coverage_end']))
         
         # NM1 - Member Name (2100A)
-        nm1_elements = [
-            'IL',                                   # Entity Identifier (Insured/Subscriber)
-            '1',                                    # Entity Type (Person)
-            escape_delimiters(record.get('last_name', '')),
-            escape_delimiters(record.get('first_name', '')),
-            escape_delimiters(record.get('middle_name', '')),
-            '',                                     # Prefix
-            '',                                     # Suffix
-            '34',                                   # ID Code Qualifier (SSN)
-            record.get('ssn', ''),
-        ]
-        segments.append(format_edi_segment('NM1', nm1_elements))
-        count += 1
+        segments.append(t.nm1(
+            escape(record.get('last_name', '')),
+            escape(record.get('first_name', '')),
+            escape(record.get('middle_name', '')),
+            record.get('ssn', '') or '',
+        ))
         
         # N3 - Member Address
         if record.get('address1'):
-            n3_elements = [
-                escape_delimiters(record['address1']),
-                escape_delimiters(record.get('address2', '')),
-            ]
-            segments.append(format_edi_segment('N3', n3_elements))
-            count += 1
+            segments.append(t.n3(
+                escape(record['address1']),
+                escape(record.get('address2', '')),
+            ))
         
         # N4 - Member City/State/ZIP
         if record.get('city') or record.get('state') or record.get('zip'):
-            n4_elements = [
-                escape_delimiters(record.get('city', '')),
+            segments.append(t.n4(
+                escape(record.get('city', '')),
                 record.get('state', '').upper(),
                 record.get('zip', '').split('-')[0] if record.get('zip') else '',
-            ]
-            segments.append(format_edi_segment('N4', n4_elements))
-            count += 1
+            ))
         
         # DMG - Demographic Information
         if record.get('dob') or record.get('gender'):
-            dmg_elements = [
-                'D8',                               # Date Format
-                record.get('dob', ''),
-                record.get('gender', 'U'),
-            ]
-            segments.append(format_edi_segment('DMG', dmg_elements))
-            count += 1
+            segments.append(t.dmg(record.get('dob', '') or '', record.get('gender', 'U') or ''))
         
         # HD - Health Coverage (2300)
         if record.get('plan_code'):
-            hd_elements = [
-                '021',                              # Maintenance Type Code
-                '',                                 # Maintenance Reason
-                'HLT',                              # Insurance Line Code (Health)
-                escape_delimiters(record.get('plan_code', '')),
-                'EMP',                              # Coverage Level (Employee Only)
-            ]
-            segments.append(format_edi_segment('HD', hd_elements))
-            count += 1
+            segments.append(t.hd(escape(record['plan_code'])))
             
             # DTP - Health Coverage Dates
-            if record.get('coverage_start'):
-                dtp_elements = [
-                    '348',                          # Coverage Begin
-                    'D8',
-                    record['coverage_start'],
-                ]
-                segments.append(format_edi_segment('DTP', dtp_elements))
-                count += 1
+            if coverage_start:
+                segments.append(t.dtp_begin(coverage_start))
         
-        return segments, count
+        return segments, len(segments)
     
-    def _generate_trailer(self) -> List[str]:
-        """Generate GE and IEA trailer segments."""
-        segments = []
-        
-        # GE - Functional Group Trailer
-        segments.append(format_ge_segment(self.transaction_count, self.control_number))
-        
-        # IEA - Interchange Control Trailer
-        segments.append(format_iea_segment(1, self.control_number))
-        
-        return segments
+    def _generate_iea(self) -> str:
+        """Generate the IEA interchange trailer segment."""
+        return format_iea_segment(max(self.group_count, 1), self.control_number, self.delimiters)
+
+
+class _MemberTemplates:
+    """Bound render functions for the 2000 member loop segments."""
+    
+    def __init__(self, delimiters: Delimiters):
+        def compile_(tag, elements):
+            return SegmentTemplate(tag, elements, delimiters.element, delimiters.segment).render
+        
+        self.delimiters = delimiters
+        self.ins = compile_('INS', ['Y', SLOT, '021', '01', 'A', '', '', 'FT'])
+        self.ref_subscriber = compile_('REF', ['0F', SLOT])
+        self.ref_policy = compile_('REF', ['1L', SLOT])
+        self.dtp_begin = compile_('DTP', ['348', 'D8', SLOT])
+        self.dtp_end = compile_('DTP', ['349', 'D8', SLOT])
+        self.nm1 = compile_('NM1', ['IL', '1', SLOT, SLOT, SLOT, '', '', '34', SLOT])
+        self.n3 = compile_('N3', [SLOT, SLOT])
+        self.n4 = compile_('N4', [SLOT, SLOT, SLOT])
+        self.dmg = compile_('DMG', ['D8', SLOT, SLOT])
+        self.hd = compile_('HD', ['021', '', 'HLT', SLOT, 'EMP'])
+    
+    def __reduce__(self):
+        # Worker processes reuse their own cached copy
+        return _member_templates, (self.delimiters,)
+
+
+@lru_cache(maxsize=None)
+def _member_templates(delimiters: Delimiters) -> _MemberTemplates:
+    """Compile the member loop templates once per delimiter set."""
+    return _MemberTemplates(delimiters)
 
 
-def generate_834(records: List[Dict[str, Any]], sender_id: str = 'SENDER', 
-                 receiver_id: str = 'RECEIVER', test_mode: bool = True) -> str:
+class _Pushback:
+    """Iterator wrapper that lets a consumer put items back."""
+    
+    def __init__(self, iterable: Iterable[Any]):
+        self._iterator = iter(iterable)
+        self._buffer = []
+    
+    def __iter__(self) -> '_Pushback':
+        return self
+    
+    def __next__(self) -> Any:
+        if self._buffer:
+            return self._buffer.pop()
+        return next(self._iterator)
+    
+    def push(self, item: Any):
+        """Return an item so that it is produced next."""
+        self._buffer.append(item)
+    
+    def exhausted(self) -> bool:
+        """Check whether any items remain, without consuming them."""
+        try:
+            item = next(self)
+        except StopIteration:
+            return True
+        self.push(item)
+        return False
+
+
+def _render_member_chunk(generator: EDI834Generator, records: List[Dict[str, Any]]) -> tuple:
+    """Render a chunk of member loops in a worker process, with the number of escaped values."""
+    before = generator._escaper.altered
+    rendered = [generator._generate_member_loop(record) for record in records]
+    return rendered, generator._escaper.altered - before
+
+
+def generate_834(records: Iterable[Dict[str, Any]], sender_id: str = 'SENDER', 
+                 receiver_id: str = 'RECEIVER', test_mode: bool = True, workers: int = 1,
+                 max_members_per_st: Optional[int] = None, max_st_per_gs: Optional[int] = None,
+                 control_store: Optional[ControlNumberStore] = None,
+                 delimiters: Optional[Delimiters] = None) -> str:
     """
     Generate EDI 834 file from enrollment records.
     
     Args:
-        records: List of validated enrollment records
+        records: List or iterable of validated enrollment records
         sender_id: Sender identifier
         receiver_id: Receiver identifier
         test_mode: Whether to generate test or production file
+        workers: Number of processes rendering member loops (1 = serial)
+        max_members_per_st: Maximum members per ST/SE transaction set
+        max_st_per_gs: Maximum transaction sets per GS/GE functional group
+        control_store: Optional ControlNumberStore for collision-free control numbers
+        delimiters: Delimiter set (default: * ~ : ^)
         
     Returns:
         Complete EDI 834 file content
     """
-    generator = EDI834Generator(sender_id, receiver_id, test_mode)
+    generator = EDI834Generator(sender_id, receiver_id, test_mode, workers=workers,
+                                max_members_per_st=max_members_per_st, max_st_per_gs=max_st_per_gs,
+                                control_store=control_store, delimiters=delimiters)
     return generator.generate(records)
+
+
+def write_834(records: Iterable[Dict[str, Any]], output_path: str, sender_id: str = 'SENDER',
+              receiver_id: str = 'RECEIVER', test_mode: bool = True, pretty: bool = False,
+              buffer_size: int = 1024 * 1024, workers: int = 1,
+              max_members_per_st: Optional[int] = None, max_st_per_gs: Optional[int] = None,
+              control_store: Optional[ControlNumberStore] = None,
+              delimiters: Optional[Delimiters] = None, report: Optional[Dict[str, Any]] = None) -> int:
+    """
+    Stream an EDI 834 file from enrollment records straight to disk.
+    
+    Args:
+        records: List or iterable of validated enrollment records
+        output_path: Path of the EDI file to write; a .gz, .bz2 or .xz
+            extension compresses the output
+        sender_id: Sender identifier
+        receiver_id: Receiver identifier
+        test_mode: Whether to generate test or production file
+        pretty: Put each segment on its own line
+        buffer_size: Write buffer size in bytes
+        workers: Number of processes rendering member loops (1 = serial)
+        max_members_per_st: Maximum members per ST/SE transaction set
+        max_st_per_gs: Maximum transaction sets per GS/GE functional group
+        control_store: Optional ControlNumberStore for collision-free control numbers
+        delimiters: Delimiter set (default: * ~ : ^)
+        report: Optional dict that receives 'escaped_values', the number of
+            data values that had delimiter characters replaced with spaces
+        
+    Returns:
+        Number of segments written
+    """
+    generator = EDI834Generator(sender_id, receiver_id, test_mode, workers=workers,
+                                max_members_per_st=max_members_per_st, max_st_per_gs=max_st_per_gs,
+                                control_store=control_store, delimiters=delimiters)
+    with open_file(output_path, 'w', encoding='utf-8', newline='', buffering=buffer_size) as f:
+        count = generator.generate_to(f, records, pretty=pretty)
+    if report is not None:
+        report['escaped_values'] = generator.escaped_values
+    return count
+
+
+def write_834_files(records: Iterable[Dict[str, Any]], output_pattern: str, sender_id: str = 'SENDER',
+                    receiver_id: str = 'RECEIVER', test_mode: bool = True, max_bytes: Optional[int] = None,
+                    max_members: Optional[int] = None, manifest_path: Optional[str] = None,
+                    pretty: bool = False, workers: int = 1, max_members_per_st: Optional[int] = None,
+                    max_st_per_gs: Optional[int] = None,
+                    control_store: Optional[ControlNumberStore] = None,
+                    delimiters: Optional[Delimiters] = None,
+                    report: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """
+    Stream enrollment records into size-bounded EDI 834 files.
+    
+    Args:
+        records: List or iterable of validated enrollment records
+        output_pattern: Output path with an {n} field, e.g. 'out_{n:04d}.edi'
+            ('out_{n:04d}.edi.gz' compresses each file)
+        sender_id: Sender identifier
+        receiver_id: Receiver identifier
+        test_mode: Whether to generate test or production file
+        max_bytes: Maximum size of each file in bytes (before compression)
+        max_members: Maximum number of members in each file
+        manifest_path: Optional path of a JSON manifest describing the files
+        pretty: Put each segment on its own line
+        workers: Number of processes rendering member loops (1 = serial)
+        max_members_per_st: Maximum members per ST/SE transaction set
+        max_st_per_gs: Maximum transaction sets per GS/GE functional group
+        control_store: Optional ControlNumberStore for collision-free control numbers
+        delimiters: Delimiter set (default: * ~ : ^)
+        report: Optional dict that receives 'escaped_values', the number of
+            data values that had delimiter characters replaced with spaces
+        
+    Returns:
+        Manifest entries, one per file written
+    """
+    generator = EDI834Generator(sender_id, receiver_id, test_mode, workers=workers,
+                                max_members_per_st=max_members_per_st, max_st_per_gs=max_st_per_gs,
+                                control_store=control_store, delimiters=delimiters)
+    manifest = generator.generate_files(records, output_pattern, max_bytes=max_bytes,
+                                        max_members=max_members, pretty=pretty)
+    if report is not None:
+        report['escaped_values'] = generator.escaped_values
+    
+    if manifest_path:
+        with open(manifest_path, 'w', encoding='utf-8') as f:
+            json.dump({'files': manifest}, f, indent=2)
+    
+    return manifest
@@ -0,0 +1,121 @@
+"""
+Persistent cache of resolved CSV header layouts.
+
+HRIS vendors send files with a stable header row. The column plan resolved
+from a header row (see parser.HeaderPlan) is stored in a local SQLite
+database keyed by a hash of the header row and the header variations, so
+files with a known layout skip variation matching, and unmapped columns are
+reported the first time a layout is seen instead of for every file.
+"""
+
+import json
+import os
+import sqlite3
+from datetime import datetime
+from typing import Any, Dict, List, Sequence, Tuple
+
+from .parser import HeaderPlan, layout_key
+
+
+class HeaderLayoutCache:
+    """
+    SQLite-backed store of resolved header plans.
+    
+    Plans are also kept in memory once loaded, so a process reading many
+    files with the same layout queries the database once per layout. New
+    layouts are inserted with INSERT OR IGNORE, so when several processes
+    meet the same new layout only one of them sees it as new.
+    """
+    
+    def __init__(self, path: str, timeout: float = 30.0):
+        """
+        Open (or create) a header layout cache.
+        
+        Args:
+            path: Path of the SQLite database file
+            timeout: Seconds to wait for another process holding the lock
+        """
+        self.path = path
+        self.timeout = timeout
+        self._plans: Dict[str, HeaderPlan] = {}
+        
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        
+        connection = self._connect()
+        try:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS header_layouts ("
+                " layout_key TEXT PRIMARY KEY,"
+                " plan TEXT NOT NULL,"
+                " created TEXT NOT NULL)"
+            )
+        finally:
+            connection.close()
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection in autocommit mode."""
+        return sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+    
+    def plan(self, fieldnames: Sequence[str]) -> Tuple[HeaderPlan, bool]:
+        """
+        Return the header plan for a header row, resolving and storing it if new.
+        
+        Args:
+            fieldnames: CSV header names in column order
+        
+        Returns:
+            Tuple of (plan, whether this layout was seen for the first time)
+        """
+        key = layout_key(fieldnames)
+        plan = self._plans.get(key)
+        if plan is not None:
+            return plan, False
+        
+        connection = self._connect()
+        try:
+            row = connection.execute(
+                "SELECT plan FROM header_layouts WHERE layout_key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                plan, new_layout = HeaderPlan.from_dict(json.loads(row[0])), False
+            else:
+                plan = HeaderPlan(fieldnames)
+                cursor = connection.execute(
+                    "INSERT OR IGNORE INTO header_layouts (layout_key, plan, created) VALUES (?, ?, ?)",
+                    (key, json.dumps(plan.to_dict()), datetime.now().isoformat(timespec='seconds'))
+                )
+                new_layout = cursor.rowcount == 1
+        finally:
+            connection.close()
+        
+        self._plans[key] = plan
+        return plan, new_layout
+    
+    def layouts(self) -> List[Dict[str, Any]]:
+        """
+        List the stored layouts.
+        
+        Returns:
+            One dictionary per layout with its key, creation time, header
+            names and unmapped columns
+        """
+        connection = self._connect()
+        try:
+            rows = connection.execute(
+                "SELECT layout_key, plan, created FROM header_layouts ORDER BY created"
+            ).fetchall()
+        finally:
+            connection.close()
+        
+        layouts = []
+        for key, plan, created in rows:
+            plan = json.loads(plan)
+            layouts.append({
+                'layout_key': key,
+                'created': created,
+                'fieldnames': plan['fieldnames'],
+                'unmapped': plan['unmapped'],
+            })
+        return layouts
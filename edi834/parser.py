@@ -1,58 +1,589 @@
 """
 CSV Parser for employee enrollment data.
 
-Reads and normalizes employee enrollment CSV data into structured Python dictionaries.
+Reads and normalizes employee enrollment CSV data into EnrollmentRecord objects.
 """
 
 import csv
-from typing import List, Dict, Any
-from .utils import clean_row, format_date
+import hashlib
+import io
+import json
+import mmap
+import os
+import warnings
+import yaml
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Sequence, Tuple, Union
+from .errors import ParseError, ParseErrorSink
+from .record import EnrollmentRecord
+from .utils import _parse_date, clean_string, detect_compression, format_date, open_file, valid_date_mask
 
 
-def parse_csv(file_path: str, encoding: str = 'utf-8') -> List[Dict[str, Any]]:
+DEFAULT_ALIASES_PATH = os.path.join(
+    os.path.dirname(__file__),
+    'config',
+    'field_aliases.yaml'
+)
+
+
+def load_field_aliases(config_path: str = None) -> Dict[str, List[str]]:
+    """
+    Load the CSV header aliases of each standard field from YAML.
+    
+    Args:
+        config_path: Optional path to an aliases file (defaults to the bundled config)
+        
+    Returns:
+        Dictionary of standard field names to header aliases in priority order;
+        a field the file leaves out is matched by its own name only
+        
+    Raises:
+        FileNotFoundError: If the aliases file doesn't exist. There is no
+            silent fallback: without the aliases, vendor headers would be
+            left unmapped and their data dropped.
+        ValueError: If the file names an unknown field, gives a field's
+            aliases as anything but a list, or gives one alias to two fields
+    """
+    if config_path is None:
+        config_path = DEFAULT_ALIASES_PATH
+    
+    try:
+        with open(config_path, 'r') as f:
+            aliases = yaml.safe_load(f) or {}
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Field aliases file not found: {config_path}")
+    
+    known = EnrollmentRecord.FIELDS[1:-1]  # Not row_number or the derived relationship_code
+    unknown = sorted(set(aliases) - set(known))
+    if unknown:
+        raise ValueError(f"Unknown fields in {config_path}: {', '.join(unknown)}")
+    
+    # A scalar would be iterated character by character into one-letter aliases
+    not_lists = sorted(name for name, value in aliases.items() if not isinstance(value, list))
+    if not_lists:
+        raise ValueError(f"Aliases must be a list in {config_path}: {', '.join(not_lists)}")
+    
+    mappings = {name: [str(alias) for alias in aliases.get(name) or [name]] for name in known}
+    compile_field_aliases(mappings)  # Reject aliases shared between fields
+    return mappings
+
+
+def compile_field_aliases(mappings: Dict[str, List[str]]) -> Dict[str, Tuple[str, int]]:
+    """
+    Flatten field aliases into a reverse lookup keyed by lower-cased header.
+    
+    Args:
+        mappings: Standard field names to aliases in priority order
+        
+    Returns:
+        Dictionary of lower-cased alias to (standard field name, priority)
+        
+    Raises:
+        ValueError: If an alias belongs to more than one field
+    """
+    lookup = {}
+    for standard_name, aliases in mappings.items():
+        for priority, alias in enumerate(aliases):
+            key = alias.strip().lower()
+            if lookup.get(key, (standard_name,))[0] != standard_name:
+                raise ValueError(f"Header alias '{alias}' is given for both "
+                                 f"{lookup[key][0]} and {standard_name}")
+            lookup.setdefault(key, (standard_name, priority))
+    return lookup
+
+
+# Standard field names to CSV header aliases, and the flat reverse lookup
+# used to resolve header rows; both are loaded once at import
+FIELD_MAPPINGS = load_field_aliases()
+FIELD_LOOKUP = compile_field_aliases(FIELD_MAPPINGS)
+
+# Relationship descriptions to X12 individual relationship codes
+RELATIONSHIP_CODES = {
+    'EMPLOYEE': '18',
+    'SELF': '18',
+    'SPOUSE': '01',
+    'CHILD': '19',
+    'DEPENDENT': '19',
+}
+
+DATE_FIELDS = ('dob', 'coverage_start', 'coverage_end')
+
+# Bumped whenever HeaderPlan resolves header rows differently, so plans
+# persisted by layouts.HeaderLayoutCache are re-resolved
+HEADER_PLAN_VERSION = 2
+
+# Target size of the byte ranges handed to each worker by the parallel parser
+PARALLEL_CHUNK_BYTES = 4 * 1024 * 1024
+
+
+def parse_csv(file_path: str, encoding: str = 'utf-8', stream: bool = False, workers: int = 1,
+              errors: Optional[ParseErrorSink] = None,
+              header_cache: Optional[Any] = None) -> Union[List[EnrollmentRecord], Iterator[EnrollmentRecord]]:
     """
     Parse CSV file containing employee enrollment data.
     
     Args:
         file_path: Path to the CSV file
         encoding: File encoding (default: utf-8)
+        stream: Return a lazy iterator instead of a list (see iter_csv)
+        workers: Number of processes parsing byte ranges of the file (1 = serial)
+        errors: Optional ParseErrorSink collecting rows that failed to parse
+        header_cache: Optional HeaderLayoutCache of resolved header layouts
         
     Returns:
-        List of dictionaries containing parsed and normalized enrollment records
+        List of normalized EnrollmentRecord objects (dict-style access),
+        or an iterator over them when stream is True
         
     Raises:
         FileNotFoundError: If the CSV file doesn't exist
         csv.Error: If there's an error parsing the CSV
+        ParseError: If errors has a fail_after threshold and it is reached
     """
-    records = []
+    if stream:
+        return iter_csv(file_path, encoding, workers=workers, errors=errors, header_cache=header_cache)
     
+    return list(iter_csv(file_path, encoding, workers=workers, errors=errors, header_cache=header_cache))
+
+
+def iter_csv(file_path: str, encoding: str = 'utf-8',
+             report: Optional[Dict[str, Any]] = None, workers: int = 1,
+             chunk_bytes: int = PARALLEL_CHUNK_BYTES, errors: Optional[ParseErrorSink] = None,
+             header_cache: Optional[Any] = None) -> Iterator[EnrollmentRecord]:
+    """
+    Lazily parse a CSV file, yielding one normalized record at a time.
+    
+    Only the current row is held in memory, so arbitrarily large files can be
+    fed straight into validate_records() and EDI834Generator.generate().
+    gzip, bz2 and xz files are decompressed on the fly.
+    
+    With more than one worker, the file is split into byte ranges that end on
+    record boundaries (see csv_byte_ranges) and each range is parsed and
+    normalized in a process pool. Records come back in file order with the
+    same row numbers as in serial mode. Compressed files cannot be split and
+    are always parsed serially.
+    
+    Rows that fail to normalize are skipped and recorded in errors with their
+    row number, column and reason. Without a sink, a default one is used and
+    stored in report['parse_errors'], or summarized in a single
+    warnings.warn() call when there is no report either. Malformed records
+    that csv.reader rejects are recorded the same way.
+    
+    Header columns matching no known variation are listed in
+    report['unmapped_columns'] and, the first time a layout is seen, in its
+    warnings. With a header_cache (see layouts.HeaderLayoutCache) resolved
+    layouts persist across runs, so known layouts skip resolution and are
+    not warned about again.
+    
+    Args:
+        file_path: Path to the CSV file
+        encoding: File encoding (default: utf-8); must be ASCII-compatible
+            when workers > 1
+        report: Optional structure report (as returned by validate_csv_structure)
+            filled in while reading
+        workers: Number of processes parsing byte ranges of the file (1 = serial)
+        chunk_bytes: Approximate size of each worker's byte range
+        errors: Optional ParseErrorSink collecting rows that failed to parse
+        header_cache: Optional HeaderLayoutCache of resolved header layouts
+        
+    Yields:
+        Normalized EnrollmentRecord objects
+        
+    Raises:
+        FileNotFoundError: If the CSV file doesn't exist
+        csv.Error: If there's an error parsing the CSV
+        ParseError: If errors has a fail_after threshold and it is reached
+    """
+    sink = ParseErrorSink() if errors is None else errors
     try:
-        with open(file_path, newline='', encoding=encoding) as csvfile:
-            reader = csv.DictReader(csvfile)
+        if (workers and workers > 1 and os.path.getsize(file_path) > 0
+                and detect_compression(file_path) is None):
+            yield from _iter_csv_parallel(file_path, encoding, report, sink, header_cache,
+                                          workers, chunk_bytes)
+            _report_parse_errors(sink, report, errors is None)
+            return
+        
+        with open_file(file_path, 'r', encoding=encoding, newline='') as csvfile:
+            rows = _csv_rows(csvfile)
             
             # Validate that we have headers
-            if reader.fieldnames is None:
-                raise ValueError("CSV file has no headers")
+            fieldnames = next(rows, None)
+            if isinstance(fieldnames, csv.Error):
+                raise fieldnames
+            fieldnames = _check_headers(fieldnames, report)
+            
+            # Resolve header variations once; rows are then read by column index
+            plan = _plan_headers(fieldnames, report, header_cache)
             
-            for row_num, row in enumerate(reader, start=2):  # Start at 2 because row 1 is headers
+            row_num = 1  # Row 1 is headers
+            for values in rows:
+                if not values:
+                    continue  # Skip blank lines, as csv.DictReader does
+                row_num += 1
+                if report is not None:
+                    report['row_count'] += 1
+                if isinstance(values, csv.Error):
+                    sink.add(row_num, values)
+                    continue
                 try:
-                    cleaned_row = clean_row(row)
-                    normalized_row = normalize_record(cleaned_row, row_num)
-                    records.append(normalized_row)
+                    normalized_row = _normalize_fields(plan.extract(values), row_num)
                 except Exception as e:
-                    # Add row number to error for debugging
-                    print(f"Warning: Error parsing row {row_num}: {str(e)}")
+                    sink.add(row_num, e, _failed_column(plan, values))
                     continue
+                
+                yield normalized_row
+        
+        _report_parse_errors(sink, report, errors is None)
                     
     except FileNotFoundError:
         raise FileNotFoundError(f"CSV file not found: {file_path}")
     except csv.Error as e:
         raise csv.Error(f"Error parsing CSV file: {str(e)}")
+
+
+def _csv_rows(lines: Iterable[str]) -> Iterator[Union[List[str], csv.Error]]:
+    """
+    Yield the CSV rows read from lines, yielding malformed records as their csv.Error.
+    
+    After an error the rest of the bad record is skipped: csv.reader would
+    start afresh on the next line, which may still be inside a quoted field
+    spanning lines, and read its tail as a record of its own. The record
+    ends at the first line that leaves an even number of quote characters
+    since its start, the same rule as _record_end(). So one bad record
+    (e.g. a field over csv.field_size_limit()) neither ends the file nor
+    shifts the row numbers of the records after it.
+    """
+    source = iter(lines)
+    record = []
+    
+    def record_lines():
+        for line in source:
+            record.append(line)
+            yield line
+    
+    reader = csv.reader(record_lines())
+    while True:
+        record.clear()
+        try:
+            row = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as e:
+            quotes = sum(line.count('"') for line in record)
+            while quotes & 1:
+                line = next(source, None)
+                if line is None:
+                    break
+                quotes += line.count('"')
+            yield e
+            continue
+        yield row
+
+
+def _check_headers(fieldnames: Optional[List[str]], report: Optional[Dict[str, Any]]) -> List[str]:
+    """Record the header row in the report, raising ValueError if there is none."""
+    if fieldnames is None:
+        if report is not None:
+            report['valid'] = False
+            report['errors'].append("CSV file has no headers")
+        raise ValueError("CSV file has no headers")
+    
+    if report is not None:
+        report['headers'] = list(fieldnames)
+    return fieldnames
+
+
+def _plan_headers(fieldnames: Sequence[str], report: Optional[Dict[str, Any]],
+                  header_cache: Optional[Any]) -> 'HeaderPlan':
+    """Resolve (or look up) the header plan and report unmapped columns of new layouts."""
+    if header_cache is None:
+        plan, new_layout = HeaderPlan(fieldnames), True
+    else:
+        plan, new_layout = header_cache.plan(fieldnames)
+    
+    if report is not None:
+        report['unmapped_columns'] = list(plan.unmapped)
+        if new_layout and plan.unmapped:
+            report['warnings'].append(f"Unmapped columns (ignored): {', '.join(plan.unmapped)}")
+    return plan
+
+
+def _report_parse_errors(sink: ParseErrorSink, report: Optional[Dict[str, Any]],
+                         default_sink: bool) -> None:
+    """Store parse errors in the report, or warn once about a default sink that nobody reads."""
+    if report is not None:
+        report['parse_errors'] = sink.to_dict()
+    elif default_sink and sink.count:
+        first = sink.errors[0]
+        warnings.warn(f"{sink.count} rows could not be parsed "
+                      f"(first: row {first['row_number']}: {first['reason']}); "
+                      f"pass a ParseErrorSink to collect them", stacklevel=3)
+
+
+def _failed_column(plan: 'HeaderPlan', values: Sequence[Any]) -> Optional[str]:
+    """
+    Find the header of the column that makes a row fail to normalize.
+    
+    Only called for failed rows: each extracted field is normalized on its
+    own until one fails.
+    """
+    try:
+        fields = plan.extract(values)
+    except Exception:
+        return None
+    
+    for standard_name, value in fields.items():
+        if value:
+            try:
+                _normalize_fields({standard_name: value}, 0)
+            except Exception:
+                return plan.source_column(standard_name, values)
+    return None
+
+
+def csv_byte_ranges(data: Any, chunk_bytes: int = PARALLEL_CHUNK_BYTES,
+                    start: int = 0) -> Iterator[Tuple[int, int]]:
+    """
+    Split CSV bytes into ranges of roughly chunk_bytes that end on record boundaries.
+    
+    A newline ends a record only when it is outside a quoted field, which is
+    the case when an even number of quote characters precede it. Quotes
+    escaped by doubling ("") keep the count even, so only the count since
+    the previous boundary is needed. Quote characters must be used as
+    RFC 4180 field quoting (or in pairs); a lone stray quote can only merge
+    ranges, unless the file also has quoted fields spanning lines.
+    
+    Args:
+        data: CSV content as bytes or a bytes-like object such as an mmap
+        chunk_bytes: Target size of each range
+        start: Offset of the first record
+        
+    Yields:
+        (start, end) byte offsets; each range holds whole records
+    """
+    size = len(data)
+    while start < size:
+        end = _record_end(data, start, min(start + max(1, chunk_bytes), size))
+        yield start, end
+        start = end
+
+
+def _record_end(data: Any, start: int, target: int) -> int:
+    """Return the first record boundary at or after target, given a record starts at start."""
+    size = len(data)
+    if target >= size:
+        return size
+    
+    quotes = data[start:target].count(b'"')
+    pos = target
+    while True:
+        newline = data.find(b'\n', pos)
+        if newline < 0:
+            return size
+        quotes += data[pos:newline].count(b'"')
+        if not quotes & 1:
+            return newline + 1
+        pos = newline + 1
+
+
+def _iter_csv_parallel(file_path: str, encoding: str, report: Optional[Dict[str, Any]],
+                       errors: ParseErrorSink, header_cache: Optional[Any],
+                       workers: int, chunk_bytes: int) -> Iterator[EnrollmentRecord]:
+    """
+    Parse byte ranges of a CSV file in a process pool, yielding records in file order.
+    
+    At most two ranges per worker are in flight. Workers number rows from 1
+    within their range; the running row count of earlier ranges is added
+    here so row numbers match serial mode. The header plan is resolved once
+    here and shipped to the workers.
+    """
+    with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        header_end = _record_end(data, 0, 0)
+        header = io.StringIO(data[:header_end].decode(encoding), newline='')
+        fieldnames = _check_headers(next(csv.reader(header), None), report)
+        plan = _plan_headers(fieldnames, report, header_cache)
+        
+        ranges = csv_byte_ranges(data, chunk_bytes, header_end)
+        row_base = 1  # Row 1 is headers
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = deque()
+            while True:
+                while len(pending) < workers * 2:
+                    byte_range = next(ranges, None)
+                    if byte_range is None:
+                        break
+                    pending.append(executor.submit(_parse_csv_range, file_path, encoding,
+                                                   plan, *byte_range))
+                if not pending:
+                    break
+                records, failures, row_count = pending.popleft().result()
+                
+                if report is not None:
+                    report['row_count'] += row_count
+                for row_num, reason, column in failures:
+                    errors.add(row_base + row_num, reason, column)
+                for record in records:
+                    record.row_number += row_base
+                    yield record
+                row_base += row_count
+
+
+def _parse_csv_range(file_path: str, encoding: str, plan: 'HeaderPlan',
+                     start: int, end: int) -> tuple:
+    """
+    Parse and normalize one byte range of a CSV file in a worker process.
+    
+    Returns:
+        Tuple of (records numbered from 1 within the range,
+        [(row number, reason, column)] for rows that failed, number of rows)
+    """
+    with open(file_path, 'rb') as f:
+        f.seek(start)
+        text = f.read(end - start).decode(encoding)
+    
+    records = []
+    failures = []
+    row_num = 0
+    for values in _csv_rows(io.StringIO(text, newline='')):
+        if not values:
+            continue
+        row_num += 1
+        if isinstance(values, csv.Error):
+            failures.append((row_num, str(values), None))
+            continue
+        try:
+            records.append(_normalize_fields(plan.extract(values), row_num))
+        except Exception as e:
+            failures.append((row_num, str(e), _failed_column(plan, values)))
+    return records, failures, row_num
+
+
+class HeaderPlan:
+    """
+    Column-index plan mapping CSV headers to standard field names.
+    
+    Header variations are resolved once from the header row, so each data row
+    is normalized by direct index lookup instead of scanning every key.
+    Headers that match no variation are listed in unmapped.
+    """
     
-    return records
+    def __init__(self, fieldnames: Sequence[str]):
+        """
+        Compile the plan for a header row.
+        
+        Args:
+            fieldnames: CSV header names in column order
+        """
+        found = {}
+        self.fieldnames = list(fieldnames)
+        self.unmapped = []
+        for idx, name in enumerate(self.fieldnames):
+            key = name.strip().lower() if name is not None else ''
+            match = FIELD_LOOKUP.get(key)
+            if match is None:
+                if key:
+                    self.unmapped.append(name)
+                continue
+            # A repeated header is read from its last column, as csv.DictReader does
+            found[key] = (match[0], match[1], idx)
+        
+        candidates = {standard_name: [] for standard_name in FIELD_MAPPINGS}
+        for standard_name, priority, idx in found.values():
+            candidates[standard_name].append((priority, idx))
+        
+        # (standard_name, candidate column indexes in variation priority order)
+        self.columns = [
+            (standard_name, tuple(idx for _, idx in sorted(found)))
+            for standard_name, found in candidates.items()
+        ]
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'HeaderPlan':
+        """Rebuild a plan from to_dict() output without resolving the headers again."""
+        plan = cls.__new__(cls)
+        plan.fieldnames = list(data['fieldnames'])
+        plan.columns = [(standard_name, tuple(indexes)) for standard_name, indexes in data['columns']]
+        plan.unmapped = list(data['unmapped'])
+        return plan
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the plan as JSON-serializable data."""
+        return {
+            'fieldnames': self.fieldnames,
+            'columns': [[standard_name, list(indexes)] for standard_name, indexes in self.columns],
+            'unmapped': self.unmapped,
+        }
+    
+    def extract(self, values: Sequence[Any]) -> Dict[str, str]:
+        """
+        Pull standard fields out of a row of column values.
+        
+        The first non-empty candidate column wins; missing trailing columns
+        are treated as empty.
+        
+        Args:
+            values: Row values in header column order
+            
+        Returns:
+            Dictionary of standard field names to cleaned string values
+        """
+        width = len(values)
+        fields = {}
+        for standard_name, indexes in self.columns:
+            value = ''
+            for idx in indexes:
+                if idx < width:
+                    value = clean_string(values[idx])
+                    if value:
+                        break
+            fields[standard_name] = value
+        return fields
+    
+    def source_column(self, standard_name: str, values: Sequence[Any]) -> Optional[str]:
+        """
+        Return the header of the column a standard field was taken from.
+        
+        Args:
+            standard_name: Standard field name
+            values: Row values in header column order
+            
+        Returns:
+            Header name of the first non-empty candidate column, or None
+        """
+        for name, indexes in self.columns:
+            if name == standard_name:
+                for idx in indexes:
+                    if idx < len(values) and clean_string(values[idx]):
+                        return self.fieldnames[idx]
+        return None
+
 
+@lru_cache(maxsize=64)
+def _header_plan(fieldnames: Tuple[str, ...]) -> HeaderPlan:
+    """Return a cached HeaderPlan for a header layout."""
+    return HeaderPlan(fieldnames)
 
-def normalize_record(row: Dict[str, Any], row_num: int) -> Dict[str, Any]:
+
+def layout_key(fieldnames: Sequence[str]) -> str:
+    """
+    Hash a header row together with the header variations it is resolved with.
+    
+    Changing FIELD_MAPPINGS or HEADER_PLAN_VERSION changes every key, so
+    persisted plans never outlive the aliases or the resolution rules they
+    were built with.
+    
+    Args:
+        fieldnames: CSV header names in column order
+        
+    Returns:
+        Hex SHA-256 digest identifying the header layout
+    """
+    payload = json.dumps([HEADER_PLAN_VERSION, FIELD_MAPPINGS, list(fieldnames)], sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def normalize_record(row: Dict[str, Any], row_num: int) -> EnrollmentRecord:
     """
     Normalize a single enrollment record.
     
@@ -64,51 +595,21 @@ def normalize_record(row: Dict[str, Any], row_num: int) -> Dict[str, Any]:
         row_num: Row number for error reporting
         
     Returns:
-        Normalized record dictionary
-    """
-    # Map common CSV header variations to standard field names
-    field_mappings = {
-        'employee_id': ['employee_id', 'employeeid', 'emp_id', 'id'],
-        'ssn': ['ssn', 'social_security_number', 'social_security'],
-        'first_name': ['first_name', 'firstname', 'fname'],
-        'last_name': ['last_name', 'lastname', 'lname'],
-        'middle_name': ['middle_name', 'middlename', 'mname'],
-        'dob': ['dob', 'date_of_birth', 'birth_date', 'birthdate'],
-        'gender': ['gender', 'sex'],
-        'address1': ['address1', 'address_line1', 'street'],
-        'address2': ['address2', 'address_line2'],
-        'city': ['city'],
-        'state': ['state'],
-        'zip': ['zip', 'zipcode', 'zip_code', 'postal_code'],
-        'plan_code': ['plan_code', 'plancode', 'plan'],
-        'coverage_start': ['coverage_start', 'coverage_start_date', 'effective_date', 'start_date'],
-        'coverage_end': ['coverage_end', 'coverage_end_date', 'termination_date', 'end_date'],
-        'relationship': ['relationship', 'relation'],
-        'subscriber_id': ['subscriber_id', 'subscriberid', 'member_id'],
-    }
-    
+        Normalized EnrollmentRecord (supports dict-style access)
+    """
+    plan = _header_plan(tuple(row.keys()))
+    return _normalize_fields(plan.extract(list(row.values())), row_num)
+
+
+def _normalize_fields(fields: Dict[str, str], row_num: int) -> EnrollmentRecord:
+    """Format dates and standardize codes for extracted standard fields."""
     normalized = {
         'row_number': row_num,
     }
-    
-    # Map fields from CSV to normalized names
-    for standard_name, variations in field_mappings.items():
-        value = None
-        for variant in variations:
-            if variant in row or variant.upper() in row or variant.lower() in row:
-                # Try case-insensitive lookup
-                for key in row.keys():
-                    if key.lower() == variant.lower():
-                        value = row[key]
-                        break
-                if value:
-                    break
-        
-        normalized[standard_name] = value or ''
+    normalized.update(fields)
     
     # Format dates if present
-    date_fields = ['dob', 'coverage_start', 'coverage_end']
-    for field in date_fields:
+    for field in DATE_FIELDS:
         if normalized.get(field):
             formatted_date = format_date(normalized[field])
             if formatted_date:
@@ -132,26 +633,159 @@ def normalize_record(row: Dict[str, Any], row_num: int) -> Dict[str, Any]:
     # Standardize relationship codes
     if normalized.get('relationship'):
         relationship = normalized['relationship'].upper()
-        relationship_map = {
-            'EMPLOYEE': '18',
-            'SELF': '18',
-            'SPOUSE': '01',
-            'CHILD': '19',
-            'DEPENDENT': '19',
-        }
-        normalized['relationship_code'] = relationship_map.get(relationship, '18')
+        normalized['relationship_code'] = RELATIONSHIP_CODES.get(relationship, '18')
     else:
         normalized['relationship_code'] = '18'  # Default to employee
     
+    return EnrollmentRecord(**normalized)
+
+
+def parse_csv_frame(file_path: str, encoding: str = 'utf-8', chunksize: Optional[int] = None):
+    """
+    Parse an enrollment CSV into pandas DataFrames with vectorized normalization.
+    
+    Produces the same columns and values as parse_csv(), one record per row,
+    ready for validate_frame(). Use frame_records() to feed the result to the
+    EDI generator.
+    
+    Args:
+        file_path: Path to the CSV file
+        encoding: File encoding (default: utf-8)
+        chunksize: If given, return an iterator of DataFrames of this many rows
+        
+    Returns:
+        Normalized DataFrame, or an iterator of DataFrames when chunksize is set
+        
+    Raises:
+        FileNotFoundError: If the CSV file doesn't exist
+    """
+    import pandas as pd
+    
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"CSV file not found: {file_path}")
+    
+    # Rows with more fields than the header must neither shift into an index
+    # nor fail to tokenize; like parse_csv(), read only the header's columns
+    with open_file(file_path, 'r', encoding=encoding, newline='') as csvfile:
+        fieldnames = next(csv.reader(csvfile), None)
+    
+    reader = pd.read_csv(
+        file_path,
+        dtype=str,
+        keep_default_na=False,
+        index_col=False,
+        usecols=range(len(fieldnames)) if fieldnames else None,
+        encoding=encoding,
+        chunksize=chunksize,
+        compression=detect_compression(file_path),
+    )
+    
+    if chunksize is None:
+        return normalize_frame(reader, fieldnames=fieldnames)
+    
+    return _iter_normalized_chunks(reader, fieldnames)
+
+
+def _iter_normalized_chunks(reader, fieldnames: Optional[Sequence[str]] = None) -> Iterator[Any]:
+    """Normalize DataFrame chunks, numbering rows continuously across chunks."""
+    first_row_number = 2
+    for chunk in reader:
+        yield normalize_frame(chunk, first_row_number, fieldnames)
+        first_row_number += len(chunk)
+
+
+def normalize_frame(df, first_row_number: int = 2, fieldnames: Optional[Sequence[str]] = None):
+    """
+    Normalize a DataFrame of raw CSV rows column-wise.
+    
+    Applies the header variations, date formatting, SSN cleaning, gender and
+    relationship mapping of normalize_record() to whole columns.
+    
+    Args:
+        df: DataFrame of raw CSV values (all strings)
+        first_row_number: CSV row number of the first row (row 1 is headers)
+        fieldnames: Original CSV header names, if the DataFrame's column
+            labels differ (pandas renames repeated headers to 'name.1')
+        
+    Returns:
+        Normalized DataFrame with the same columns as parse_csv() records
+    """
+    import pandas as pd
+    
+    total = len(df)
+    raw = [df.iloc[:, idx].fillna('').astype(str).str.strip().reset_index(drop=True)
+           for idx in range(df.shape[1])]
+    empty = pd.Series([''] * total, dtype=object)
+    
+    normalized = pd.DataFrame({'row_number': range(first_row_number, first_row_number + total)})
+    if fieldnames is None:
+        fieldnames = [str(name) for name in df.columns]
+    for standard_name, indexes in HeaderPlan(fieldnames).columns:
+        # The first non-empty candidate column wins
+        values = empty
+        for idx in reversed(indexes):
+            values = raw[idx].where(raw[idx] != '', values)
+        normalized[standard_name] = values.astype(object)
+    
+    # Format MM/DD/YYYY dates as YYYYMMDD column-wise; other non-empty values
+    # take the same fallback as format_date(), once per distinct value
+    for field in DATE_FIELDS:
+        values = normalized[field]
+        parts = values.str.extract(r'^(\d{1,2})/(\d{1,2})/(\d{4})$')
+        matched = parts[0].notna().to_numpy()
+        if matched.any():
+            parts = parts.fillna('1').astype('int64')
+            month, day, year = (parts[i].to_numpy() for i in range(3))
+            convert = matched & valid_date_mask(year, month, day)
+            formatted = pd.Series(year * 10000 + month * 100 + day).astype(str).str.zfill(8)
+            normalized[field] = formatted.where(convert, values)
+        
+        other = ~matched & (values != '').to_numpy()
+        if other.any():
+            lookup = {value: _parse_date(value)[0] or value for value in values[other].unique()}
+            normalized.loc[other, field] = values[other].map(lookup)
+    
+    # Clean SSN - remove dashes and spaces
+    normalized['ssn'] = normalized['ssn'].str.replace('-', '', regex=False).str.replace(' ', '', regex=False)
+    
+    # Standardize gender codes
+    gender = normalized['gender'].str.upper()
+    normalized['gender'] = gender.map({'M': 'M', 'MALE': 'M', 'F': 'F', 'FEMALE': 'F'}).fillna('U')
+    
+    # Standardize relationship codes
+    relationship = normalized['relationship'].str.upper()
+    normalized['relationship_code'] = relationship.map(RELATIONSHIP_CODES).fillna('18')
+    
     return normalized
 
 
+def frame_records(frames) -> Iterator[Dict[str, Any]]:
+    """
+    Yield record dictionaries from normalized DataFrames.
+    
+    Args:
+        frames: A DataFrame or an iterable of DataFrames from parse_csv_frame()
+        
+    Yields:
+        Normalized enrollment record dictionaries
+    """
+    import pandas as pd
+    
+    if isinstance(frames, pd.DataFrame):
+        frames = [frames]
+    
+    for frame in frames:
+        columns = list(frame.columns)
+        for values in frame.itertuples(index=False, name=None):
+            yield dict(zip(columns, values))
+
+
 def validate_csv_structure(file_path: str) -> Dict[str, Any]:
     """
     Validate CSV file structure without fully parsing it.
     
     Args:
-        file_path: Path to the CSV file
+        file_path: Path to the CSV file (plain, gzip, bz2 or xz)
         
     Returns:
         Dictionary with validation results including headers and row count
@@ -165,7 +799,7 @@ def validate_csv_structure(file_path: str) -> Dict[str, Any]:
     }
     
     try:
-        with open(file_path, newline='', encoding='utf-8') as csvfile:
+        with open_file(file_path, 'r', encoding='utf-8', newline='') as csvfile:
             reader = csv.DictReader(csvfile)
             
             if reader.fieldnames is None:
@@ -190,3 +824,55 @@ def validate_csv_structure(file_path: str) -> Dict[str, Any]:
         result['errors'].append(f"Error reading file: {str(e)}")
     
     return result
+
+
+def scan_csv(file_path: str, encoding: str = 'utf-8', workers: int = 1,
+             errors: Optional[ParseErrorSink] = None,
+             header_cache: Optional[Any] = None) -> Tuple[Dict[str, Any], List[EnrollmentRecord]]:
+    """
+    Validate CSV structure and parse records in a single read of the file.
+    
+    Args:
+        file_path: Path to the CSV file
+        encoding: File encoding (default: utf-8)
+        workers: Number of processes parsing byte ranges of the file (1 = serial)
+        errors: Optional ParseErrorSink collecting rows that failed to parse;
+            pass it on to validate_records() to merge them into its report
+        header_cache: Optional HeaderLayoutCache of resolved header layouts
+        
+    Returns:
+        Tuple of (structure report, parsed records). The report has the same
+        keys as validate_csv_structure() plus 'unmapped_columns' and
+        'parse_errors' (see ParseErrorSink.to_dict()). If the sink's fail_after threshold is
+        reached the report is invalid and no records are returned.
+    """
+    result = {
+        'valid': True,
+        'errors': [],
+        'warnings': [],
+        'headers': [],
+        'row_count': 0,
+    }
+    records = []
+    sink = ParseErrorSink() if errors is None else errors
+    
+    try:
+        records = list(iter_csv(file_path, encoding, report=result, workers=workers, errors=sink,
+                                header_cache=header_cache))
+        
+        if result['row_count'] == 0:
+            result['warnings'].append("CSV file contains no data rows")
+            
+    except FileNotFoundError:
+        result['valid'] = False
+        result['errors'].append(f"File not found: {file_path}")
+    except ParseError as e:
+        result['valid'] = False
+        result['errors'].append(str(e))
+        result['parse_errors'] = sink.to_dict()
+    except Exception as e:
+        if result['valid']:
+            result['valid'] = False
+            result['errors'].append(f"Error reading file: {str(e)}")
+    
+    return result, records
@@ -0,0 +1,434 @@
+"""
+EDI 834 reader for X12 interchanges.
+
+Detects the delimiters declared in the ISA header, tokenizes segments lazily
+from a file, file object or memory map, and groups member segments into the
+2000 / 2100x / 2300 loop hierarchy, so carrier return files (and files
+written by this package) can be ingested without loading them into memory.
+"""
+
+import codecs
+import json
+import mmap
+import os
+import re
+from typing import Any, Dict, Iterator, List, Optional, TextIO
+
+from .formatter import Delimiters, check_envelope
+from .utils import detect_compression, open_file
+
+
+# Bytes read per chunk when tokenizing
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+# Envelope and transaction set header segments; any of these closes a member
+ENVELOPE_TAGS = frozenset(['ISA', 'GS', 'ST', 'BGN', 'SE', 'GE', 'IEA'])
+
+# Characters json.dumps copies through unchanged; anything else (quotes,
+# backslashes, control and non-ASCII characters) goes through the encoder
+_json_unsafe = re.compile(r'[^ !#-\[\]-~]').search
+_json_encode = json.JSONEncoder(separators=(',', ':')).encode
+
+# Envelope headers remembered by EDIReader, and the attribute holding each
+_HEADER_TAGS = {'ISA': 'interchange', 'GS': 'group', 'ST': 'transaction_set'}
+
+# NM1 entity identifier codes that open a 2100 loop inside a member
+MEMBER_NAME_LOOPS = {
+    'IL': '2100A',      # Member name
+    '74': '2100B',      # Incorrect member name
+    '70': '2100B',
+    '31': '2100C',      # Member mailing address
+    '36': '2100D',      # Member employer
+    'M8': '2100E',      # Member school
+    'S3': '2100F',      # Custodial parent
+    'QD': '2100G',      # Responsible person
+    '45': '2100H',      # Drop off location
+}
+
+
+class Loop:
+    """
+    One loop of an 834 member: its own segments plus nested loops.
+    
+    Segments are lists of element strings with the segment tag first, e.g.
+    ['REF', '0F', '12345'].
+    """
+    
+    __slots__ = ('loop_id', 'segments', 'loops')
+    
+    def __init__(self, loop_id: str, segments: Optional[List[List[str]]] = None,
+                 loops: Optional[List['Loop']] = None):
+        self.loop_id = loop_id
+        self.segments = segments if segments is not None else []
+        self.loops = loops if loops is not None else []
+    
+    def __repr__(self) -> str:
+        return f"Loop({self.loop_id!r}, {len(self.segments)} segments, {len(self.loops)} loops)"
+    
+    def segment(self, tag: str, qualifier: Optional[str] = None) -> Optional[List[str]]:
+        """
+        Return the first segment of this loop with a tag (and first element).
+        
+        Args:
+            tag: Segment tag, e.g. 'REF'
+            qualifier: Required value of the first element, e.g. '0F'
+        
+        Returns:
+            The segment, or None if the loop has no such segment
+        """
+        for segment in self.segments:
+            if segment[0] == tag and (qualifier is None or (len(segment) > 1 and segment[1] == qualifier)):
+                return segment
+        return None
+    
+    def find(self, loop_id: str) -> List['Loop']:
+        """Return the nested loops with a loop identifier, in file order."""
+        return [loop for loop in self.loops if loop.loop_id == loop_id]
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the loop as plain dictionaries and lists (e.g. for JSON)."""
+        return {
+            'loop': self.loop_id,
+            'segments': self.segments,
+            'loops': [loop.to_dict() for loop in self.loops],
+        }
+
+
+class EDIReader:
+    """
+    Lazy reader for one EDI file.
+    
+    Delimiters are taken from the ISA header when reading starts. While
+    iterating, the most recent ISA, GS and ST segments are kept on the reader
+    so members can be related to their envelope.
+    
+    Example:
+        reader = EDIReader('benefits_834.edi')
+        for member in reader.members():
+            print(member.segment('REF', '0F'), reader.transaction_set)
+    """
+    
+    def __init__(self, source: Any, encoding: str = 'utf-8', chunk_size: int = DEFAULT_CHUNK_SIZE):
+        """
+        Create a reader.
+        
+        Args:
+            source: Path, binary or text file object, or bytes-like object
+                such as an mmap.mmap
+            encoding: Character encoding of binary input
+            chunk_size: Bytes (or characters) read per chunk
+        """
+        self.source = source
+        self.encoding = encoding
+        self.chunk_size = max(106, chunk_size)
+        self.delimiters = None
+        self.interchange = None
+        self.group = None
+        self.transaction_set = None
+    
+    def segments(self) -> Iterator[List[str]]:
+        """
+        Yield every segment as a list of elements, tag first.
+        
+        Line breaks around segments, such as those written by pretty output,
+        are ignored.
+        
+        Raises:
+            ValueError: If the input does not start with an ISA segment
+        """
+        chunks = _iter_chunks(self.source, self.encoding, self.chunk_size)
+        buffer = ''
+        for chunk in chunks:
+            buffer = (buffer + chunk).lstrip()
+            # The fixed-width ISA header is 106 characters
+            if len(buffer) >= 106:
+                break
+        if not buffer:
+            return
+        self.delimiters = Delimiters.from_isa(buffer)
+        
+        terminator = self.delimiters.segment
+        separator = self.delimiters.element
+        
+        def tokenize(text):
+            parts = text.split(terminator)
+            # Only pay for stripping when the chunk has line breaks to strip
+            if '\r' in text or (terminator != '\n' and '\n' in text):
+                parts = [part.strip('\r\n') for part in parts]
+            for part in parts:
+                if part:
+                    segment = part.split(separator)
+                    if segment[0] in _HEADER_TAGS:
+                        setattr(self, _HEADER_TAGS[segment[0]], segment)
+                    yield segment
+        
+        for chunk in chunks:
+            buffer += chunk
+            last = buffer.rfind(terminator)
+            if last < 0:
+                continue
+            yield from tokenize(buffer[:last])
+            buffer = buffer[last + 1:]
+        yield from tokenize(buffer)
+    
+    def members(self) -> Iterator[Loop]:
+        """
+        Yield each member (2000 loop) once its last segment has been read.
+        
+        A member starts at INS and ends at the next INS or envelope segment.
+        NM1 segments open 2100A-2100H loops, HD opens a 2300 loop, and within
+        2300 coverage LX opens 2310 and COB opens 2320 (with NM1 opening 2330).
+        LS..LE is kept as a 2700 loop.
+        """
+        member = None
+        current = None
+        coverage = None
+        for segment in self.segments():
+            tag = segment[0]
+            if tag == 'INS':
+                if member is not None:
+                    yield member
+                member = current = Loop('2000', [segment])
+                coverage = None
+                continue
+            if member is None:
+                continue
+            if tag in ENVELOPE_TAGS:
+                yield member
+                member = current = coverage = None
+                continue
+            
+            if tag == 'HD':
+                coverage = current = Loop('2300', [segment])
+                member.loops.append(coverage)
+            elif tag == 'LS':
+                coverage = None
+                current = Loop('2700', [segment])
+                member.loops.append(current)
+            elif coverage is not None and tag == 'LX':
+                current = Loop('2310', [segment])
+                coverage.loops.append(current)
+            elif coverage is not None and tag == 'COB':
+                current = Loop('2320', [segment])
+                coverage.loops.append(current)
+            elif tag == 'NM1' and current.loop_id == '2320':
+                parent = current
+                current = Loop('2330', [segment])
+                parent.loops.append(current)
+            elif tag == 'NM1' and coverage is None and current.loop_id != '2700' \
+                    and len(segment) > 1 and segment[1] in MEMBER_NAME_LOOPS:
+                current = Loop(MEMBER_NAME_LOOPS[segment[1]], [segment])
+                member.loops.append(current)
+            else:
+                current.segments.append(segment)
+        
+        if member is not None:
+            yield member
+
+
+def iter_segments(source: Any, encoding: str = 'utf-8',
+                  chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[List[str]]:
+    """
+    Tokenize an EDI file lazily.
+    
+    Args:
+        source: Path, binary or text file object, or bytes-like object
+        encoding: Character encoding of binary input
+        chunk_size: Bytes (or characters) read per chunk
+    
+    Yields:
+        Segments as lists of elements, tag first
+    """
+    return EDIReader(source, encoding, chunk_size).segments()
+
+
+def iter_members(source: Any, encoding: str = 'utf-8',
+                 chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Loop]:
+    """
+    Read the member (2000) loops of an EDI 834 file lazily.
+    
+    Args:
+        source: Path, binary or text file object, or bytes-like object
+        encoding: Character encoding of binary input
+        chunk_size: Bytes (or characters) read per chunk
+    
+    Yields:
+        Loop objects for each member, with nested 2100x/2300 loops
+    """
+    return EDIReader(source, encoding, chunk_size).members()
+
+
+def write_ndjson(source: Any, fileobj: TextIO, per: str = 'segment', encoding: str = 'utf-8',
+                 chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """
+    Stream an EDI file to newline-delimited JSON.
+    
+    With per='segment' each line is {"segment": tag, "elements": [...]}, the
+    same objects edi_to_json builds. With per='member' each line is one 2000
+    loop (see Loop.to_dict) plus the control numbers of its interchange,
+    functional group and transaction set. Segments are read lazily and
+    written as they are converted, so memory use does not grow with the file.
+    
+    Args:
+        source: Path, binary or text file object, or bytes-like object
+        fileobj: Writable text file object
+        per: 'segment' or 'member'
+        encoding: Character encoding of binary input
+        chunk_size: Bytes (or characters) read per chunk
+        
+    Returns:
+        Number of JSON lines written
+        
+    Raises:
+        ValueError: If per is not 'segment' or 'member'
+    """
+    if per not in ('segment', 'member'):
+        raise ValueError(f"per must be 'segment' or 'member', not {per!r}")
+    
+    reader = EDIReader(source, encoding, chunk_size)
+    write = fileobj.write
+    count = 0
+    
+    if per == 'segment':
+        for segment in reader.segments():
+            if _json_unsafe(''.join(segment)) is None:
+                elements = '["' + '","'.join(segment[1:]) + '"]' if len(segment) > 1 else '[]'
+                write('{"segment":"' + segment[0] + '","elements":' + elements + '}\n')
+            else:
+                write(_json_encode({'segment': segment[0], 'elements': segment[1:]}) + '\n')
+            count += 1
+        return count
+    
+    def control(segment, position):
+        return segment[position].strip() if segment is not None and len(segment) > position else None
+    
+    for member in reader.members():
+        envelope = _json_encode({
+            'interchange_control_number': control(reader.interchange, 13),
+            'group_control_number': control(reader.group, 6),
+            'transaction_set_control_number': control(reader.transaction_set, 2),
+        })
+        write(envelope[:-1] + ',' + _loop_json(member)[1:] + '\n')
+        count += 1
+    return count
+
+
+def validate_edi_file(path: str, delimiters: Optional[Delimiters] = None, max_errors: int = 100) -> Dict[str, Any]:
+    """
+    Validate the envelope structure of an EDI file through a memory map.
+    
+    The file is never read into memory as a whole: envelope segments are
+    located in the map and the segments between them are counted, so a file
+    of any size is checked in one pass with constant memory. Offsets in the
+    errors are byte offsets into the file. gzip, bz2 and xz files cannot be
+    mapped and are decompressed into memory instead.
+    
+    Args:
+        path: Path of the EDI file
+        delimiters: Delimiter set (default: declared by the ISA header)
+        max_errors: Maximum number of errors recorded
+        
+    Returns:
+        Dictionary with validation results (see formatter.check_envelope)
+    """
+    if detect_compression(path) is not None:
+        with open_file(path, 'rb') as f:
+            data = f.read()
+        return check_envelope(data, delimiters or _declared_delimiters(data), max_errors)
+    
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return check_envelope(b'', delimiters or Delimiters(), max_errors)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return check_envelope(mapped, delimiters or _declared_delimiters(mapped), max_errors)
+
+
+def _declared_delimiters(data: Any) -> Delimiters:
+    """Delimiters declared by the ISA header at the start of data, or the defaults."""
+    try:
+        return Delimiters.from_isa(data[:4096].decode('latin-1').lstrip())
+    except ValueError:
+        return Delimiters()
+
+
+def member_record(member: Loop) -> Dict[str, str]:
+    """
+    Map a member loop back to the standard enrollment field names.
+    
+    Only the fields written by this package's generator are read; values
+    missing from the loop are returned as empty strings.
+    
+    Args:
+        member: 2000 loop from EDIReader.members()
+    
+    Returns:
+        Dictionary of standard field names to values
+    """
+    def element(segment, index):
+        return segment[index] if segment is not None and len(segment) > index else ''
+    
+    ins = member.segment('INS')
+    names = member.find('2100A')
+    name = names[0] if names else Loop('2100A')
+    nm1 = name.segment('NM1')
+    n3 = name.segment('N3')
+    n4 = name.segment('N4')
+    dmg = name.segment('DMG')
+    coverages = member.find('2300')
+    hd = coverages[0].segment('HD') if coverages else None
+    
+    return {
+        'employee_id': element(member.segment('REF', '1L'), 2),
+        'subscriber_id': element(member.segment('REF', '0F'), 2),
+        'relationship_code': element(ins, 2),
+        'ssn': element(nm1, 9),
+        'last_name': element(nm1, 3),
+        'first_name': element(nm1, 4),
+        'middle_name': element(nm1, 5),
+        'address1': element(n3, 1),
+        'address2': element(n3, 2),
+        'city': element(n4, 1),
+        'state': element(n4, 2),
+        'zip': element(n4, 3),
+        'dob': element(dmg, 2),
+        'gender': element(dmg, 3),
+        'plan_code': element(hd, 4),
+        'coverage_start': element(member.segment('DTP', '348'), 3),
+        'coverage_end': element(member.segment('DTP', '349'), 3),
+    }
+
+
+def _json_array(values: List[str]) -> str:
+    """JSON array of strings, copying them through when nothing needs escaping."""
+    if _json_unsafe(''.join(values)) is None:
+        return '["' + '","'.join(values) + '"]' if values else '[]'
+    return _json_encode(values)
+
+
+def _loop_json(loop: Loop) -> str:
+    """JSON text of Loop.to_dict() without building the dictionaries."""
+    return ('{"loop":"' + loop.loop_id + '","segments":[' + ','.join(map(_json_array, loop.segments))
+            + '],"loops":[' + ','.join(map(_loop_json, loop.loops)) + ']}')
+
+
+def _iter_chunks(source: Any, encoding: str, chunk_size: int) -> Iterator[str]:
+    """Yield decoded text chunks from a path, file object or bytes-like object."""
+    if isinstance(source, (str, os.PathLike)):
+        with open_file(os.fspath(source), 'rb') as f:
+            yield from _iter_chunks(f, encoding, chunk_size)
+        return
+    
+    decoder = codecs.getincrementaldecoder(encoding)()
+    if hasattr(source, 'read'):
+        while True:
+            chunk = source.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk if isinstance(chunk, str) else decoder.decode(chunk)
+    else:
+        with memoryview(source) as view:
+            for start in range(0, len(view), chunk_size):
+                yield decoder.decode(view[start:start + chunk_size])
+    tail = decoder.decode(b'', final=True)
+    if tail:
+        yield tail
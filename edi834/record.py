@@ -0,0 +1,112 @@
+"""
+Compact in-memory representation of normalized enrollment records.
+"""
+
+from typing import Any, Dict, Iterator, Tuple
+
+
+class EnrollmentRecord:
+    """
+    Normalized enrollment record stored in fixed slots.
+    
+    Holds the same fields as the dictionaries produced by normalize_record()
+    without a per-record hash table, and supports the read-only dict
+    interface (get, [], in, keys, items) used by the validator and generator.
+    """
+    
+    FIELDS = (
+        'row_number',
+        'employee_id',
+        'ssn',
+        'first_name',
+        'last_name',
+        'middle_name',
+        'dob',
+        'gender',
+        'address1',
+        'address2',
+        'city',
+        'state',
+        'zip',
+        'plan_code',
+        'coverage_start',
+        'coverage_end',
+        'relationship',
+        'subscriber_id',
+        'relationship_code',
+    )
+    
+    __slots__ = FIELDS
+    
+    def __init__(self, row_number: int = 0, **fields: str):
+        """
+        Create a record; fields that are not given default to empty strings.
+        
+        Args:
+            row_number: CSV row number the record was read from
+            **fields: Standard field values
+            
+        Raises:
+            TypeError: If an unknown field name is given
+        """
+        self.row_number = row_number
+        for name in self.FIELDS[1:]:
+            setattr(self, name, fields.pop(name, ''))
+        if fields:
+            raise TypeError(f"Unknown enrollment record fields: {', '.join(sorted(fields))}")
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'EnrollmentRecord':
+        """Build a record from a normalized record dictionary."""
+        return cls(**data)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the record as a plain dictionary."""
+        return {name: getattr(self, name) for name in self.FIELDS}
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return a field value, or default for unknown field names."""
+        if key in self.FIELDS:
+            return getattr(self, key)
+        return default
+    
+    def keys(self) -> Tuple[str, ...]:
+        """Return the field names."""
+        return self.FIELDS
+    
+    def values(self) -> list:
+        """Return the field values in field order."""
+        return [getattr(self, name) for name in self.FIELDS]
+    
+    def items(self) -> list:
+        """Return (field, value) pairs in field order."""
+        return [(name, getattr(self, name)) for name in self.FIELDS]
+    
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+    
+    def __setitem__(self, key: str, value: Any):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        setattr(self, key, value)
+    
+    def __contains__(self, key: object) -> bool:
+        return key in self.FIELDS
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.FIELDS)
+    
+    def __len__(self) -> int:
+        return len(self.FIELDS)
+    
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, EnrollmentRecord):
+            return self.values() == other.values()
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+    
+    def __repr__(self) -> str:
+        return f"EnrollmentRecord({self.to_dict()!r})"
@@ -2,9 +2,41 @@
 Utility functions for the EDI 834 generator.
 """
 
+import bz2
 from datetime import datetime
+from functools import lru_cache
+import gzip
+import lzma
+import os
 import re
-from typing import Any, Dict
+from typing import IO, Any, Dict, Optional, Tuple
+
+# X12 has no escape sequence: delimiter characters in data are replaced with
+# spaces. Re-exported so there is a single implementation.
+from .formatter import escape_delimiters  # noqa: F401
+
+# Leading bytes of each supported compressed format
+COMPRESSION_MAGIC = (
+    (b'\x1f\x8b', 'gzip'),
+    (b'BZh', 'bz2'),
+    (b'\xfd7zXZ\x00', 'xz'),
+)
+
+COMPRESSION_EXTENSIONS = {
+    '.gz': 'gzip',
+    '.gzip': 'gzip',
+    '.bz2': 'bz2',
+    '.xz': 'xz',
+}
+
+# Opener and compression-level keyword for each codec. gzip uses zlib's
+# default level rather than gzip.open's 9, which is several times slower
+# for little size gain on EDI and CSV text.
+_COMPRESSION_OPENERS = {
+    'gzip': (gzip.open, {'compresslevel': 6}),
+    'bz2': (bz2.open, {'compresslevel': 9}),
+    'xz': (lzma.open, {'preset': 6}),
+}
 
 
 def clean_string(value: str) -> str:
@@ -26,6 +58,9 @@ def format_date(date_str: str, input_format: str = "%m/%d/%Y", output_format: st
     """
     Convert date from one format to another.
     
+    The default MM/DD/YYYY -> YYYYMMDD conversion goes through a shared LRU
+    cache (see date_cache_info()).
+    
     Args:
         date_str: Date string to convert
         input_format: Format of input date (default: MM/DD/YYYY)
@@ -37,6 +72,9 @@ def format_date(date_str: str, input_format: str = "%m/%d/%Y", output_format: st
     if not date_str:
         return ""
     
+    if input_format == "%m/%d/%Y" and output_format == "%Y%m%d":
+        return _parse_date(date_str.strip())[0]
+    
     try:
         # Try to parse with the provided format
         date_obj = datetime.strptime(date_str.strip(), input_format)
@@ -48,6 +86,82 @@ def format_date(date_str: str, input_format: str = "%m/%d/%Y", output_format: st
         return ""
 
 
+_DAYS_IN_MONTH = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+
+def _is_real_date(year: int, month: int, day: int) -> bool:
+    """Check that year/month/day form a valid calendar date."""
+    if year < 1 or not 1 <= month <= 12 or day < 1:
+        return False
+    if month == 2 and year % 4 == 0 and (year % 100 != 0 or year % 400 == 0):
+        return day <= 29
+    return day <= _DAYS_IN_MONTH[month - 1]
+
+
+@lru_cache(maxsize=4096)
+def _parse_date(value: str) -> Tuple[str, bool]:
+    """
+    Normalize a stripped date string once for both parser and validator.
+    
+    Enrollment files repeat a small set of dates, so results are cached.
+    MM/DD/YYYY and YYYYMMDD are handled without strptime.
+    
+    Returns:
+        Tuple of (format_date() result, validate_date_format() result)
+    """
+    if value.isascii():
+        parts = value.split('/')
+        if (len(parts) == 3 and len(parts[2]) == 4 and 0 < len(parts[0]) <= 2
+                and 0 < len(parts[1]) <= 2 and ''.join(parts).isdigit()):
+            month, day, year = int(parts[0]), int(parts[1]), int(parts[2])
+            if _is_real_date(year, month, day):
+                return f"{year:04d}{month:02d}{day:02d}", False
+            return "", False
+        
+        if len(value) == 8 and value.isdigit():
+            year, month, day = int(value[:4]), int(value[4:6]), int(value[6:])
+            return value, _is_real_date(year, month, day)
+    
+    # Anything else takes the general strptime path
+    try:
+        formatted = datetime.strptime(value, "%m/%d/%Y").strftime("%Y%m%d")
+    except ValueError:
+        formatted = value if re.match(r'^\d{8}$', value) else ""
+    
+    is_valid = False
+    if re.match(r'^\d{8}$', value):
+        try:
+            datetime.strptime(value, "%Y%m%d")
+            is_valid = True
+        except ValueError:
+            pass
+    
+    return formatted, is_valid
+
+
+def date_cache_info() -> Dict[str, Any]:
+    """
+    Report hit-rate statistics for the shared date normalization cache.
+    
+    Returns:
+        Dictionary with hits, misses, hit_rate, size and maxsize
+    """
+    info = _parse_date.cache_info()
+    lookups = info.hits + info.misses
+    return {
+        'hits': info.hits,
+        'misses': info.misses,
+        'hit_rate': info.hits / lookups if lookups else 0.0,
+        'size': info.currsize,
+        'maxsize': info.maxsize,
+    }
+
+
+def clear_date_cache():
+    """Empty the shared date normalization cache and reset its statistics."""
+    _parse_date.cache_clear()
+
+
 def format_time(time_str: str = None) -> str:
     """
     Format time in HHMM format.
@@ -101,26 +215,6 @@ def pad_field(value: str, length: int, pad_char: str = " ", left: bool = False)
     return padding + value if left else value + padding
 
 
-def escape_delimiters(value: str, delimiters: list = None) -> str:
-    """
-    Escape EDI delimiters in text values.
-    
-    Args:
-        value: Text value to escape
-        delimiters: List of delimiter characters to escape
-        
-    Returns:
-        Escaped string
-    """
-    if delimiters is None:
-        delimiters = ['*', '~', ':']
-    
-    for delimiter in delimiters:
-        value = value.replace(delimiter, f"\\{delimiter}")
-    
-    return value
-
-
 def validate_ssn_format(ssn: str) -> bool:
     """
     Validate SSN format (9 digits).
@@ -144,14 +238,30 @@ def validate_date_format(date_str: str) -> bool:
     Returns:
         True if valid, False otherwise
     """
-    if not re.match(r'^\d{8}$', date_str):
+    if date_str != date_str.strip():
         return False
     
-    try:
-        datetime.strptime(date_str, "%Y%m%d")
-        return True
-    except ValueError:
-        return False
+    return _parse_date(date_str)[1]
+
+
+def valid_date_mask(year, month, day):
+    """
+    Vectorized calendar check for NumPy integer arrays of date parts.
+    
+    Args:
+        year: Array of years
+        month: Array of months
+        day: Array of days
+        
+    Returns:
+        Boolean array, True where the parts form a real date
+    """
+    import numpy as np
+    
+    days_in_month = np.array([31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+    leap = (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+    max_day = days_in_month[np.clip(month, 1, 12) - 1] + ((month == 2) & leap)
+    return (year >= 1) & (month >= 1) & (month <= 12) & (day >= 1) & (day <= max_day)
 
 
 def clean_row(row: Dict[str, Any]) -> Dict[str, Any]:
@@ -165,3 +275,60 @@ def clean_row(row: Dict[str, Any]) -> Dict[str, Any]:
         Cleaned row dictionary
     """
     return {key: clean_string(value) for key, value in row.items()}
+
+
+def detect_compression(path: str, mode: str = 'r') -> Optional[str]:
+    """
+    Work out the compression of a file from its magic bytes or extension.
+    
+    When reading an existing file its leading bytes decide, so a gzip file
+    without a .gz suffix is still recognized; otherwise (including writes)
+    the extension does.
+    
+    Args:
+        path: File path
+        mode: Mode the file will be opened in
+        
+    Returns:
+        'gzip', 'bz2', 'xz', or None for uncompressed files
+    """
+    if 'r' in mode and os.path.isfile(path):
+        with open(path, 'rb') as f:
+            head = f.read(6)
+        for magic, codec in COMPRESSION_MAGIC:
+            if head.startswith(magic):
+                return codec
+        if head:
+            return None
+    
+    return COMPRESSION_EXTENSIONS.get(os.path.splitext(path)[1].lower())
+
+
+def open_file(path: str, mode: str = 'r', encoding: Optional[str] = None,
+              newline: Optional[str] = None, buffering: int = -1) -> IO:
+    """
+    Open a plain, gzip, bz2 or xz file, compressing or decompressing on the fly.
+    
+    Args:
+        path: File path; compression is detected with detect_compression()
+        mode: Open mode as for open() ('r', 'w', 'rb', 'wt', ...)
+        encoding: Text encoding (text modes only)
+        newline: Newline handling (text modes only)
+        buffering: Buffer size for uncompressed files
+        
+    Returns:
+        File object
+        
+    Raises:
+        FileNotFoundError: If a file opened for reading doesn't exist
+    """
+    codec = detect_compression(path, mode)
+    if codec is None:
+        return open(path, mode, buffering=buffering, encoding=encoding, newline=newline)
+    
+    opener, level = _COMPRESSION_OPENERS[codec]
+    kwargs = {} if 'r' in mode else dict(level)
+    if 'b' not in mode:
+        mode = mode if 't' in mode else mode + 't'
+        kwargs.update(encoding=encoding, newline=newline)
+    return opener(path, mode, **kwargs)
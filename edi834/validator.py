@@ -7,22 +7,35 @@ Validates enrollment data against business rules before EDI generation.
 import re
 import yaml
 import os
-from typing import List, Dict, Any
-from .utils import validate_ssn_format, validate_date_format
+from typing import List, Dict, Any, Iterable, Optional, Union
+from .errors import ParseErrorSink
+from .utils import validate_ssn_format, validate_date_format, valid_date_mask
 
 
-def load_validation_rules() -> Dict[str, Any]:
+DATE_FIELDS = ('dob', 'coverage_start', 'coverage_end')
+
+DEFAULT_RULES_PATH = os.path.join(
+    os.path.dirname(__file__),
+    'config',
+    'validation_rules.yaml'
+)
+
+# Compiled rule sets keyed by config path, invalidated by file mtime
+_compiled_rules_cache = {}
+
+
+def load_validation_rules(config_path: str = None) -> Dict[str, Any]:
     """
     Load validation rules from YAML configuration file.
     
+    Args:
+        config_path: Optional path to a rules file (defaults to the bundled config)
+    
     Returns:
         Dictionary containing validation rules
     """
-    config_path = os.path.join(
-        os.path.dirname(__file__),
-        'config',
-        'validation_rules.yaml'
-    )
+    if config_path is None:
+        config_path = DEFAULT_RULES_PATH
     
     try:
         with open(config_path, 'r') as f:
@@ -39,23 +52,92 @@ def load_validation_rules() -> Dict[str, Any]:
         }
 
 
-def validate_records(records: List[Dict[str, Any]], rules: Dict[str, Any] = None) -> Dict[str, Any]:
+class CompiledRules:
+    """
+    Validation rules prepared for repeated use.
+    
+    Regex patterns are compiled and value lists are turned into frozensets
+    once, so validating each record does no rule lookups or pattern parsing.
+    """
+    
+    def __init__(self, rules: Dict[str, Any]):
+        """
+        Compile a rules dictionary as returned by load_validation_rules().
+        
+        Args:
+            rules: Validation rules
+        """
+        self.rules = rules
+        self.required_fields = tuple(rules.get('required_fields', []))
+        self.plan_codes = frozenset(rules.get('plan_codes', []))
+        self.max_lengths = tuple(rules.get('max_lengths', {}).items())
+        
+        patterns = rules.get('patterns', {})
+        self.zip_pattern = re.compile(patterns.get('zip', r'^\d{5}(-\d{4})?$'))
+        self.state_pattern = re.compile(patterns.get('state', r'^[A-Z]{2}$'))
+        
+        valid_values = rules.get('valid_values', {})
+        self.genders = frozenset(valid_values.get('gender', ['M', 'F', 'U']))
+        self.relationship_codes = frozenset(valid_values.get('relationship_code', ['01', '18', '19', '53']))
+
+
+def get_compiled_rules(config_path: str = None) -> CompiledRules:
+    """
+    Return the compiled rule set for a config file, reusing it until the file changes.
+    
+    Args:
+        config_path: Optional path to a rules file (defaults to the bundled config)
+        
+    Returns:
+        CompiledRules for the current contents of the file
+    """
+    if config_path is None:
+        config_path = DEFAULT_RULES_PATH
+    
+    try:
+        mtime = os.stat(config_path).st_mtime_ns
+    except FileNotFoundError:
+        mtime = None
+    
+    cached = _compiled_rules_cache.get(config_path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    
+    compiled = CompiledRules(load_validation_rules(config_path))
+    _compiled_rules_cache[config_path] = (mtime, compiled)
+    return compiled
+
+
+def validate_records(records: Iterable[Dict[str, Any]],
+                     rules: Union[Dict[str, Any], CompiledRules] = None,
+                     parse_errors: Optional[ParseErrorSink] = None) -> Dict[str, Any]:
     """
     Validate a list of enrollment records.
     
+    Records are consumed in a single pass, so a lazy iterator such as
+    parse_csv(..., stream=True) is validated without being materialized.
+    
+    Rows the parser dropped are merged in from parse_errors (read after the
+    records are consumed, so it may be filled by a lazy parse) under
+    'parse_errors'; any dropped row makes the result invalid.
+    
     Args:
-        records: List of enrollment records to validate
-        rules: Optional validation rules (loads from config if not provided)
+        records: List or iterable of enrollment records to validate
+        rules: Optional validation rules or CompiledRules (uses the cached
+            compiled config if not provided)
+        parse_errors: Optional ParseErrorSink the records were parsed with
         
     Returns:
         Dictionary containing validation results with errors and warnings
     """
     if rules is None:
-        rules = load_validation_rules()
+        rules = get_compiled_rules()
+    elif not isinstance(rules, CompiledRules):
+        rules = CompiledRules(rules)
     
     results = {
         'valid': True,
-        'total_records': len(records),
+        'total_records': 0,
         'valid_records': 0,
         'invalid_records': 0,
         'errors': [],
@@ -63,7 +145,8 @@ def validate_records(records: List[Dict[str, Any]], rules: Dict[str, Any] = None
     }
     
     for idx, record in enumerate(records):
-        record_errors = validate_record(record, rules)
+        results['total_records'] += 1
+        record_errors = _check_record(record, rules)
         
         if record_errors:
             results['invalid_records'] += 1
@@ -77,25 +160,37 @@ def validate_records(records: List[Dict[str, Any]], rules: Dict[str, Any] = None
         else:
             results['valid_records'] += 1
     
+    if parse_errors is not None:
+        results['parse_errors'] = parse_errors.to_dict()
+        if parse_errors.count:
+            results['valid'] = False
+    
     return results
 
 
-def validate_record(record: Dict[str, Any], rules: Dict[str, Any]) -> List[str]:
+def validate_record(record: Dict[str, Any], rules: Union[Dict[str, Any], CompiledRules]) -> List[str]:
     """
     Validate a single enrollment record.
     
     Args:
         record: Single enrollment record to validate
-        rules: Validation rules
+        rules: Validation rules or CompiledRules
         
     Returns:
         List of error messages (empty if valid)
     """
+    if not isinstance(rules, CompiledRules):
+        rules = CompiledRules(rules)
+    
+    return _check_record(record, rules)
+
+
+def _check_record(record: Dict[str, Any], rules: CompiledRules) -> List[str]:
+    """Validate a single record against compiled rules."""
     errors = []
     
     # Check required fields
-    required_fields = rules.get('required_fields', [])
-    for field in required_fields:
+    for field in rules.required_fields:
         if not record.get(field):
             errors.append(f"Missing required field: {field}")
     
@@ -105,46 +200,39 @@ def validate_record(record: Dict[str, Any], rules: Dict[str, Any]) -> List[str]:
             errors.append(f"Invalid SSN format: {record['ssn']}")
     
     # Validate date formats
-    date_fields = ['dob', 'coverage_start', 'coverage_end']
-    for field in date_fields:
+    for field in DATE_FIELDS:
         if record.get(field):
             if not validate_date_format(record[field]):
                 errors.append(f"Invalid date format for {field}: {record[field]} (expected YYYYMMDD)")
     
     # Validate plan code
-    valid_plan_codes = rules.get('plan_codes', [])
-    if record.get('plan_code') and valid_plan_codes:
-        if record['plan_code'] not in valid_plan_codes:
+    if record.get('plan_code') and rules.plan_codes:
+        if record['plan_code'] not in rules.plan_codes:
             errors.append(f"Invalid plan code: {record['plan_code']}")
     
     # Validate field lengths
-    max_lengths = rules.get('max_lengths', {})
-    for field, max_length in max_lengths.items():
+    for field, max_length in rules.max_lengths:
         if record.get(field) and len(str(record[field])) > max_length:
             errors.append(f"Field {field} exceeds maximum length of {max_length}")
     
     # Validate ZIP code format
     if record.get('zip'):
-        zip_pattern = rules.get('patterns', {}).get('zip', r'^\d{5}(-\d{4})?$')
-        if not re.match(zip_pattern, record['zip']):
+        if not rules.zip_pattern.match(record['zip']):
             errors.append(f"Invalid ZIP code format: {record['zip']}")
     
     # Validate state code
     if record.get('state'):
-        state_pattern = rules.get('patterns', {}).get('state', r'^[A-Z]{2}$')
-        if not re.match(state_pattern, record['state'].upper()):
+        if not rules.state_pattern.match(record['state'].upper()):
             errors.append(f"Invalid state code: {record['state']} (expected 2-letter state code)")
     
     # Validate gender
     if record.get('gender'):
-        valid_genders = rules.get('valid_values', {}).get('gender', ['M', 'F', 'U'])
-        if record['gender'] not in valid_genders:
+        if record['gender'] not in rules.genders:
             errors.append(f"Invalid gender code: {record['gender']}")
     
     # Validate relationship code
     if record.get('relationship_code'):
-        valid_relationships = rules.get('valid_values', {}).get('relationship_code', ['01', '18', '19', '53'])
-        if record['relationship_code'] not in valid_relationships:
+        if record['relationship_code'] not in rules.relationship_codes:
             errors.append(f"Invalid relationship code: {record['relationship_code']}")
     
     # Validate coverage dates logic
@@ -155,6 +243,133 @@ def validate_record(record: Dict[str, Any], rules: Dict[str, Any]) -> List[str]:
     return errors
 
 
+def validate_frame(df, rules: Union[Dict[str, Any], CompiledRules] = None) -> Dict[str, Any]:
+    """
+    Validate enrollment records held in a pandas DataFrame.
+    
+    Applies the same checks as validate_records() column-wise, then builds
+    error messages only for the rows that failed. The result has the same
+    structure (and error message order) as validate_records().
+    
+    Args:
+        df: DataFrame with one normalized enrollment record per row
+        rules: Optional validation rules or CompiledRules (uses the cached
+            compiled config if not provided)
+        
+    Returns:
+        Dictionary containing validation results with errors and warnings
+    """
+    import numpy as np
+    import pandas as pd
+    
+    if rules is None:
+        rules = get_compiled_rules()
+    elif not isinstance(rules, CompiledRules):
+        rules = CompiledRules(rules)
+    
+    total = len(df)
+    columns = {}
+    
+    def column(field):
+        if field not in columns:
+            if field in df.columns:
+                columns[field] = df[field].fillna('').astype(str).reset_index(drop=True)
+            else:
+                columns[field] = pd.Series([''] * total, dtype=object)
+        return columns[field]
+    
+    # Each check is (failure mask, message builder taking the row position)
+    checks = []
+    
+    # Check required fields
+    for field in rules.required_fields:
+        message = f"Missing required field: {field}"
+        checks.append(((column(field) == '').to_numpy(), lambda i, m=message: m))
+    
+    # Validate SSN format
+    ssn = column('ssn')
+    ssn_digits = ssn.str.replace('-', '', regex=False).str.replace(' ', '', regex=False)
+    mask = (ssn != '') & ~ssn_digits.str.fullmatch(r'\d{9}')
+    checks.append((mask.to_numpy(), lambda i, v=ssn: f"Invalid SSN format: {v[i]}"))
+    
+    # Validate date formats (YYYYMMDD that is a real calendar date)
+    for field in DATE_FIELDS:
+        values = column(field)
+        shaped = values.str.fullmatch(r'\d{8}').to_numpy(dtype=bool)
+        number = values.where(shaped, '00010101').astype('int64').to_numpy()
+        real_date = shaped & valid_date_mask(number // 10000, number // 100 % 100, number % 100)
+        mask = (values != '').to_numpy() & ~real_date
+        checks.append((mask, lambda i, v=values, f=field:
+                       f"Invalid date format for {f}: {v[i]} (expected YYYYMMDD)"))
+    
+    # Validate plan code
+    plan_code = column('plan_code')
+    if rules.plan_codes:
+        mask = (plan_code != '') & ~plan_code.isin(rules.plan_codes)
+        checks.append((mask.to_numpy(), lambda i, v=plan_code: f"Invalid plan code: {v[i]}"))
+    
+    # Validate field lengths
+    for field, max_length in rules.max_lengths:
+        message = f"Field {field} exceeds maximum length of {max_length}"
+        checks.append(((column(field).str.len() > max_length).to_numpy(), lambda i, m=message: m))
+    
+    # Validate ZIP code format
+    zip_code = column('zip')
+    mask = (zip_code != '') & ~zip_code.str.match(rules.zip_pattern.pattern).astype(bool)
+    checks.append((mask.to_numpy(), lambda i, v=zip_code: f"Invalid ZIP code format: {v[i]}"))
+    
+    # Validate state code
+    state = column('state')
+    mask = (state != '') & ~state.str.upper().str.match(rules.state_pattern.pattern).astype(bool)
+    checks.append((mask.to_numpy(), lambda i, v=state:
+                   f"Invalid state code: {v[i]} (expected 2-letter state code)"))
+    
+    # Validate gender
+    gender = column('gender')
+    mask = (gender != '') & ~gender.isin(rules.genders)
+    checks.append((mask.to_numpy(), lambda i, v=gender: f"Invalid gender code: {v[i]}"))
+    
+    # Validate relationship code
+    relationship = column('relationship_code')
+    mask = (relationship != '') & ~relationship.isin(rules.relationship_codes)
+    checks.append((mask.to_numpy(), lambda i, v=relationship: f"Invalid relationship code: {v[i]}"))
+    
+    # Validate coverage dates logic
+    start, end = column('coverage_start'), column('coverage_end')
+    mask = (start != '') & (end != '') & (start > end)
+    checks.append((mask.to_numpy(), lambda i, s=start, e=end:
+                   f"Coverage start date ({s[i]}) is after end date ({e[i]})"))
+    
+    failed = np.zeros(total, dtype=bool)
+    for mask, _ in checks:
+        failed |= mask
+    
+    if 'row_number' in df.columns:
+        row_numbers = df['row_number'].tolist()
+    else:
+        row_numbers = list(range(1, total + 1))
+    employee_ids = df['employee_id'].tolist() if 'employee_id' in df.columns else ['N/A'] * total
+    
+    results = {
+        'valid': not failed.any(),
+        'total_records': total,
+        'valid_records': int(total - failed.sum()),
+        'invalid_records': int(failed.sum()),
+        'errors': [],
+        'warnings': [],
+    }
+    
+    for i in np.flatnonzero(failed).tolist():
+        results['errors'].append({
+            'record': i + 1,
+            'row_number': row_numbers[i],
+            'employee_id': employee_ids[i],
+            'errors': [build(i) for mask, build in checks if mask[i]]
+        })
+    
+    return results
+
+
 def generate_validation_report(validation_results: Dict[str, Any], output_format: str = 'text') -> str:
     """
     Generate a formatted validation report.
@@ -172,6 +387,8 @@ def generate_validation_report(validation_results: Dict[str, Any], output_format
     
     elif output_format == 'csv':
         lines = ['Record,Row,Employee ID,Error']
+        for parse_error in validation_results.get('parse_errors', {}).get('errors', []):
+            lines.append(f",{parse_error['row_number']},,\"{_parse_error_text(parse_error)}\"")
         for error_entry in validation_results.get('errors', []):
             for error in error_entry['errors']:
                 lines.append(
@@ -190,6 +407,16 @@ def generate_validation_report(validation_results: Dict[str, Any], output_format
         lines.append(f"Invalid Records: {validation_results['invalid_records']}")
         lines.append("")
         
+        parse_errors = validation_results.get('parse_errors')
+        if parse_errors and parse_errors['count']:
+            lines.append(f"PARSE ERRORS ({parse_errors['count']} rows dropped):")
+            lines.append("-" * 60)
+            for parse_error in parse_errors['errors']:
+                lines.append(f"  - Row {parse_error['row_number']}: {_parse_error_text(parse_error)}")
+            if parse_errors['truncated']:
+                lines.append(f"  ... and {parse_errors['count'] - len(parse_errors['errors'])} more")
+            lines.append("")
+        
         if validation_results['errors']:
             lines.append("ERRORS:")
             lines.append("-" * 60)
@@ -198,7 +425,7 @@ def generate_validation_report(validation_results: Dict[str, Any], output_format
                            f"Employee ID: {error_entry['employee_id']}):")
                 for error in error_entry['errors']:
                     lines.append(f"  - {error}")
-        else:
+        elif validation_results['valid']:
             lines.append("No errors found. All records are valid!")
         
         lines.append("")
@@ -207,6 +434,13 @@ def generate_validation_report(validation_results: Dict[str, Any], output_format
         return '\n'.join(lines)
 
 
+def _parse_error_text(parse_error: Dict[str, Any]) -> str:
+    """Describe a parse error entry, prefixed with its column when known."""
+    if parse_error['column']:
+        return f"{parse_error['column']}: {parse_error['reason']}"
+    return parse_error['reason']
+
+
 def save_validation_report(validation_results: Dict[str, Any], output_path: str, output_format: str = 'text'):
     """
     Save validation report to a file.
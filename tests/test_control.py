@@ -0,0 +1,106 @@
+"""
+Tests for the control number store.
+"""
+
+import pytest
+from concurrent.futures import ProcessPoolExecutor
+from edi834.control import ControlNumberStore, ControlSequence, MAX_CONTROL_NUMBERS
+from edi834.generator import EDI834Generator, write_834_files
+
+
+def _reserve_many(path):
+    store = ControlNumberStore(path, 'SENDER', 'RECEIVER')
+    return [store.reserve('interchange') for _ in range(20)]
+
+
+def test_store_monotonic(tmp_path):
+    """Test that numbers increase across store instances."""
+    path = str(tmp_path / 'control.db')
+    
+    store = ControlNumberStore(path, 'SENDER', 'RECEIVER')
+    assert store.next_interchange() == '000000001'
+    assert store.next_interchange() == '000000002'
+    assert store.next_transaction_set() == '0001'
+    
+    reopened = ControlNumberStore(path, 'SENDER', 'RECEIVER')
+    assert reopened.next_interchange() == '000000003'
+    assert reopened.last_values() == {'interchange': 3, 'transaction_set': 1}
+
+
+def test_store_per_partner(tmp_path):
+    """Test that sender/receiver pairs have independent counters."""
+    path = str(tmp_path / 'control.db')
+    
+    ControlNumberStore(path, 'SENDER', 'RECEIVER').next_group()
+    assert ControlNumberStore(path, 'SENDER', 'OTHER').next_group() == '000000001'
+
+
+def test_store_block_reservation_and_wrap(tmp_path):
+    """Test block reservation and wrap-around at the element maximum."""
+    store = ControlNumberStore(str(tmp_path / 'control.db'))
+    
+    assert store.reserve('group', 10) == 1
+    assert store.reserve('group', 5) == 11
+    
+    store.reserve('interchange', MAX_CONTROL_NUMBERS['interchange'] - 1)
+    assert store.reserve('interchange', 2) == 1
+    
+    with pytest.raises(ValueError):
+        store.reserve('unknown')
+    with pytest.raises(ValueError):
+        store.reserve('group', 0)
+
+
+def test_store_parallel_processes(tmp_path):
+    """Test that concurrent processes never receive the same number."""
+    path = str(tmp_path / 'control.db')
+    ControlNumberStore(path)
+    
+    with ProcessPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(_reserve_many, [path] * 4))
+    
+    numbers = [n for block in results for n in block]
+    assert sorted(numbers) == list(range(1, 81))
+    for block in results:
+        assert block == sorted(block)
+
+
+def test_control_sequence_peek_take(tmp_path):
+    """Test that peeking does not consume numbers."""
+    store = ControlNumberStore(str(tmp_path / 'control.db'))
+    sequence = ControlSequence(store, 'transaction_set', block_size=3, width=4)
+    
+    assert sequence.peek() == '0001'
+    assert sequence.take() == '0001'
+    assert [sequence.take() for _ in range(3)] == ['0002', '0003', '0004']
+    assert store.last_values()['transaction_set'] == 6
+
+
+def test_generator_uses_store(tmp_path):
+    """Test that generated files take their control numbers from the store."""
+    store = ControlNumberStore(str(tmp_path / 'control.db'), 'SENDER', 'RECEIVER')
+    records = [
+        {
+            'employee_id': str(10000 + i),
+            'ssn': '111223333',
+            'first_name': 'Member',
+            'last_name': 'Test',
+            'plan_code': 'MED001',
+            'coverage_start': '20240101',
+            'relationship_code': '18',
+        }
+        for i in range(5)
+    ]
+    
+    manifest = write_834_files(records, str(tmp_path / 'out_{n}.edi'), max_members=2,
+                               max_members_per_st=1, control_store=store)
+    
+    assert [entry['interchange_control_number'] for entry in manifest] == [
+        '000000001', '000000002', '000000003']
+    groups = [g for entry in manifest for g in entry['group_control_numbers']]
+    assert groups == ['000000001', '000000002', '000000003']
+    sets = [t for entry in manifest for t in entry['transaction_set_control_numbers']]
+    assert sets == ['0001', '0002', '0003', '0004', '0005']
+    
+    # A second generator continues where the first stopped
+    assert EDI834Generator('SENDER', 'RECEIVER', control_store=store).control_number == '000000004'
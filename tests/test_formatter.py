@@ -2,6 +2,8 @@
 Tests for the formatter module.
 """
 
+import json
+
 import pytest
 from edi834.formatter import (
     format_edi_segment,
@@ -15,7 +17,12 @@ from edi834.formatter import (
     pretty_print_edi,
     edi_to_json,
     validate_edi_structure,
-    escape_delimiters
+    escape_delimiters,
+    SegmentTemplate,
+    SLOT,
+    Delimiters,
+    DelimiterEscaper,
+    check_envelope,
 )
 
 
@@ -129,6 +136,19 @@ def test_pretty_print_edi():
             assert '~' in line
 
 
+def test_pretty_print_edi_line_terminator():
+    """Test a newline segment terminator is not followed by a blank line."""
+    edi_content = ('ISA*00*          *00*          *ZZ*SENDER         *ZZ*RECEIVER       '
+                   '*241020*1200*^*00501*000000001*0*T*:\nGS*BE*SENDER\nST*834*0001\n')
+    
+    pretty = pretty_print_edi(edi_content)
+    
+    assert Delimiters(segment='\n').line_terminated is True
+    assert '\n\n' not in pretty
+    assert pretty == edi_content
+    assert pretty_print_edi(edi_content, delimiters=Delimiters(segment='\n')) == edi_content
+
+
 def test_edi_to_json():
     """Test EDI to JSON conversion."""
     edi_content = 'ISA*00*          *ZZ*SENDER~GS*BE*SENDER*RECEIVER~'
@@ -146,6 +166,13 @@ def test_edi_to_json():
     assert data[1]['segment'] == 'GS'
 
 
+def test_edi_to_json_keeps_segments_without_elements():
+    """Test segments without an element separator are not dropped."""
+    data = json.loads(edi_to_json('LS*2700~LE~'))
+    
+    assert data == [{'segment': 'LS', 'elements': ['2700']}, {'segment': 'LE', 'elements': []}]
+
+
 def test_escape_delimiters():
     """Test delimiter escaping."""
     text = "Test*with~delimiters:here"
@@ -167,7 +194,10 @@ def test_escape_delimiters_none_value():
 
 def test_validate_edi_structure_valid():
     """Test EDI structure validation with valid content."""
-    edi_content = 'ISA*00*          *ZZ*SENDER~GS*BE*SENDER*RECEIVER~ST*834*0001~BGN*00*001~SE*4*0001~GE*1*1~IEA*1*000000001~'
+    edi_content = (
+        'ISA*00*          *00*          *ZZ*SENDER         *ZZ*RECEIVER       *241020*1200*^*00501*000000001*0*T*:~'
+        'GS*BE*SENDER*RECEIVER*20241020*1200*1*X*005010X220A1~ST*834*0001~BGN*00*001~SE*3*0001~GE*1*1~IEA*1*000000001~'
+    )
     
     result = validate_edi_structure(edi_content)
     
@@ -220,3 +250,119 @@ def test_pad_field_zero_length():
     
     # Should truncate to 0
     assert result == ''
+
+
+def test_segment_template_matches_format_edi_segment():
+    """Test precompiled templates render the same as format_edi_segment."""
+    template = SegmentTemplate('NM1', ['IL', '1', SLOT, SLOT, '', '34', SLOT], '|', '\n')
+    
+    assert template.slot_count == 3
+    assert template.render('DOE', 'J{0}', '123') == format_edi_segment(
+        'NM1', ['IL', '1', 'DOE', 'J{0}', '', '34', '123'], '|', '\n'
+    )
+
+
+def test_delimiters_rejects_invalid_sets():
+    """Test delimiter sets must be distinct single non-alphanumeric characters."""
+    with pytest.raises(ValueError):
+        Delimiters(element='**')
+    with pytest.raises(ValueError):
+        Delimiters(element='A')
+    with pytest.raises(ValueError):
+        Delimiters(element='|', segment='|')
+    
+    assert Delimiters(element='|') == Delimiters(element='|')
+
+
+def test_envelope_segments_with_delimiters():
+    """Test envelope formatters and escaping follow a Delimiters set."""
+    delimiters = Delimiters(element='|', segment='\n', component='>', repetition='!')
+    isa = format_isa_segment('S', 'R', '241020', '1200', '1', 'T', delimiters)
+    
+    assert isa.endswith('|!|00501|000000001|0|T|>\n')
+    assert format_se_segment(5, '0001', delimiters) == 'SE|5|0001\n'
+    assert escape_delimiters('A|B>C!D*E', delimiters) == 'A B C D*E'
+
+
+def test_delimiter_escaper_counts_altered_values():
+    """Test the escaper leaves clean values alone and counts the ones it changes."""
+    escaper = DelimiterEscaper()
+    
+    assert escaper.escape('Smith') == 'Smith'
+    assert escaper.escape('Smith*Jones^Jr') == 'Smith Jones Jr'
+    assert escaper.escape(None) == ''
+    assert escaper.escape(12345) == '12345'
+    assert escaper.altered == 1
+    
+    assert escape_delimiters('A|B*C', ['|']) == 'A B*C'
+    assert DelimiterEscaper('|').escape('A|B*C') == 'A B*C'
+
+
+def test_check_envelope_counts():
+    """Test SE01, GE01 and IEA01 are compared with the actual counts."""
+    edi_content = (
+        'ISA*00*          *00*          *ZZ*SENDER         *ZZ*RECEIVER       *241020*1200*^*00501*000000001*0*T*:~'
+        'GS*BE*SENDER*RECEIVER*20241020*1200*7*X*005010X220A1~'
+        'ST*834*0001~BGN*00~SE*3*0001~'
+        'ST*834*0002~BGN*00~INS*Y~SE*3*0002~'
+        'GE*1*7~IEA*2*000000001~'
+    )
+    
+    result = check_envelope(edi_content)
+    
+    assert result['valid'] is False
+    assert result['segment_count'] == 11
+    assert result['transaction_set_count'] == 2
+    messages = [detail['message'] for detail in result['error_details']]
+    assert messages == [
+        'SE01 is 3 but the transaction set has 4 segments',
+        'GE01 is 1 but the functional group has 2 transaction sets',
+        'IEA01 is 2 but the interchange has 1 functional groups',
+    ]
+    assert result['error_details'][0]['offset'] == edi_content.index('SE*3*0002')
+
+
+def test_check_envelope_nesting():
+    """Test segments outside their envelope are reported."""
+    result = check_envelope('ISA*00~ST*834*1~SE*2*1~NM1*IL~IEA*0*1~')
+    
+    assert result['valid'] is False
+    assert any('ST outside a functional group' in error for error in result['errors'])
+    assert any('outside a transaction set' in error for error in result['errors'])
+    assert any('Missing required segment: GS' in error for error in result['errors'])
+
+
+def test_validate_edi_structure_control_numbers():
+    """Test trailer control numbers must match their headers and ST02 must be unique."""
+    edi_content = (
+        'ISA*00*          *00*          *ZZ*SENDER         *ZZ*RECEIVER       *241020*1200*^*00501*000000001*0*T*:~'
+        'GS*BE*SENDER*RECEIVER*20241020*1200*7*X*005010X220A1~'
+        'ST*834*0001~BGN*00~SE*3*0002~'
+        'ST*834*0001~BGN*00~SE*3*0001~'
+        'GE*2*8~IEA*1*000000002~'
+    )
+    
+    result = validate_edi_structure(edi_content)
+    
+    assert result['valid'] is False
+    messages = [detail['message'] for detail in result['error_details']]
+    assert messages == [
+        "SE02 '0002' does not match ST02 '0001'",
+        "ST02 '0001' is repeated in the functional group",
+        "GE02 '8' does not match GS06 '7'",
+        "IEA02 '000000002' does not match ISA13 '000000001'",
+    ]
+
+
+def test_validate_edi_structure_generated_output():
+    """Test split generator output passes the full envelope check."""
+    from edi834.generator import generate_834
+    
+    records = [{'employee_id': str(i), 'plan_code': 'MED001'} for i in range(7)]
+    edi_content = generate_834(records, max_members_per_st=2, max_st_per_gs=2)
+    
+    result = validate_edi_structure(pretty_print_edi(edi_content))
+    
+    assert result['valid'] is True, result['errors']
+    assert result['transaction_set_count'] == 4
+    assert result['group_count'] == 2
@@ -3,7 +3,23 @@ Tests for the EDI generator module.
 """
 
 import pytest
-from edi834.generator import EDI834Generator, generate_834
+from datetime import datetime
+from edi834.generator import EDI834Generator, generate_834, write_834, write_834_files
+from edi834.formatter import Delimiters, validate_edi_structure
+
+
+class FrozenDateTime(datetime):
+    """datetime with a fixed now() so repeated generations are comparable."""
+    
+    @classmethod
+    def now(cls, tz=None):
+        return cls(2024, 10, 20, 12, 0, 0)
+
+
+@pytest.fixture
+def frozen_time(monkeypatch):
+    """Freeze the clock used for envelope dates and times."""
+    monkeypatch.setattr('edi834.generator.datetime', FrozenDateTime)
 
 
 def test_generator_initialization():
@@ -151,9 +167,7 @@ def test_generate_with_optional_fields():
 def test_isa_segment_format():
     """Test ISA segment formatting."""
     generator = EDI834Generator('SEND', 'RECV')
-    header_segments = generator._generate_header()
-    
-    isa_segment = header_segments[0]
+    isa_segment = generator._generate_isa()
     
     # ISA should start with ISA*
     assert isa_segment.startswith('ISA*')
@@ -231,3 +245,347 @@ def test_sponsor_loop_generation():
     sponsor_str = ''.join(sponsor_segments)
     assert 'NM1*P5*' in sponsor_str
     assert 'ACME_CORP' in sponsor_str
+
+
+def test_generate_834_from_iterator():
+    """Test that generation accepts a one-shot iterator of records."""
+    records = [
+        {
+            'employee_id': str(12345 + i),
+            'ssn': '111223333',
+            'first_name': 'John',
+            'last_name': 'Doe',
+            'dob': '19850115',
+            'plan_code': 'MED001',
+            'coverage_start': '20240101',
+            'relationship_code': '18',
+        }
+        for i in range(3)
+    ]
+    
+    edi_content = generate_834(iter(records), 'SENDER', 'RECEIVER')
+    
+    assert edi_content.count('INS*') == 3
+
+
+def test_generate_to_matches_generate(frozen_time):
+    """Test that streaming output matches in-memory generation."""
+    import io
+    from edi834.formatter import pretty_print_edi
+    
+    records = [
+        {
+            'employee_id': '12345',
+            'ssn': '111223333',
+            'first_name': 'John',
+            'last_name': 'Doe',
+            'dob': '19850115',
+            'plan_code': 'MED001',
+            'coverage_start': '20240101',
+            'relationship_code': '18',
+        }
+    ]
+    generator = EDI834Generator('SENDER', 'RECEIVER')
+    
+    expected = generator.generate(records)
+    
+    buffer = io.StringIO()
+    count = generator.generate_to(buffer, iter(records))
+    assert buffer.getvalue() == expected
+    assert count == expected.count('~')
+    
+    buffer = io.StringIO()
+    generator.generate_to(buffer, records, pretty=True)
+    assert buffer.getvalue() == pretty_print_edi(expected)
+
+
+def test_write_834(tmp_path):
+    """Test streaming an EDI file to disk."""
+    records = [
+        {
+            'employee_id': '12345',
+            'ssn': '111223333',
+            'first_name': 'John',
+            'last_name': 'Doe',
+            'dob': '19850115',
+            'plan_code': 'MED001',
+            'coverage_start': '20240101',
+            'relationship_code': '18',
+        }
+    ]
+    output_path = tmp_path / 'out.edi'
+    
+    count = write_834(iter(records), str(output_path), 'SENDER', 'RECEIVER')
+    
+    content = output_path.read_text(encoding='utf-8')
+    assert content.startswith('ISA*')
+    assert content.endswith('~')
+    assert content.count('~') == count
+    
+    se_segment = [s for s in content.split('~') if s.startswith('SE*')][0]
+    st_index = [s.split('*')[0] for s in content.split('~')].index('ST')
+    se_index = [s.split('*')[0] for s in content.split('~')].index('SE')
+    assert int(se_segment.split('*')[1]) == se_index - st_index + 1
+
+
+def test_generate_with_workers_matches_serial(frozen_time):
+    """Test that multi-process rendering is byte-identical to serial mode."""
+    records = [
+        {
+            'employee_id': str(10000 + i),
+            'ssn': '111223333',
+            'first_name': 'Member',
+            'last_name': f'Number{i}',
+            'dob': '19850115',
+            'plan_code': 'MED001',
+            'coverage_start': '20240101',
+            'coverage_end': '20241231' if i % 2 else '',
+            'relationship_code': '18',
+        }
+        for i in range(25)
+    ]
+    
+    generator = EDI834Generator('SENDER', 'RECEIVER')
+    serial = generator.generate(records)
+    
+    generator.workers = 3
+    generator.chunk_size = 4
+    parallel = generator.generate(iter(records))
+    
+    assert parallel == serial
+
+
+def test_split_transaction_sets_and_groups():
+    """Test splitting members across transaction sets and functional groups."""
+    records = [
+        {
+            'employee_id': str(10000 + i),
+            'ssn': '111223333',
+            'first_name': 'Member',
+            'last_name': f'Number{i}',
+            'dob': '19850115',
+            'plan_code': 'MED001',
+            'coverage_start': '20240101',
+            'relationship_code': '18',
+        }
+        for i in range(7)
+    ]
+    
+    edi_content = generate_834(records, max_members_per_st=3, max_st_per_gs=2)
+    segments = [s.split('*') for s in edi_content.split('~') if s]
+    tags = [s[0] for s in segments]
+    
+    assert tags.count('INS') == 7
+    assert tags.count('ST') == 3
+    assert tags.count('GS') == 2
+    
+    st_controls = []
+    group_sets = []
+    for idx, segment in enumerate(segments):
+        if segment[0] == 'GS':
+            gs = segment
+            sets = 0
+        elif segment[0] == 'ST':
+            st_start = idx
+            st_controls.append(segment[2])
+            sets += 1
+        elif segment[0] == 'SE':
+            assert int(segment[1]) == idx - st_start + 1
+            assert segment[2] == segments[st_start][2]
+        elif segment[0] == 'GE':
+            assert segment[2] == gs[6]
+            assert int(segment[1]) == sets
+            group_sets.append(sets)
+    
+    assert len(set(st_controls)) == 3
+    assert group_sets == [2, 1]
+    assert segments[-1][0] == 'IEA'
+    assert segments[-1][1] == '2'
+    
+    # Members per set: 3, 3, 1
+    members_per_set = []
+    for tag in tags:
+        if tag == 'ST':
+            members_per_set.append(0)
+        elif tag == 'INS':
+            members_per_set[-1] += 1
+    assert members_per_set == [3, 3, 1]
+
+
+def _split_records(count):
+    return [
+        {
+            'employee_id': str(10000 + i),
+            'ssn': '111223333',
+            'first_name': 'Member',
+            'last_name': f'Number{i}',
+            'dob': '19850115',
+            'plan_code': 'MED001',
+            'coverage_start': '20240101',
+            'relationship_code': '18',
+        }
+        for i in range(count)
+    ]
+
+
+def test_generate_files_max_members(tmp_path):
+    """Test rolling over to a new interchange after max_members."""
+    import json
+    from edi834.formatter import validate_edi_structure
+    
+    manifest_path = tmp_path / 'manifest.json'
+    manifest = write_834_files(_split_records(7), str(tmp_path / 'out_{n:03d}.edi'),
+                               max_members=3, manifest_path=str(manifest_path),
+                               max_members_per_st=2)
+    
+    assert [entry['member_count'] for entry in manifest] == [3, 3, 1]
+    assert [entry['first_member'] for entry in manifest] == [1, 4, 7]
+    assert [entry['last_member'] for entry in manifest] == [3, 6, 7]
+    assert manifest[0]['file'].endswith('out_001.edi')
+    assert len({entry['interchange_control_number'] for entry in manifest}) == 3
+    assert json.loads(manifest_path.read_text())['files'] == manifest
+    
+    for entry in manifest:
+        content = open(entry['file'], encoding='utf-8').read()
+        assert validate_edi_structure(content)['valid'] is True
+        assert content.count('INS*') == entry['member_count']
+        assert content.count('ST*834*') == len(entry['transaction_set_control_numbers'])
+        assert f"IEA*1*{entry['interchange_control_number']}~" in content
+
+
+def test_generate_files_control_numbers_unique(tmp_path):
+    """Test control numbers do not repeat across the files of one manifest."""
+    manifest = write_834_files(_split_records(8), str(tmp_path / 'out_{n}.edi'),
+                               max_members=4, max_members_per_st=1, max_st_per_gs=2)
+    
+    interchanges = [entry['interchange_control_number'] for entry in manifest]
+    groups = [g for entry in manifest for g in entry['group_control_numbers']]
+    assert len(manifest) == 2
+    assert len(groups) == 4
+    assert len(set(interchanges)) == len(interchanges)
+    assert len(set(groups)) == len(groups)
+
+
+def test_generate_files_max_bytes(tmp_path):
+    """Test that each file stays within max_bytes, trailers included."""
+    import os
+    
+    max_bytes = 1500
+    manifest = write_834_files(_split_records(20), str(tmp_path / 'out_{n}.edi'),
+                               max_bytes=max_bytes, pretty=True)
+    
+    assert len(manifest) > 1
+    assert sum(entry['member_count'] for entry in manifest) == 20
+    
+    for entry in manifest:
+        assert os.path.getsize(entry['file']) == entry['bytes']
+        assert entry['bytes'] <= max_bytes
+        content = open(entry['file'], encoding='utf-8').read()
+        assert content.rstrip().endswith('~')
+        se = [s for s in content.replace('\n', '').split('~') if s.startswith('SE*')][0]
+        segments = content.replace('\n', '').split('~')
+        st_index = [s.split('*')[0] for s in segments].index('ST')
+        se_index = [s.split('*')[0] for s in segments].index('SE')
+        assert int(se.split('*')[1]) == se_index - st_index + 1
+
+
+def test_generate_files_line_terminated(tmp_path):
+    """Test newline segment terminators are written untranslated and counted exactly."""
+    import os
+    
+    delimiters = Delimiters(segment='\n')
+    manifest = write_834_files(_split_records(20), str(tmp_path / 'out_{n}.edi'),
+                               max_bytes=1500, delimiters=delimiters)
+    
+    assert len(manifest) > 1
+    for entry in manifest:
+        data = open(entry['file'], 'rb').read()
+        assert b'\r' not in data
+        assert os.path.getsize(entry['file']) == entry['bytes'] <= 1500
+
+
+def test_generate_files_empty_input(tmp_path):
+    """Test that empty input still produces one well-formed file."""
+    manifest = write_834_files([], str(tmp_path / 'out_{n}.edi'), max_members=10)
+    
+    assert len(manifest) == 1
+    assert manifest[0]['member_count'] == 0
+    assert manifest[0]['first_member'] is None
+
+
+def test_generate_with_custom_delimiters(frozen_time):
+    """Test every segment uses the configured delimiters and ISA declares them."""
+    delimiters = Delimiters(element='|', segment='\n', component='>', repetition='!')
+    records = _split_records(3)
+    records[0]['last_name'] = 'O|Brien'
+    
+    edi_content = generate_834(records, delimiters=delimiters)
+    segments = edi_content.split('\n')[:-1]
+    
+    assert all('*' not in s and '~' not in s for s in segments)
+    isa = segments[0].split('|')
+    assert len(segments[0]) == 105
+    assert isa[11] == '!'
+    assert isa[16] == '>'
+    assert 'NM1|IL|1|O Brien|' in edi_content
+    assert validate_edi_structure(edi_content, delimiters)['valid'] is True
+    
+    default_content = generate_834(_split_records(3))
+    assert default_content.count('~') == len(segments)
+
+
+def test_write_834_pretty_with_newline_terminator(tmp_path, frozen_time):
+    """Test pretty output does not add blank lines when segments end lines."""
+    output_path = tmp_path / 'out.edi'
+    delimiters = Delimiters(segment='\n')
+    
+    count = write_834(_split_records(2), str(output_path), pretty=True, delimiters=delimiters)
+    
+    lines = output_path.read_text(encoding='utf-8').split('\n')
+    assert lines[-1] == ''
+    assert len(lines) - 1 == count
+    assert all(lines[:-1])
+
+
+def test_escaped_values_counted(frozen_time, tmp_path):
+    """Test values containing delimiters are counted, including from workers."""
+    records = _split_records(5)
+    records[1]['last_name'] = 'O*Brien'
+    records[3]['address1'] = '1 Main St~Apt 2'
+    records[3]['city'] = 'Spring:field'
+    
+    generator = EDI834Generator()
+    generator.generate(records)
+    assert generator.escaped_values == 3
+    
+    parallel = EDI834Generator(workers=2, chunk_size=2)
+    parallel.generate(records)
+    assert parallel.escaped_values == 3
+    
+    report = {}
+    write_834(records, str(tmp_path / 'out.edi'), report=report)
+    assert report['escaped_values'] == 3
+
+
+def test_write_834_compressed_output(tmp_path):
+    """Test output paths ending in .gz/.bz2/.xz are written compressed."""
+    import gzip
+    import lzma
+    from edi834.reader import iter_segments, validate_edi_file
+    
+    records = _split_records(3)
+    plain_path = tmp_path / 'out.edi'
+    write_834(records, str(plain_path))
+    
+    for suffix, decompress in (('.gz', gzip.decompress), ('.xz', lzma.decompress)):
+        output_path = tmp_path / f'out.edi{suffix}'
+        write_834(records, str(output_path))
+        
+        content = decompress(output_path.read_bytes()).decode('utf-8')
+        assert content.startswith('ISA*')
+        assert validate_edi_file(str(output_path))['valid'] is True
+        assert len(list(iter_segments(str(output_path)))) == len(list(iter_segments(str(plain_path))))
+    
+    manifest = write_834_files(records, str(tmp_path / 'part_{n}.edi.bz2'), max_members=1)
+    assert len(manifest) == len(records)
+    assert (tmp_path / 'part_1.edi.bz2').read_bytes().startswith(b'BZh')
@@ -0,0 +1,52 @@
+"""
+Tests for the header layout cache.
+"""
+
+from edi834.layouts import HeaderLayoutCache
+from edi834.parser import HeaderPlan, layout_key, scan_csv
+
+
+HEADERS = ['EmpID', 'SSN', 'FirstName', 'Vendor_Flag', 'Emp_ID']
+
+
+def test_header_plan_round_trip():
+    """Test a stored plan extracts the same fields without re-resolving."""
+    plan = HeaderPlan(HEADERS)
+    restored = HeaderPlan.from_dict(plan.to_dict())
+    values = ['', '111223333', 'John', 'Y', '777']
+    
+    assert plan.unmapped == ['EmpID', 'Vendor_Flag']
+    assert restored.extract(values) == plan.extract(values)
+    assert restored.unmapped == plan.unmapped
+    assert layout_key(HEADERS) != layout_key(list(reversed(HEADERS)))
+
+
+def test_cache_reports_new_layouts_once(tmp_path):
+    """Test layouts persist across cache instances and are new only once."""
+    path = str(tmp_path / 'cache' / 'layouts.db')
+    
+    cache = HeaderLayoutCache(path)
+    plan, new_layout = cache.plan(HEADERS)
+    assert new_layout is True
+    assert cache.plan(HEADERS) == (plan, False)
+    
+    reopened = HeaderLayoutCache(path)
+    plan, new_layout = reopened.plan(HEADERS)
+    assert new_layout is False
+    assert plan.unmapped == ['EmpID', 'Vendor_Flag']
+    assert [layout['fieldnames'] for layout in reopened.layouts()] == [HEADERS]
+
+
+def test_scan_csv_warns_about_unmapped_columns_once(tmp_path):
+    """Test unmapped columns are warned about for the first file of a layout only."""
+    cache = HeaderLayoutCache(str(tmp_path / 'layouts.db'))
+    csv_path = tmp_path / 'input.csv'
+    csv_path.write_text(','.join(HEADERS) + '\n1,111223333,John,Y,777\n')
+    
+    first, records = scan_csv(str(csv_path), header_cache=cache)
+    second, _ = scan_csv(str(csv_path), header_cache=HeaderLayoutCache(str(tmp_path / 'layouts.db')))
+    
+    assert first['warnings'] == ["Unmapped columns (ignored): EmpID, Vendor_Flag"]
+    assert second['warnings'] == []
+    assert second['unmapped_columns'] == ['EmpID', 'Vendor_Flag']
+    assert records[0]['employee_id'] == '777'
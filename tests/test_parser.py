@@ -5,7 +5,22 @@ Tests for the CSV parser module.
 import pytest
 import os
 import tempfile
-from edi834.parser import parse_csv, normalize_record, validate_csv_structure
+from edi834.parser import (
+    parse_csv,
+    iter_csv,
+    scan_csv,
+    normalize_record,
+    validate_csv_structure,
+    HeaderPlan,
+    FIELD_LOOKUP,
+    compile_field_aliases,
+    csv_byte_ranges,
+    load_field_aliases,
+    parse_csv_frame,
+    frame_records,
+)
+from edi834.errors import ParseError, ParseErrorSink
+from edi834.validator import validate_records
 
 
 def test_parse_csv_valid_file():
@@ -142,3 +157,407 @@ def test_relationship_code_mapping():
         record = {'relationship': input_rel}
         normalized = normalize_record(record, 1)
         assert normalized['relationship_code'] == expected_code
+
+
+def test_parse_csv_stream():
+    """Test lazy parsing via stream=True and iter_csv."""
+    with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.csv') as f:
+        f.write('employee_id,ssn,first_name,last_name,dob,plan_code,coverage_start\n')
+        f.write('12345,111223333,John,Doe,01/15/1985,MED001,01/01/2024\n')
+        f.write('23456,222334444,Jane,Smith,03/22/1990,MED001,01/01/2024\n')
+        temp_file = f.name
+    
+    try:
+        stream = parse_csv(temp_file, stream=True)
+        assert not isinstance(stream, list)
+        
+        first = next(stream)
+        assert first['employee_id'] == '12345'
+        assert first['row_number'] == 2
+        
+        records = list(iter_csv(temp_file))
+        assert [r['employee_id'] for r in records] == ['12345', '23456']
+        
+        # Streams plug straight into validation
+        results = validate_records(parse_csv(temp_file, stream=True))
+        assert results['total_records'] == 2
+        assert results['valid'] is True
+    finally:
+        os.unlink(temp_file)
+
+
+def test_iter_csv_nonexistent_file():
+    """Test that streaming a missing file raises on first use."""
+    with pytest.raises(FileNotFoundError):
+        next(iter_csv('nonexistent_file.csv'))
+
+
+def test_header_plan_resolves_variations():
+    """Test header plan resolution and per-row extraction."""
+    plan = HeaderPlan(['EmpID', 'Emp_ID', 'Employee_ID', 'FirstName', 'Unused'])
+    
+    # employee_id is taken from the highest-priority non-empty variation
+    fields = plan.extract(['x', '777', '', ' John ', 'ignored'])
+    assert fields['employee_id'] == '777'
+    assert fields['first_name'] == 'John'
+    
+    fields = plan.extract(['x', '777', '12345', 'John', ''])
+    assert fields['employee_id'] == '12345'
+    
+    # Short rows are treated as missing trailing columns
+    fields = plan.extract(['x'])
+    assert fields['employee_id'] == ''
+    assert fields['last_name'] == ''
+
+
+def test_parse_csv_short_rows_and_blank_lines():
+    """Test that ragged rows parse and blank lines do not advance row numbers."""
+    with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.csv') as f:
+        f.write('employee_id,first_name,last_name\n')
+        f.write('12345,John\n')
+        f.write('\n')
+        f.write('23456,Jane,Smith\n')
+        temp_file = f.name
+    
+    try:
+        records = parse_csv(temp_file)
+        assert len(records) == 2
+        assert records[0]['last_name'] == ''
+        assert records[1]['last_name'] == 'Smith'
+        assert records[1]['row_number'] == 3
+    finally:
+        os.unlink(temp_file)
+
+
+def test_scan_csv_single_pass():
+    """Test combined structure check and parse."""
+    with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.csv') as f:
+        f.write('employee_id,ssn,first_name\n')
+        f.write('12345,111223333,John\n')
+        f.write('23456,222334444,Jane\n')
+        temp_file = f.name
+    
+    try:
+        result, records = scan_csv(temp_file)
+        assert result['valid'] is True
+        assert result['row_count'] == 2
+        assert result['headers'] == ['employee_id', 'ssn', 'first_name']
+        assert result['warnings'] == []
+        assert [r['first_name'] for r in records] == ['John', 'Jane']
+    finally:
+        os.unlink(temp_file)
+
+
+def test_scan_csv_errors():
+    """Test scan_csv reporting for missing and header-less files."""
+    result, records = scan_csv('nonexistent_file.csv')
+    assert result['valid'] is False
+    assert records == []
+    
+    with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.csv') as f:
+        temp_file = f.name
+    
+    try:
+        result, records = scan_csv(temp_file)
+        assert result['valid'] is False
+        assert result['errors'] == ["CSV file has no headers"]
+    finally:
+        os.unlink(temp_file)
+
+
+def test_parse_csv_frame_matches_parse_csv():
+    """Test that the columnar path produces the same records as parse_csv."""
+    pytest.importorskip('pandas')
+    
+    with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.csv') as f:
+        f.write('Emp_ID,Employee_ID,SSN,First_Name,Last_Name,DOB,Sex,Plan,Effective_Date,End_Date,Relation\n')
+        f.write('9,12345,111-22-3333, John ,Doe,01/15/1985,Male,MED001,1/1/2024,,Spouse\n')
+        f.write('8,,222 33 4444,Jane,Smith,19900322,x,MED001,02/30/2024,12/31/2024,\n')
+        f.write('7,34567,333224444,Bob,Jones,not a date,F,DENT001,01/01/2024,12/31/2024,Child\n')
+        temp_file = f.name
+    
+    try:
+        expected = parse_csv(temp_file)
+        
+        assert list(frame_records(parse_csv_frame(temp_file))) == expected
+        assert list(frame_records(parse_csv_frame(temp_file, chunksize=2))) == expected
+        assert expected[1]['employee_id'] == '8'
+        assert expected[0]['coverage_start'] == '20240101'
+        assert expected[1]['coverage_start'] == '02/30/2024'
+    finally:
+        os.unlink(temp_file)
+
+
+def test_parse_csv_frame_ragged_rows_match_parse_csv(tmp_path):
+    """Test short rows, extra trailing fields and loose dates match the row path."""
+    pytest.importorskip('pandas')
+    
+    path = tmp_path / 'ragged.csv'
+    path.write_text('employee_id,first_name,last_name,dob,coverage_start\n'
+                    '1,John,Doe,\n'
+                    '2,Jane\n'
+                    '3,Bob,Jones,01/15/1985, 1/ 5/2024,extra,fields\n'
+                    '4,Ann,Lee,1985-01-15,01/01/2024,\n')
+    
+    expected = parse_csv(str(path))
+    
+    assert list(frame_records(parse_csv_frame(str(path)))) == expected
+    assert [r['employee_id'] for r in expected] == ['1', '2', '3', '4']
+    assert expected[0]['first_name'] == 'John'
+    assert expected[2]['coverage_start'] == '20240105'
+
+
+def test_repeated_header_reads_last_column(tmp_path):
+    """Test a repeated header is read from its last column, as csv.DictReader does."""
+    plan = HeaderPlan(['employee_id', 'employee_id', 'first_name'])
+    assert plan.extract(['', '3', 'B'])['employee_id'] == '3'
+    assert plan.extract(['1', '', 'B'])['employee_id'] == ''
+    assert plan.unmapped == []
+    
+    path = tmp_path / 'repeated.csv'
+    path.write_text('employee_id,employee_id,first_name\n,3,B\n')
+    expected = parse_csv(str(path))
+    assert expected[0]['employee_id'] == '3'
+    
+    pytest.importorskip('pandas')
+    assert list(frame_records(parse_csv_frame(str(path)))) == expected
+
+
+def test_parse_csv_frame_nonexistent_file():
+    """Test the columnar path with a missing file."""
+    pytest.importorskip('pandas')
+    
+    with pytest.raises(FileNotFoundError):
+        parse_csv_frame('nonexistent_file.csv')
+
+
+def test_date_normalization_cache():
+    """Test the shared date cache and its fast paths."""
+    from edi834.utils import format_date, validate_date_format, date_cache_info, clear_date_cache
+    
+    clear_date_cache()
+    
+    assert format_date('1/5/2024') == '20240105'
+    assert format_date('02/29/2023') == ''
+    assert format_date('20241399') == '20241399'  # 8 digits pass through unchanged
+    assert format_date('2024-01-05') == ''
+    assert validate_date_format('20240229') is True
+    assert validate_date_format('20230229') is False
+    assert validate_date_format('01/05/2024') is False
+    
+    for _ in range(3):
+        format_date('01/01/2024')
+    
+    info = date_cache_info()
+    assert info['hits'] >= 2
+    assert 0 < info['hit_rate'] < 1
+    assert info['size'] <= info['maxsize']
+
+
+def test_csv_byte_ranges_skip_quoted_newlines():
+    """Test byte ranges only end on newlines outside quoted fields."""
+    data = b'a,b\n1,"x\ny"\n2,"say ""hi""\n"\n3,z\n'
+    
+    for chunk_bytes in range(1, len(data) + 1):
+        ranges = list(csv_byte_ranges(data, chunk_bytes, start=4))
+        assert ranges[0][0] == 4
+        assert ranges[-1][1] == len(data)
+        for (_, end), (start, _) in zip(ranges, ranges[1:]):
+            assert end == start
+            assert end in (12, 28)
+
+
+def test_parse_csv_parallel_matches_serial():
+    """Test worker processes give the same records, row numbers and warnings."""
+    with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.csv', newline='') as f:
+        f.write('employee_id,ssn,first_name,last_name,dob,plan_code,coverage_start,address1\n')
+        for i in range(40):
+            f.write(f'{10000 + i},111223333,John,Doe,01/15/1985,MED001,01/01/2024,"Line 1\r\nLine ""{i}"""\r\n')
+            if i % 7 == 0:
+                f.write('\n')
+        temp_file = f.name
+    
+    try:
+        serial_report, serial = scan_csv(temp_file)
+        report = {'valid': True, 'errors': [], 'warnings': [], 'headers': [], 'row_count': 0}
+        records = list(iter_csv(temp_file, report=report, workers=2, chunk_bytes=200))
+        
+        assert [r.to_dict() for r in records] == [r.to_dict() for r in serial]
+        assert records[-1]['row_number'] == 41
+        assert records[3]['address1'] == 'Line 1\r\nLine "3"'
+        assert report['row_count'] == serial_report['row_count'] == 40
+        assert report['headers'] == serial_report['headers']
+        assert len(parse_csv(temp_file, workers=2)) == 40
+    finally:
+        os.unlink(temp_file)
+
+
+def test_scan_csv_parallel_errors():
+    """Test parallel scanning reports missing and header-less files like serial mode."""
+    result, records = scan_csv('nonexistent_file.csv', workers=2)
+    assert result['valid'] is False
+    
+    with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.csv') as f:
+        temp_file = f.name
+    
+    try:
+        result, records = scan_csv(temp_file, workers=2)
+        assert result['errors'] == ["CSV file has no headers"]
+    finally:
+        os.unlink(temp_file)
+
+
+@pytest.mark.parametrize('module,suffix', [('gzip', '.gz'), ('bz2', '.bz2'), ('lzma', '.xz')])
+def test_parse_compressed_csv(tmp_path, module, suffix):
+    """Test compressed CSVs are detected by extension or magic bytes."""
+    import importlib
+    
+    content = ('employee_id,ssn,first_name\n'
+               '12345,111223333,John\n'
+               '23456,222334444,Jane\n').encode('utf-8')
+    compressed = importlib.import_module(module).compress(content)
+    by_extension = tmp_path / f'input.csv{suffix}'
+    by_magic = tmp_path / 'input.csv'
+    by_extension.write_bytes(compressed)
+    by_magic.write_bytes(compressed)
+    
+    for path in (by_extension, by_magic):
+        records = parse_csv(str(path), workers=2)
+        assert [r['first_name'] for r in records] == ['John', 'Jane']
+        
+        result = validate_csv_structure(str(path))
+        assert result['valid'] is True
+        assert result['row_count'] == 2
+
+
+def _failing_dates(monkeypatch):
+    """Make date formatting raise for the value 'BAD'."""
+    import edi834.parser as parser_module
+    
+    real_format_date = parser_module.format_date
+    
+    def format_date(value):
+        if value == 'BAD':
+            raise ValueError("unparseable date")
+        return real_format_date(value)
+    
+    monkeypatch.setattr(parser_module, 'format_date', format_date)
+
+
+def test_parse_errors_collected_in_sink(tmp_path, monkeypatch):
+    """Test dropped rows are recorded with row number, column and reason."""
+    _failing_dates(monkeypatch)
+    path = tmp_path / 'input.csv'
+    path.write_text('employee_id,first_name,Birth_Date\n'
+                    '1,John,01/15/1985\n'
+                    '2,Jane,BAD\n'
+                    '3,Jim,BAD\n'
+                    '4,Joan,BAD\n')
+    
+    errors = ParseErrorSink(max_errors=2)
+    records = parse_csv(str(path), errors=errors)
+    
+    assert [r['employee_id'] for r in records] == ['1']
+    assert errors.count == 3
+    assert errors.truncated is True
+    assert errors.errors[0] == {'row_number': 3, 'column': 'Birth_Date', 'reason': 'unparseable date'}
+    
+    report, records = scan_csv(str(path))
+    assert report['parse_errors']['count'] == 3
+    assert report['warnings'] == []
+    
+    results = validate_records(parse_csv(str(path), stream=True, errors=errors), parse_errors=errors)
+    assert results['valid'] is False
+    assert results['parse_errors']['count'] == 6
+    assert results['total_records'] == 1
+
+
+def test_parse_errors_fail_fast(tmp_path, monkeypatch):
+    """Test the fail_after threshold stops parsing."""
+    _failing_dates(monkeypatch)
+    path = tmp_path / 'input.csv'
+    path.write_text('employee_id,dob\n1,BAD\n2,01/15/1985\n3,BAD\n')
+    
+    with pytest.raises(ParseError) as excinfo:
+        parse_csv(str(path), errors=ParseErrorSink(fail_after=1))
+    assert excinfo.value.errors.count == 1
+    
+    report, records = scan_csv(str(path), errors=ParseErrorSink(fail_after=2))
+    assert report['valid'] is False
+    assert records == []
+    assert report['parse_errors']['count'] == 2
+    assert 'row 4' in report['errors'][0]
+
+
+def test_field_aliases_loaded_from_config(tmp_path):
+    """Test aliases come from YAML and compile into a lower-cased reverse lookup."""
+    assert FIELD_LOOKUP['ee_ssn'] == ('ssn', 3)
+    assert HeaderPlan(['EE_SSN']).extract(['111223333'])['ssn'] == '111223333'
+    
+    config = tmp_path / 'aliases.yaml'
+    config.write_text('ssn: [SSN, " Tax_ID "]\n')
+    aliases = load_field_aliases(str(config))
+    assert aliases['ssn'] == ['SSN', ' Tax_ID ']
+    assert aliases['last_name'] == ['last_name']
+    assert compile_field_aliases(aliases)['tax_id'] == ('ssn', 1)
+    
+    with pytest.raises(FileNotFoundError):
+        load_field_aliases(str(tmp_path / 'missing.yaml'))
+    
+    config.write_text('ssn: [ssn]\nemployee_id: [SSN]\n')
+    with pytest.raises(ValueError):
+        load_field_aliases(str(config))
+    
+    config.write_text('salary: [pay]\n')
+    with pytest.raises(ValueError):
+        load_field_aliases(str(config))
+    
+    config.write_text('ssn: social_security\n')
+    with pytest.raises(ValueError, match='ssn'):
+        load_field_aliases(str(config))
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_malformed_csv_record_goes_to_sink(tmp_path, workers):
+    """Test a record csv.reader rejects is recorded and the rest of the file still parses."""
+    import csv
+    
+    path = tmp_path / 'input.csv'
+    oversized = 'x' * (csv.field_size_limit() + 1)
+    path.write_text('employee_id,first_name\n'
+                    '1,John\n'
+                    f'2,{oversized}\n'
+                    '3,Jane\n')
+    
+    errors = ParseErrorSink()
+    records = parse_csv(str(path), workers=workers, errors=errors)
+    
+    assert [(r['employee_id'], r['row_number']) for r in records] == [('1', 2), ('3', 4)]
+    assert errors.count == 1
+    assert errors.errors[0]['row_number'] == 3
+    assert 'field larger than field limit' in errors.errors[0]['reason']
+    
+    with pytest.warns(UserWarning, match='1 rows could not be parsed'):
+        assert len(parse_csv(str(path), workers=workers)) == 2
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_malformed_multiline_record_is_skipped_whole(tmp_path, workers):
+    """Test the tail of a rejected quoted field spanning lines is not read as a record."""
+    import csv
+    
+    path = tmp_path / 'input.csv'
+    oversized = 'x' * (csv.field_size_limit() + 1)
+    path.write_text('employee_id,first_name\n'
+                    '1,a\n'
+                    f'2,"{oversized}\n'
+                    'still,quoted"\n'
+                    '3,c\n')
+    
+    errors = ParseErrorSink()
+    records = parse_csv(str(path), workers=workers, errors=errors)
+    
+    assert [(r['row_number'], r['employee_id'], r['first_name']) for r in records] == [
+        (2, '1', 'a'), (4, '3', 'c')]
+    assert errors.count == 1
+    assert errors.errors[0]['row_number'] == 3
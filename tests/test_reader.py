@@ -0,0 +1,207 @@
+"""
+Tests for the EDI reader module.
+"""
+
+import io
+import json
+import mmap
+
+import pytest
+from edi834.formatter import Delimiters, pretty_print_edi
+from edi834.generator import generate_834, write_834
+from edi834.reader import (
+    EDIReader,
+    iter_members,
+    iter_segments,
+    member_record,
+    validate_edi_file,
+    write_ndjson,
+)
+
+
+RECORDS = [
+    {
+        'employee_id': '12345',
+        'ssn': '111223333',
+        'first_name': 'John',
+        'last_name': 'Doe',
+        'middle_name': 'Q',
+        'dob': '19850115',
+        'gender': 'M',
+        'address1': '123 Main St',
+        'address2': 'Apt 4',
+        'city': 'Springfield',
+        'state': 'IL',
+        'zip': '62701',
+        'plan_code': 'MED001',
+        'coverage_start': '20240101',
+        'coverage_end': '20241231',
+        'relationship_code': '18',
+    },
+    {
+        'employee_id': '67890',
+        'ssn': '444556666',
+        'first_name': 'Jane',
+        'last_name': 'Smith',
+        'plan_code': 'DEN001',
+        'coverage_start': '20240201',
+        'relationship_code': '01',
+    },
+]
+
+
+def test_delimiters_from_isa():
+    """Test delimiters are read from the ISA header."""
+    edi_content = generate_834(RECORDS, delimiters=Delimiters('|', '\n', '>', '!'))
+    
+    assert Delimiters.from_isa(edi_content) == Delimiters('|', '\n', '>', '!')
+    
+    # 4010 headers carry a standards identifier in ISA11
+    header = ('ISA*00*          *00*          *ZZ*SENDER         *ZZ*RECEIVER       '
+              '*241020*1200*U*00401*000000001*0*T*>~')
+    delimiters = Delimiters.from_isa(header)
+    assert (delimiters.element, delimiters.segment, delimiters.component) == ('*', '~', '>')
+    
+    with pytest.raises(ValueError):
+        Delimiters.from_isa('GS*BE~')
+
+
+def test_iter_segments_small_chunks():
+    """Test tokenizing gives the same segments whatever the chunk size."""
+    edi_content = generate_834(RECORDS)
+    expected = [segment.split('*') for segment in edi_content.split('~') if segment]
+    
+    assert list(iter_segments(io.BytesIO(edi_content.encode('utf-8')), chunk_size=7)) == expected
+    assert list(iter_segments(io.StringIO(pretty_print_edi(edi_content)))) == expected
+
+
+def test_reader_tracks_envelope(tmp_path):
+    """Test the reader keeps the current ISA, GS and ST segments."""
+    output_path = tmp_path / 'out.edi'
+    write_834(RECORDS, str(output_path), max_members_per_st=1)
+    
+    reader = EDIReader(str(output_path))
+    controls = [reader.transaction_set[2] for member in reader.members()]
+    
+    assert reader.delimiters == Delimiters()
+    assert reader.interchange[0] == 'ISA'
+    assert reader.group[0] == 'GS'
+    assert len(set(controls)) == 2
+
+
+def test_members_build_loops_from_mmap(tmp_path):
+    """Test members are grouped into 2000/2100A/2300 loops from a memory map."""
+    output_path = tmp_path / 'out.edi'
+    write_834(RECORDS, str(output_path), delimiters=Delimiters('|', '\n'))
+    
+    with open(output_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        members = list(iter_members(mapped))
+    
+    assert len(members) == 2
+    first = members[0]
+    assert first.loop_id == '2000'
+    assert [loop.loop_id for loop in first.loops] == ['2100A', '2300']
+    assert first.segment('REF', '0F') == ['REF', '0F', '12345']
+    assert first.find('2100A')[0].segment('N4') == ['N4', 'Springfield', 'IL', '62701']
+    assert first.find('2300')[0].segment('DTP') == ['DTP', '348', 'D8', '20240101']
+
+
+def test_member_record_round_trip():
+    """Test records written by the generator are read back unchanged."""
+    edi_content = generate_834(RECORDS)
+    
+    records = [member_record(member) for member in iter_members(edi_content.encode('utf-8'))]
+    
+    assert records[0]['last_name'] == 'Doe'
+    assert records[0]['coverage_end'] == '20241231'
+    for record, original in zip(records, RECORDS):
+        for field, value in original.items():
+            assert record[field] == value
+
+
+def test_members_coverage_sub_loops():
+    """Test 2310/2320/2330 loops nest under their 2300 coverage."""
+    edi_content = (
+        'ISA*00*          *00*          *ZZ*SENDER         *ZZ*RECEIVER       '
+        '*241020*1200*^*00501*000000001*0*T*:~'
+        'GS*BE*SENDER*RECEIVER*20241020*1200*1*X*005010X220A1~ST*834*0001*005010X220A1~'
+        'INS*Y*18*021*01*A***FT~NM1*IL*1*DOE*JOHN****34*111223333~'
+        'HD*021**HLT*MED001*EMP~LX*1~NM1*P3*1*WELBY*MARCUS~'
+        'COB*P*GRP1*1~NM1*IN*2*OTHER PLAN~'
+        'SE*9*0001~GE*1*1~IEA*1*000000001~'
+    )
+    
+    member = next(iter_members(edi_content.encode('utf-8')))
+    coverage = member.find('2300')[0]
+    
+    assert [loop.loop_id for loop in coverage.loops] == ['2310', '2320']
+    assert coverage.loops[0].segment('NM1', 'P3') is not None
+    assert coverage.find('2320')[0].find('2330')[0].segment('NM1', 'IN') is not None
+    assert isinstance(member.to_dict()['loops'][0], dict)
+    assert member.find('2700') == []
+
+
+
+def test_validate_edi_file(tmp_path):
+    """Test memory-mapped validation of a generated file, and byte offsets of errors."""
+    output_path = tmp_path / 'out.edi'
+    write_834(RECORDS, str(output_path), pretty=True, max_members_per_st=1,
+              delimiters=Delimiters('|', '~'))
+    
+    result = validate_edi_file(str(output_path))
+    assert result['valid'] is True
+    assert result['transaction_set_count'] == 2
+    
+    content = output_path.read_bytes()
+    offset = content.index(b'SE|')
+    output_path.write_bytes(content[:offset] + b'SE|99' + content[offset + 5:])
+    
+    result = validate_edi_file(str(output_path))
+    assert result['valid'] is False
+    assert result['error_details'][0]['offset'] == offset
+    assert result['error_details'][0]['segment'] == 'SE'
+
+
+def test_validate_edi_file_empty(tmp_path):
+    """Test an empty file is reported as missing its envelope."""
+    output_path = tmp_path / 'empty.edi'
+    output_path.write_bytes(b'')
+    
+    result = validate_edi_file(str(output_path))
+    
+    assert result['valid'] is False
+    assert 'Missing ISA header segment' in result['errors']
+
+
+
+def test_write_ndjson_segments(tmp_path):
+    """Test one JSON object per segment, matching edi_to_json."""
+    from edi834.formatter import edi_to_json
+    
+    output_path = tmp_path / 'out.edi'
+    write_834(RECORDS, str(output_path))
+    out = io.StringIO()
+    
+    count = write_ndjson(str(output_path), out)
+    
+    lines = out.getvalue().splitlines()
+    assert count == len(lines)
+    assert [json.loads(line) for line in lines] == json.loads(edi_to_json(output_path.read_text()))
+
+
+def test_write_ndjson_members():
+    """Test one JSON object per member loop with its envelope control numbers."""
+    edi_content = generate_834(RECORDS, max_members_per_st=1)
+    out = io.StringIO()
+    
+    count = write_ndjson(edi_content.encode('utf-8'), out, per='member')
+    
+    members = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert count == 2
+    assert members[0]['loop'] == '2000'
+    assert members[0]['segments'][0][0] == 'INS'
+    assert members[0]['transaction_set_control_number'] != members[1]['transaction_set_control_number']
+    assert members[0]['interchange_control_number'] == edi_content[90:99]
+    
+    with pytest.raises(ValueError):
+        write_ndjson(edi_content.encode('utf-8'), out, per='loop')
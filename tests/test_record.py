@@ -0,0 +1,77 @@
+"""
+Tests for the enrollment record module.
+"""
+
+import pickle
+import pytest
+from edi834.record import EnrollmentRecord
+from edi834.parser import normalize_record
+from edi834.validator import validate_records
+from edi834.generator import EDI834Generator
+
+
+def test_record_defaults():
+    """Test that unset fields default to empty strings."""
+    record = EnrollmentRecord(row_number=2, first_name='John')
+    
+    assert record['row_number'] == 2
+    assert record['first_name'] == 'John'
+    assert record['ssn'] == ''
+    assert len(record) == len(EnrollmentRecord.FIELDS)
+
+
+def test_record_unknown_field():
+    """Test that unknown fields are rejected."""
+    with pytest.raises(TypeError):
+        EnrollmentRecord(favorite_color='blue')
+    
+    record = EnrollmentRecord()
+    with pytest.raises(KeyError):
+        record['favorite_color']
+    with pytest.raises(KeyError):
+        record['favorite_color'] = 'blue'
+
+
+def test_record_dict_interface():
+    """Test the dict-compatible accessors."""
+    record = EnrollmentRecord(row_number=3, employee_id='12345')
+    
+    assert record.get('employee_id') == '12345'
+    assert record.get('missing', 'N/A') == 'N/A'
+    assert 'employee_id' in record
+    assert 'missing' not in record
+    
+    record['plan_code'] = 'MED001'
+    assert record.plan_code == 'MED001'
+    
+    as_dict = record.to_dict()
+    assert dict(record) == as_dict
+    assert record == as_dict
+    assert EnrollmentRecord.from_dict(as_dict) == record
+
+
+def test_record_pickle_roundtrip():
+    """Test that records survive pickling (used by multi-process generation)."""
+    record = EnrollmentRecord(row_number=2, employee_id='12345', ssn='111223333')
+    
+    assert pickle.loads(pickle.dumps(record)) == record
+
+
+def test_record_through_pipeline():
+    """Test that parsed records work with the validator and generator."""
+    record = normalize_record({
+        'employee_id': '12345',
+        'ssn': '111-22-3333',
+        'first_name': 'John',
+        'last_name': 'Doe',
+        'dob': '01/15/1985',
+        'plan_code': 'MED001',
+        'coverage_start': '01/01/2024',
+    }, 2)
+    
+    assert isinstance(record, EnrollmentRecord)
+    assert validate_records([record])['valid'] is True
+    
+    segments, count = EDI834Generator('SENDER', 'RECEIVER')._generate_member_loop(record)
+    assert 'REF*0F*12345~' in segments
+    assert 'DTP*348*D8*20240101~' in segments
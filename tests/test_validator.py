@@ -7,7 +7,10 @@ from edi834.validator import (
     validate_record,
     validate_records,
     load_validation_rules,
-    generate_validation_report
+    generate_validation_report,
+    CompiledRules,
+    get_compiled_rules,
+    validate_frame,
 )
 
 
@@ -245,3 +248,103 @@ def test_generate_validation_report_json():
     data = json.loads(report)
     assert data['total_records'] == 2
     assert data['valid_records'] == 2
+
+
+def test_compiled_rules_reused():
+    """Test that compiled rules match plain rules and are cached per file."""
+    record = {
+        'employee_id': '12345',
+        'ssn': '111223333',
+        'first_name': 'John',
+        'last_name': 'Doe',
+        'dob': '19850115',
+        'plan_code': 'INVALID999',
+        'coverage_start': '20240101',
+        'zip': 'ABCDE',
+        'state': 'NY',
+    }
+    
+    rules = load_validation_rules()
+    compiled = CompiledRules(rules)
+    
+    assert validate_record(record, compiled) == validate_record(record, rules)
+    assert get_compiled_rules() is get_compiled_rules()
+    
+    results = validate_records([record, record], compiled)
+    assert results['invalid_records'] == 2
+
+
+def test_compiled_rules_reload_on_change(tmp_path):
+    """Test that the compiled rules cache follows the config file mtime."""
+    import os
+    
+    config_path = tmp_path / 'rules.yaml'
+    config_path.write_text('required_fields:\n  - employee_id\n')
+    
+    first = get_compiled_rules(str(config_path))
+    assert first.required_fields == ('employee_id',)
+    
+    config_path.write_text('required_fields:\n  - ssn\n')
+    stat = os.stat(config_path)
+    os.utime(config_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    
+    second = get_compiled_rules(str(config_path))
+    assert second is not first
+    assert second.required_fields == ('ssn',)
+
+
+def test_validate_frame_matches_validate_records():
+    """Test that the vectorized engine reports the same errors as validate_records."""
+    pd = pytest.importorskip('pandas')
+    
+    base = {
+        'row_number': 2,
+        'employee_id': '12345',
+        'ssn': '111-22-3333',
+        'first_name': 'John',
+        'last_name': 'Doe',
+        'dob': '19850115',
+        'gender': 'M',
+        'zip': '10001',
+        'state': 'ny',
+        'plan_code': 'MED001',
+        'coverage_start': '20240101',
+        'coverage_end': '20241231',
+        'relationship_code': '18',
+    }
+    variations = [
+        {},
+        {'ssn': '12345', 'dob': '20240230'},
+        {'dob': '01/15/1985', 'plan_code': 'BAD', 'gender': 'Q'},
+        {'zip': '1234', 'state': 'New York', 'relationship_code': '99'},
+        {'coverage_start': '20250101', 'first_name': 'X' * 40},
+        {'employee_id': '', 'last_name': '', 'coverage_end': ''},
+        {'dob': '20000229', 'coverage_start': '19000229'},
+    ]
+    records = []
+    for row_number, changes in enumerate(variations, start=2):
+        record = dict(base, row_number=row_number)
+        record.update(changes)
+        records.append(record)
+    
+    expected = validate_records(records)
+    actual = validate_frame(pd.DataFrame(records))
+    
+    assert actual == expected
+    assert actual['invalid_records'] == 6
+
+
+def test_validation_report_lists_parse_errors():
+    """Test parse errors merged into the results appear in the reports."""
+    from edi834.errors import ParseErrorSink
+    
+    errors = ParseErrorSink()
+    errors.add(7, ValueError("unparseable date"), 'dob')
+    results = validate_records([], parse_errors=errors)
+    
+    assert results['valid'] is False
+    assert results['parse_errors']['errors'] == [
+        {'row_number': 7, 'column': 'dob', 'reason': 'unparseable date'}
+    ]
+    assert 'Row 7: dob: unparseable date' in generate_validation_report(results, 'text')
+    assert ',7,,"dob: unparseable date"' in generate_validation_report(results, 'csv')